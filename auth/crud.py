@@ -5,14 +5,21 @@ Contain user related CRUD ORM queries/functions to interact with the data in the
 import uuid
 from datetime import datetime
 
-from sqlalchemy import update, delete
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from auth import models, schemas
 from base import utils
+from base.cache import user_cache
+from base.response_cache import get_user_namespace, response_cache
 
+# User columns which are kept in the authenticated user cache, Password hash is not kept
+# so that it is always read from the DB where it is checked
+USER_SNAPSHOT_COLUMNS = ("id", "created_at", "modified_at", "email", "first_name", "last_name")
 
-def get_user_by_id(db: Session, user_id: str):
+
+async def get_user_by_id(db: AsyncSession, user_id: str):
     """
     Return user object with the given ID
 
@@ -20,10 +27,57 @@ def get_user_by_id(db: Session, user_id: str):
     :param user_id: User UUID
     :return: DB query object
     """
-    return db.query(models.User).get(user_id)
+    return await db.get(models.User, user_id)
+
+
+async def get_user_by_id_cached(db: AsyncSession, user_id: str):
+    """
+    Return user object with the given ID, Served from the user cache when possible.
+    A cached user is attached to the session without a query, So it can still be updated.
+
+    Cached users are tagged with the version of their response cache namespace, Which is
+    bumped on update and delete. With the redis backend the version is shared, So a change
+    is seen by every worker on its next request. With the memory backend other workers keep
+    serving the old user for up to `USER_CACHE_TTL_SECONDS`.
+
+    :param db: DB Session object
+    :param user_id: User UUID
+    :return: DB user object or None
+    """
+
+    [version] = await response_cache.get_versions(get_user_namespace(user_id))
+    cached = user_cache.get(str(user_id))
+
+    if cached is None or cached[0] != version:
+        db_user = await get_user_by_id(db=db, user_id=user_id)
+
+        if db_user:
+            user_cache.set(str(user_id), (version, {
+                column: getattr(db_user, column) for column in USER_SNAPSHOT_COLUMNS
+            }))
+
+        return db_user
+
+    db_user = models.User(**cached[1])
+    make_transient_to_detached(db_user)
+    db.add(db_user)
+
+    return db_user
+
+
+async def get_user_password(db: AsyncSession, user_id: uuid.UUID) -> str | None:
+    """
+    Return current password hash of the user, Cached users don't have it
+
+    :param db: DB Session object
+    :param user_id: User UUID
+    :return: Password hash or None
+    """
 
+    return await db.scalar(select(models.User.password).where(models.User.id == user_id))
 
-def get_user_by_email(db: Session, email: str):
+
+async def get_user_by_email(db: AsyncSession, email: str):
     """
     Return user object with the given ID
 
@@ -31,10 +85,11 @@ def get_user_by_email(db: Session, email: str):
     :param email: User email address
     :return: DB query object
     """
-    return db.query(models.User).filter(models.User.email == email.lower()).first()
+    result = await db.execute(select(models.User).where(models.User.email == email.lower()))
+    return result.scalars().first()
 
 
-def create_user(db: Session, user: schemas.UserCreateRequest):
+async def create_user(db: AsyncSession, user: schemas.UserCreateRequest):
     """
     Create a user object in the DB
 
@@ -42,7 +97,7 @@ def create_user(db: Session, user: schemas.UserCreateRequest):
     :param user: Pydantic user instance
     :return: DB user object
     """
-    hashed_password = utils.get_hashed_password(user.password)
+    hashed_password = await utils.get_hashed_password(user.password)
     db_user = models.User(
         id=uuid.uuid4(),
         created_at=datetime.utcnow(),
@@ -54,12 +109,12 @@ def create_user(db: Session, user: schemas.UserCreateRequest):
     )
 
     db.add(db_user)
-    db.commit()
+    await db.commit()
 
     return db_user
 
 
-def update_user(db: Session, user: models.User, updated_data: dict):
+async def update_user(db: AsyncSession, user: models.User, updated_data: dict):
     """
     Update user details as part of the partial update
 
@@ -69,16 +124,17 @@ def update_user(db: Session, user: models.User, updated_data: dict):
     :return: Refreshed DB object, With update data
     """
 
-    db.execute(update(models.User).where(
+    await db.execute(update(models.User).where(
         models.User.id == user.id).values(updated_data))
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await invalidate_user_cache(user.id)
+    await db.refresh(user)
 
     return user
 
 
-def delete_user(db: Session, user: models.User):
+async def delete_user(db: AsyncSession, user: models.User):
     """
     Delete a given user object from DB
 
@@ -87,5 +143,17 @@ def delete_user(db: Session, user: models.User):
     :return: None
     """
 
-    db.execute(delete(models.User).where(models.User.id == user.id))
-    db.commit()
+    await db.execute(delete(models.User).where(models.User.id == user.id))
+    await db.commit()
+    await invalidate_user_cache(user.id)
+
+
+async def invalidate_user_cache(user_id: uuid.UUID) -> None:
+    """
+    Drop the cached user of this worker, And bump its version for the other workers
+
+    :param user_id: User UUID
+    """
+
+    user_cache.invalidate(str(user_id))
+    await response_cache.invalidate(get_user_namespace(user_id))
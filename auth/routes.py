@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, Request, HTTPException, status, Form
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import exc
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import settings
 import strings
@@ -30,6 +30,7 @@ from auth.schemas import (
 )
 from base.dependencies import get_db, get_current_user
 from base.emails import send_mail
+from base.routing import ModelRoute
 from base.utils import (
     check_password,
     generate_auth_tokens,
@@ -38,12 +39,12 @@ from base.utils import (
     get_hashed_password, get_auth_token, html_to_string
 )
 
-router = APIRouter()
+router = APIRouter(route_class=ModelRoute)
 templates = Jinja2Templates(directory=settings.TEMPLATES_PATH)
 
 
 @router.post(path="/register/", response_model=UserJWTResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreateRequest, db: Annotated[Session, Depends(get_db)]):
+async def register(user: UserCreateRequest, db: Annotated[AsyncSession, Depends(get_db)]):
     """
     Handler for creating a user object in DB when user signup/register themselves
 
@@ -54,7 +55,7 @@ async def register(user: UserCreateRequest, db: Annotated[Session, Depends(get_d
 
     try:
         # Check if user already exists
-        db_user = crud.get_user_by_email(db=db, email=user.email)
+        db_user = await crud.get_user_by_email(db=db, email=user.email)
         if db_user:
             raise HTTPException(
                 detail=strings.EMAIL_ALREADY_EXISTS,
@@ -76,7 +77,7 @@ async def register(user: UserCreateRequest, db: Annotated[Session, Depends(get_d
             )
 
         # Create user
-        db_user = crud.create_user(db=db, user=user)
+        db_user = await crud.create_user(db=db, user=user)
 
         # Generate auth tokens
         auth_tokens = generate_auth_tokens(db_user)
@@ -94,7 +95,7 @@ async def register(user: UserCreateRequest, db: Annotated[Session, Depends(get_d
 
 
 @router.post(path="/login/", response_model=UserJWTResponse, status_code=status.HTTP_200_OK)
-async def login(user: UserLoginRequest, db: Annotated[Session, Depends(get_db)]):
+async def login(user: UserLoginRequest, db: Annotated[AsyncSession, Depends(get_db)]):
     """
     Login API handler
 
@@ -105,7 +106,7 @@ async def login(user: UserLoginRequest, db: Annotated[Session, Depends(get_db)])
 
     try:
         # Check if user exists by the given email
-        db_user = crud.get_user_by_email(db=db, email=user.email)
+        db_user = await crud.get_user_by_email(db=db, email=user.email)
         if not db_user:
             raise HTTPException(
                 detail=strings.USER_DOES_NOT_EXISTS,
@@ -113,7 +114,7 @@ async def login(user: UserLoginRequest, db: Annotated[Session, Depends(get_db)])
             )
 
         # Check user password
-        if not check_password(raw_password=user.password, hashed_password=db_user.password):
+        if not await check_password(raw_password=user.password, hashed_password=db_user.password):
             raise HTTPException(
                 detail=strings.INVALID_PASSWORD,
                 status_code=status.HTTP_400_BAD_REQUEST
@@ -139,7 +140,7 @@ async def login(user: UserLoginRequest, db: Annotated[Session, Depends(get_db)])
     response_model=RefreshTokenResponse,
     status_code=status.HTTP_200_OK
 )
-async def refresh_token(token: RefreshTokenRequest, db: Annotated[Session, Depends(get_db)]):
+async def refresh_token(token: RefreshTokenRequest, db: Annotated[AsyncSession, Depends(get_db)]):
     """
     API handler for refreshing access token
 
@@ -171,7 +172,7 @@ async def refresh_token(token: RefreshTokenRequest, db: Annotated[Session, Depen
             status_code=status.HTTP_400_BAD_REQUEST
         )
 
-    db_user = crud.get_user_by_id(db=db, user_id=user_id)
+    db_user = await crud.get_user_by_id(db=db, user_id=user_id)
 
     if not db_user:
         raise HTTPException(
@@ -203,7 +204,7 @@ async def profile_details(user: Annotated[User, Depends(get_current_user)]):
 async def update_profile_details(
         user_update: UserUpdateRequest,
         user: Annotated[User, Depends(get_current_user)],
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     Update user profile details
@@ -224,7 +225,7 @@ async def update_profile_details(
             )
 
         # Update user details
-        updated_user = crud.update_user(
+        updated_user = await crud.update_user(
             db=db, user=user, updated_data=updated_data)
         return UserResponse(message=strings.PROFILE_DETAILS_UPDATED, data=updated_user)
 
@@ -239,7 +240,7 @@ async def update_profile_details(
 @router.delete(path="/profile/", response_model=UserMessageResponse, status_code=status.HTTP_200_OK)
 async def delete_profile(
         user: Annotated[User, Depends(get_current_user)],
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     Delete user profile details
@@ -250,7 +251,7 @@ async def delete_profile(
     """
 
     try:
-        crud.delete_user(db=db, user=user)
+        await crud.delete_user(db=db, user=user)
         return UserMessageResponse(message=strings.PROFILE_DELETE_SUCCESS)
 
     except exc.SQLAlchemyError as e:
@@ -269,7 +270,7 @@ async def delete_profile(
 async def update_password(
         change_password: ChangePasswordRequest,
         user: Annotated[User, Depends(get_current_user)],
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     Change/Update current user password
@@ -289,10 +290,10 @@ async def update_password(
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        # Validate old password is correct or not
-        if not check_password(
+        # Validate old password is correct or not, Against the hash stored in the DB
+        if not await check_password(
                 raw_password=change_password.old_password,
-                hashed_password=user.password
+                hashed_password=await crud.get_user_password(db=db, user_id=user.id)
         ):
             raise HTTPException(
                 detail=strings.OLD_PASSWORD_ERROR,
@@ -321,8 +322,8 @@ async def update_password(
             )
 
         # Generate hashed password based on new password and update it
-        hashed_password = get_hashed_password(change_password.new_password)
-        crud.update_user(db=db, user=user, updated_data={
+        hashed_password = await get_hashed_password(change_password.new_password)
+        await crud.update_user(db=db, user=user, updated_data={
                          "password": hashed_password})
 
         return UserMessageResponse(message=strings.PASSWORD_UPDATE_SUCCESS)
@@ -343,7 +344,7 @@ async def update_password(
 async def get_reset_password_link(
         reset_password: ResetPasswordRequest,
         request: Request,
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     Reset password route for getting reset password link
@@ -361,7 +362,7 @@ async def get_reset_password_link(
         )
 
     # Check if user exists or not
-    db_user = crud.get_user_by_email(db=db, email=reset_password.email)
+    db_user = await crud.get_user_by_email(db=db, email=reset_password.email)
 
     if not db_user:
         raise HTTPException(
@@ -383,13 +384,16 @@ async def get_reset_password_link(
     link += f"/v1/reset-password-form/?token={token}"
 
     html = await html_to_string(filename="reset_password.html", context={"link": link})
-    is_send_successfully = await send_mail(title="Reset Password", html=html)
 
-    if not is_send_successfully:
+    try:
+        # Email is queued here and delivered by the background email sender
+        await send_mail(db=db, title="Reset Password", html=html)
+
+    except exc.SQLAlchemyError as e:
         raise HTTPException(
             detail=strings.EMAIL_ERROR,
-            status_code=status.HTTP_400_BAD_REQUEST
-        )
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from e
 
     return UserMessageResponse(message=strings.RESET_PASSWORD_LINK_SUCCESS)
 
@@ -428,7 +432,7 @@ async def process_reset_password_form(
         password: Annotated[str, Form()],
         confirm_password: Annotated[str, Form()],
         token: Annotated[str, Form()],
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     Process reset password form data
@@ -459,7 +463,7 @@ async def process_reset_password_form(
         context["message"] = strings.INVALID_RESET_PASSWORD_LINK
         is_password_valid = False
 
-    db_user = crud.get_user_by_id(db=db, user_id=user_id)
+    db_user = await crud.get_user_by_id(db=db, user_id=user_id)
 
     if not db_user and is_password_valid:
         context["message"] = strings.INVALID_RESET_PASSWORD_LINK
@@ -483,8 +487,8 @@ async def process_reset_password_form(
 
     if is_password_valid:
         # Generate hashed password based on new password and update it
-        hashed_password = get_hashed_password(confirm_password)
-        crud.update_user(db=db, user=db_user, updated_data={
+        hashed_password = await get_hashed_password(confirm_password)
+        await crud.update_user(db=db, user=db_user, updated_data={
                          "password": hashed_password})
         context["is_valid"] = is_password_valid
 
@@ -0,0 +1,84 @@
+"""
+Contain in-process caches used across the application
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+import settings
+
+
+class TTLCache:
+    """
+    Least recently used cache, Whose entries also expire after the given number of seconds
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Return cached value of the given key or None if it is missing or expired
+        """
+
+        entry = self._data.get(key)
+
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Cache the given value, Evicting the least recently used entry if cache is full
+        """
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove the given key from the cache
+        """
+
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all the entries from the cache
+        """
+
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Return cache size and hit/miss counters
+        """
+
+        total = self.hits + self.misses
+
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Authenticated user snapshots keyed by user ID
+user_cache = TTLCache(max_size=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,81 @@
+"""
+Contain common management commands
+
+    python -m base.commands summarize-slow-queries --top 10
+"""
+
+import argparse
+import glob
+import json
+import re
+from collections import defaultdict
+
+import settings
+
+logger = settings.get_logger(name=__name__)
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Collapse whitespace and IN lists of a statement, So that the same query is grouped together
+    """
+
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return re.sub(r"IN \([^)]*\)", "IN (...)", statement)
+
+
+def summarize_slow_queries(pattern: str = None, top: int = 10) -> list[dict]:
+    """
+    Summarize slow query log files into the top offenders by total time
+
+    :param pattern: Glob pattern of the log files, Defaults to the files of all the workers
+    :param top: Number of offenders to report
+    :return: List of offenders, Slowest first
+    """
+
+    pattern = pattern or f"{settings.SLOW_QUERY_LOG_FILE}.*"
+    groups = defaultdict(list)
+
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                key = (record.get("caller"), normalize_statement(record["statement"]))
+                groups[key].append(record["duration_ms"])
+
+    offenders = sorted([{
+        "caller": caller,
+        "statement": statement,
+        "count": len(durations),
+        "total_ms": round(sum(durations), 2),
+        "mean_ms": round(sum(durations) / len(durations), 2),
+        "max_ms": max(durations),
+    } for (caller, statement), durations in groups.items()], key=lambda x: -x["total_ms"])
+
+    for offender in offenders[:top]:
+        logger.info(
+            "%10.2f ms total  %6d calls  %8.2f ms mean  %8.2f ms max  %s\n    %s",
+            offender["total_ms"], offender["count"], offender["mean_ms"], offender["max_ms"],
+            offender["caller"], offender["statement"]
+        )
+
+    return offenders[:top]
+
+
+COMMANDS = {
+    "summarize-slow-queries": summarize_slow_queries,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=COMMANDS.keys())
+    parser.add_argument("--file", help="Glob pattern of the slow query log files")
+    parser.add_argument("--top", type=int, default=10, help="Number of offenders to report")
+    args = parser.parse_args()
+
+    COMMANDS[args.command](args.file, args.top)
@@ -2,29 +2,69 @@
 Base dependencies for routes
 """
 
-from fastapi import Request, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import time
 
+from fastapi import Request, Response, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import settings
 import strings
 from auth import models, crud
 from base.utils import get_jwt_payload
-from database import SessionLocal
+from database import SessionLocal, ReplicaSessionLocal, replica_monitor
+
+# Cookie holding the time until which reads of the client are served by the primary
+PRIMARY_STICKY_COOKIE = "read_primary_until"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+async def get_db(request: Request, response: Response):
+    """
+    A common function for getting a primary database session.
+    Writing requests make the following reads of the client stick to the primary for a while,
+    So that the client can read its own writes.
+    :return None
+    """
+
+    if replica_monitor and request.method not in SAFE_METHODS:
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            str(time.time() + settings.DB_PRIMARY_STICKY_SECONDS),
+            max_age=settings.DB_PRIMARY_STICKY_SECONDS,
+            httponly=True
+        )
+
+    async with SessionLocal() as db:
+        yield db
 
 
-async def get_db():
+async def get_read_db(request: Request):
     """
-    A common function for getting a database session
+    A common function for getting a database session for public reads.
+    Served by the replica, Unless it is lagging/unreachable or the client has written recently.
+    Reads of the replica and of a client which has written recently bypass the response cache,
+    So that it is only filled from the primary and the writer never gets a stale response.
     :return None
     """
 
-    db = SessionLocal()
     try:
+        is_sticky = float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        is_sticky = False
+
+    if replica_monitor and not is_sticky and replica_monitor.is_usable():
+        session_maker = ReplicaSessionLocal
+    else:
+        session_maker = SessionLocal
+
+    request.state.bypass_response_cache = is_sticky or session_maker is ReplicaSessionLocal
+
+    async with session_maker() as db:
         yield db
-    finally:
-        db.close()
 
 
-async def get_current_user(request: Request, db: Session = Depends(get_db)) -> models.User:
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)) -> models.User:
     """
     A common function for getting user object from the token passed into the headers
 
@@ -50,7 +90,7 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)) -> m
     if not user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=strings.AUTH_ERROR)
 
-    db_user = crud.get_user_by_id(db=db, user_id=user_id)
+    db_user = await crud.get_user_by_id_cached(db=db, user_id=user_id)
 
     if not db_user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=strings.AUTH_ERROR)
@@ -1,13 +1,23 @@
 """
-Contains email related util functions
+Contains email related util functions.
+
+Emails are not sent within the request, Instead they are queued into the outbox table
+and delivered by a background sender which reuses authenticated SMTP connections.
 """
 
+import asyncio
 import smtplib
-import traceback
+import uuid
+from datetime import datetime, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
 import settings
+from base.models import EmailOutbox
+from database import SessionLocal
 
 logger = settings.get_logger(name=__name__)
 
@@ -53,16 +63,19 @@ def create_multipart_message(
 
 
 async def send_mail(
+    db: AsyncSession,
     title: str,
     text: str = None,
     html: str = None,
-) -> bool:
+) -> EmailOutbox:
     """
-    Send email to recipient's, Using SMTP credentials.
+    Queue email to recipient's, It will be delivered by the background email sender.
 
+    :param db: DB session object
     :param title: The title of the email.
     :param text: The text version of the email body (optional).
     :param html: The html version of the email body (optional).
+    :return: Outbox DB object
     """
 
     # Use default email address to send free emails specifically while using AWS SES
@@ -75,23 +88,225 @@ async def send_mail(
         html
     )
 
-    try:
-        # Connect to the SMTP server
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            # Start TLS connection
+    db_email = EmailOutbox(
+        id=uuid.uuid4(),
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        sender=settings.FROM_EMAIL,
+        recipients=recipients,
+        message=message.as_string(),
+        status=EmailOutbox.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+
+    db.add(db_email)
+    await db.commit()
+
+    email_sender.notify()
+
+    return db_email
+
+
+class SMTPConnection:
+    """
+    SMTP connection which stays connected and authenticated between messages
+    """
+
+    def __init__(self):
+        self.server = None
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            settings.SMTP_SERVER,
+            int(settings.SMTP_PORT),
+            timeout=settings.SMTP_TIMEOUT_SECONDS
+        )
+
+        if settings.SMTP_USE_TLS:
             server.starttls()
-            # Login to the SMTP server
+        if settings.SMTP_USERNAME:
             server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            # Send the email
-            server.sendmail(settings.FROM_EMAIL,
-                            recipients, message.as_string())
-
-        logger.info("Email sent successfully!")
-        return True
-
-    except (smtplib.SMTPException, smtplib.SMTPResponseException) as e:
-        logger.error({
-            "error": str(e),
-            "traceback": traceback.format_exc()
-        })
-        return False
+
+        return server
+
+    def send(self, sender: str, recipients: list, message: str) -> None:
+        """
+        Send a single message, Reconnecting once if the server dropped the idle connection
+        """
+
+        if self.server is None:
+            self.server = self._connect()
+
+        try:
+            self.server.sendmail(sender, recipients, message)
+        except smtplib.SMTPServerDisconnected:
+            self.server = self._connect()
+            self.server.sendmail(sender, recipients, message)
+
+    def send_batch(self, emails: list[EmailOutbox]) -> list[str | None]:
+        """
+        Send the given emails one after another over this connection
+
+        :param emails: List of outbox objects
+        :return: List of error message (or None if sent) of each email
+        """
+
+        errors = []
+
+        for email in emails:
+            try:
+                self.send(email.sender, email.recipients, email.message)
+                errors.append(None)
+
+            except (smtplib.SMTPException, OSError) as e:
+                errors.append(str(e))
+
+                # Connection state is unknown after a failure, Start afresh for the next email
+                if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                    self.close()
+
+        return errors
+
+    def close(self) -> None:
+        """
+        Close the connection, If it is open
+        """
+
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+            self.server = None
+
+
+class EmailSender:
+    """
+    Background task which delivers queued emails in batches over a pool of SMTP connections.
+    Rows are claimed with `SKIP LOCKED`, So every gunicorn worker can run a sender safely.
+    """
+
+    def __init__(self, pool_size: int, batch_size: int, poll_seconds: int):
+        self.connections = [SMTPConnection() for _ in range(pool_size)]
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def notify(self) -> None:
+        """
+        Wake up the sender, Instead of waiting for the next poll
+        """
+
+        self.wakeup.set()
+
+    def start(self) -> None:
+        """
+        Start sending emails in the background
+        """
+
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background task and close the SMTP connections
+        """
+
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+        for connection in self.connections:
+            await asyncio.to_thread(connection.close)
+
+    async def _run(self) -> None:
+        failures = 0
+
+        while True:
+            try:
+                sent_count = await self.process_batch()
+                failures = 0
+
+            # Any error (DB, SMTP settings or a bug) must not end the task, Or queued emails
+            # would never be sent. Cancellation is not an Exception, So stop() still ends it.
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.exception({"error": str(e)})
+                failures += 1
+                await asyncio.sleep(min(
+                    self.poll_seconds * 2 ** (failures - 1),
+                    settings.EMAIL_SENDER_MAX_BACKOFF_SECONDS
+                ))
+                continue
+
+            # Wait for new emails only when the outbox is drained
+            if sent_count < self.batch_size:
+                self.wakeup.clear()
+
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def process_batch(self) -> int:
+        """
+        Claim a batch of due emails and send them, Failed emails are retried with backoff
+
+        :return: Number of processed emails
+        """
+
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(EmailOutbox).where(
+                    EmailOutbox.status == EmailOutbox.PENDING,
+                    EmailOutbox.next_attempt_at <= datetime.utcnow()
+                ).order_by(
+                    EmailOutbox.next_attempt_at
+                ).limit(self.batch_size).with_for_update(skip_locked=True)
+            )
+            emails = result.scalars().all()
+
+            if not emails:
+                return 0
+
+            # Spread the batch across the pooled connections
+            chunks = [emails[i::len(self.connections)] for i in range(len(self.connections))]
+            results = await asyncio.gather(*(
+                asyncio.to_thread(connection.send_batch, chunk)
+                for connection, chunk in zip(self.connections, chunks)
+            ))
+
+            now = datetime.utcnow()
+
+            for chunk, errors in zip(chunks, results):
+                for email, error in zip(chunk, errors):
+                    email.modified_at = now
+                    email.attempts += 1
+
+                    if error is None:
+                        email.status = EmailOutbox.SENT
+                        email.sent_at = now
+                        continue
+
+                    email.last_error = error
+
+                    if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                        email.status = EmailOutbox.FAILED
+                        logger.error({"error": error, "email": str(email.id)})
+                    else:
+                        email.next_attempt_at = now + timedelta(
+                            seconds=settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+                        )
+
+            await db.commit()
+
+            return len(emails)
+
+
+email_sender = EmailSender(
+    pool_size=settings.EMAIL_SENDER_POOL_SIZE,
+    batch_size=settings.EMAIL_SENDER_BATCH_SIZE,
+    poll_seconds=settings.EMAIL_SENDER_POLL_SECONDS
+)
@@ -0,0 +1,160 @@
+"""
+Contain request level performance instrumentation, Exposed in the Prometheus text format.
+
+Each request records its latency, number of DB queries and time spent in the DB,
+Labelled by the route template (e.g. `/v1/movie/{movie_id}/`) instead of the raw path.
+When `PROMETHEUS_MULTIPROC_DIR` is set (see `gunicorn.conf.py`) every worker writes its
+samples into that directory, And `/metrics` aggregates them across all the workers.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+from database import engine, replica_engine
+
+# Label of the requests which did not match any route, Keeps the label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency in seconds",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10)
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of DB queries executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing DB queries per request in seconds",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+
+class RequestStats:
+    """
+    Holds DB usage of the current request
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_duration = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+# Route template of each endpoint, Built lazily from the application routes
+_route_paths = {}
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    if _request_stats.get() is not None:
+        conn.info["query_start_time"] = time.perf_counter()
+
+
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    stats = _request_stats.get()
+    start = conn.info.pop("query_start_time", None)
+
+    if stats is not None and start is not None:
+        stats.queries += 1
+        stats.db_duration += time.perf_counter() - start
+
+
+# Queries served by the replica are counted as well
+for _engine in filter(None, (engine, replica_engine)):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _start_query_timer)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _stop_query_timer)
+
+
+def get_route_path(scope: dict) -> str:
+    """
+    Return route template of the matched endpoint
+
+    :param scope: ASGI scope, After it has been routed
+    :return: Route template or `unmatched`
+    """
+
+    endpoint = scope.get("endpoint")
+
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+
+    if endpoint not in _route_paths:
+        _route_paths.update({
+            route.endpoint: route.path
+            for route in scope["app"].routes if hasattr(route, "endpoint")
+        })
+
+    return _route_paths.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency and DB usage of every HTTP request.
+    It does not wrap the request/response objects, So the per request overhead stays small.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def _send(message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            duration = time.perf_counter() - start
+            _request_stats.reset(token)
+
+            method = scope["method"]
+            route = get_route_path(scope)
+
+            REQUEST_DURATION.labels(method, route, str(status_code)).observe(duration)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+            REQUEST_DB_DURATION.labels(method, route).observe(stats.db_duration)
+
+
+def get_metrics() -> tuple[bytes, str]:
+    """
+    Return all the metrics in the Prometheus text format, Aggregated across the workers
+    when running in the multiprocess mode
+
+    :return: Tuple of metrics and its content type
+    """
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
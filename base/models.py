@@ -0,0 +1,41 @@
+"""
+Contain application wide models, Which are not related to a specific app
+"""
+
+import sqlalchemy as sa
+
+from database import Base
+
+
+class EmailOutbox(Base):
+    """
+    Email queued for delivery, Picked up and sent by the background email sender
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    id = sa.Column(sa.UUID, primary_key=True, index=True)
+    created_at = sa.Column(sa.DateTime)
+    modified_at = sa.Column(sa.DateTime)
+
+    sender = sa.Column(sa.String)
+    recipients = sa.Column(sa.JSON, default=[])
+    # Complete MIME message
+    message = sa.Column(sa.Text)
+
+    status = sa.Column(sa.String, default=PENDING)
+    attempts = sa.Column(sa.Integer, default=0)
+    next_attempt_at = sa.Column(sa.DateTime)
+    sent_at = sa.Column(sa.DateTime, nullable=True)
+    last_error = sa.Column(sa.Text, nullable=True)
+
+    __tablename__ = "email_outbox"
+
+    __table_args__ = (
+        sa.Index("email_outbox_status_next_attempt_idx", "status", "next_attempt_at"),
+    )
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
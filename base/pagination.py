@@ -0,0 +1,140 @@
+"""
+Contain keyset (cursor) pagination util functions
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+
+import sqlalchemy as sa
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import strings
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode sort key values of a row into an opaque cursor string
+
+    :param values: List of sort key values
+    :return: URL safe cursor string
+    """
+
+    data = json.dumps(values, default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("utf-8")
+
+
+def parse_integer(value, column_type: sa.Integer) -> int:
+    """
+    Validate an integer sort key value of a cursor, Within the range of its column type
+
+    :param value: Decoded JSON value
+    :param column_type: SQLAlchemy integer type of the sort key
+    :return: Integer value
+    :raises ValueError: If the value is not an integer or is out of range
+    """
+
+    bits = 63 if isinstance(column_type, sa.BigInteger) else 31
+
+    # bool is a subclass of int, But it is never a valid sort key value
+    if isinstance(value, bool) or not isinstance(value, int) or not -2 ** bits <= value < 2 ** bits:
+        raise ValueError(value)
+
+    return value
+
+
+def parse_number(value) -> float:
+    """
+    Validate a floating point sort key value of a cursor
+
+    :param value: Decoded JSON value
+    :return: Float value
+    :raises ValueError: If the value is not a number
+    """
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(value)
+
+    return float(value)
+
+
+def decode_cursor(cursor: str, order_by: list) -> list:
+    """
+    Decode an opaque cursor string back to the typed sort key values
+
+    :param cursor: Cursor string passed by the client
+    :param order_by: List of sort key expressions, The cursor was generated from
+    :return: List of sort key values
+    """
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise ValueError(cursor)
+
+        parsed_values = []
+
+        for value, expression in zip(values, order_by):
+            if isinstance(expression.type, sa.DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(expression.type, sa.Uuid):
+                value = uuid.UUID(value)
+            elif isinstance(expression.type, sa.Integer):
+                value = parse_integer(value, expression.type)
+            elif isinstance(expression.type, (sa.Float, sa.Numeric)):
+                value = parse_number(value)
+
+            parsed_values.append(value)
+
+        return parsed_values
+
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise HTTPException(
+            detail=strings.INVALID_CURSOR,
+            status_code=status.HTTP_400_BAD_REQUEST
+        ) from e
+
+
+async def get_page(
+    db: AsyncSession,
+    query: sa.Select,
+    order_by: list,
+    limit: int,
+    offset: int = 0,
+    cursor: str = None
+) -> tuple[list, str | None]:
+    """
+    Execute the given query one page at a time, Rows are ordered descending by the given
+    sort key. When a cursor is passed rows are seeked using the sort key, Instead of the offset.
+
+    :param db: DB Session object
+    :param query: Select query of a single ORM entity
+    :param order_by: List of sort key expressions, Last one must be unique (i.e. ID)
+    :param limit: Limit the resulting rows
+    :param offset: Offset for the rows, Ignored when a cursor is passed
+    :param cursor: Cursor returned along with the previous page
+    :return: Tuple of list of objects and cursor of the next page
+    """
+
+    if cursor:
+        values = decode_cursor(cursor, order_by)
+        query = query.where(sa.tuple_(*order_by) < sa.tuple_(*[
+            sa.literal(value, type_=expression.type)
+            for value, expression in zip(values, order_by)
+        ]))
+    else:
+        query = query.offset(offset)
+
+    # Sort key values are selected along with the objects, For building the next cursor
+    query = query.add_columns(*order_by).order_by(
+        *[expression.desc() for expression in order_by]
+    ).limit(limit)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = encode_cursor(list(rows[-1][1:])) if rows and len(rows) == limit else None
+
+    return [row[0] for row in rows], next_cursor
@@ -0,0 +1,53 @@
+"""
+Contain util for counting the DB queries executed within a block of code
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from database import engine, replica_engine
+
+
+class QueryCounter:
+    """
+    Holds number of queries executed while the counter is active
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+
+_active_counter: ContextVar[QueryCounter | None] = ContextVar("active_counter", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    counter = _active_counter.get()
+
+    if counter is not None:
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+for _engine in filter(None, (engine, replica_engine)):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _count_query)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the queries executed by the current task while inside the block
+
+    :return: Instance of query counter
+    """
+
+    counter = QueryCounter()
+    token = _active_counter.set(counter)
+
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
@@ -0,0 +1,237 @@
+"""
+Contain response cache for public read endpoints, Along with ETag based conditional GET.
+
+Cached responses are keyed on path + query and on the version of the namespaces
+they depend on (e.g. `movies`, `movie:<id>`). Writes bump the namespace version,
+So every stale key is skipped at once without scanning the cache.
+"""
+
+import hashlib
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+import settings
+from base.cache import TTLCache
+
+# Namespace of all the movie lists
+MOVIES_NAMESPACE = "movies"
+
+
+def get_movie_namespace(movie_id) -> str:
+    """
+    Return cache namespace of a single movie, Its detail and ratings depend upon it
+    """
+
+    return f"movie:{movie_id}"
+
+
+def get_user_namespace(user_id) -> str:
+    """
+    Return cache namespace of a user, The authenticated user cache depends upon it
+    """
+
+    return f"user:{user_id}"
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache backend, Namespace versions are local to the worker
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+        self.versions = {}
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        Return cached value of the given key
+        """
+
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        """
+        Cache the given value
+        """
+
+        self.cache.set(key, value)
+
+    async def get_versions(self, namespaces: list[str]) -> list[int]:
+        """
+        Return current version of each namespace
+        """
+
+        return [self.versions.get(namespace, 0) for namespace in namespaces]
+
+    async def bump_version(self, namespace: str) -> None:
+        """
+        Increment version of the given namespace
+        """
+
+        self.versions[namespace] = self.versions.get(namespace, 0) + 1
+
+
+class RedisCacheBackend:
+    """
+    Redis cache backend, Namespace versions are shared by all the workers.
+    Any client with the `redis.asyncio` interface can be used, e.g. `fakeredis.aioredis`.
+    """
+
+    def __init__(self, client, ttl: int, prefix: str = "yify"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        Return cached value of the given key
+        """
+
+        return await self.client.get(f"{self.prefix}:{key}")
+
+    async def set(self, key: str, value: bytes) -> None:
+        """
+        Cache the given value
+        """
+
+        await self.client.set(f"{self.prefix}:{key}", value, ex=self.ttl)
+
+    async def get_versions(self, namespaces: list[str]) -> list[int]:
+        """
+        Return current version of each namespace
+        """
+
+        values = await self.client.mget([
+            f"{self.prefix}:version:{namespace}" for namespace in namespaces
+        ])
+        return [int(value or 0) for value in values]
+
+    async def bump_version(self, namespace: str) -> None:
+        """
+        Increment version of the given namespace
+        """
+
+        await self.client.incr(f"{self.prefix}:version:{namespace}")
+
+
+class ResponseCache:
+    """
+    Cache serialized JSON responses and answer conditional GET requests
+    """
+
+    # Cached value is the ETag followed by the response body
+    SEPARATOR = b"\n"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        # Responses built without the cache, Read from the replica or for a recent writer
+        self.bypasses = 0
+
+    async def get_response(
+        self,
+        request: Request,
+        namespaces: list[str],
+        build: Callable[[], Awaitable[tuple[BaseModel, str | None]]]
+    ) -> Response:
+        """
+        Return cached response of the request, Or build and cache it.
+        Requests marked with `bypass_response_cache` (see `get_read_db`) neither read nor fill
+        the cache, Since they may be served by a lagging replica.
+
+        :param request: Request object
+        :param namespaces: Namespaces the response depends upon
+        :param build: Coroutine function returning the response schema instance and its ETag,
+            ETag is derived from the response body when None is returned
+        :return: JSON response or 304 response if client already has the same version
+        """
+
+        if getattr(request.state, "bypass_response_cache", False):
+            self.bypasses += 1
+            key = cached = None
+        else:
+            versions = await self.backend.get_versions(namespaces)
+            query = "&".join(
+                sorted(f"{key}={value}" for key, value in request.query_params.items())
+            )
+            key = f"response:{request.url.path}?{query}:" + ",".join(
+                f"{namespace}={version}" for namespace, version in zip(namespaces, versions)
+            )
+            cached = await self.backend.get(key)
+
+        if cached is not None:
+            self.hits += 1
+            etag, body = cached.split(self.SEPARATOR, 1)
+            etag = etag.decode("utf-8")
+        else:
+            data, etag = await build()
+            body = data.model_dump_json().encode("utf-8")
+            etag = etag or f'"{hashlib.sha1(body).hexdigest()}"'
+
+            if key is not None:
+                self.misses += 1
+                await self.backend.set(key, etag.encode("utf-8") + self.SEPARATOR + body)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+
+        if if_none_match == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def get_versions(self, *namespaces: str) -> list[int]:
+        """
+        Return current version of each namespace, Shared by all the workers with redis backend
+        """
+
+        return await self.backend.get_versions(list(namespaces))
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """
+        Invalidate all the cached responses depending on the given namespaces
+        """
+
+        for namespace in namespaces:
+            await self.backend.bump_version(namespace)
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss counters of the response cache
+        """
+
+        total = self.hits + self.misses
+
+        return {
+            "backend": settings.RESPONSE_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def get_backend():
+    """
+    Create cache backend configured in the settings
+    """
+
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        # Redis is an optional dependency, Only needed when the redis backend is used
+        from redis import asyncio as redis  # pylint: disable=import-outside-toplevel
+
+        return RedisCacheBackend(
+            client=redis.from_url(settings.REDIS_URL),
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+        )
+
+    return MemoryCacheBackend(
+        max_size=settings.RESPONSE_CACHE_SIZE,
+        ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+    )
+
+
+response_cache = ResponseCache(backend=get_backend())
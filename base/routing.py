@@ -0,0 +1,113 @@
+"""
+Contain API route class rendering the returned response models straight into JSON.
+
+By default FastAPI dumps the returned model into a dict, Validates it against the
+`response_model` once more, Serializes it into another dict and encodes that with the
+stdlib `json`. Returned models are already validated on construction, So this route
+encodes them in one step with the (Rust) JSON serializer of pydantic-core instead.
+Anything else returned by the endpoint (dicts, ORM objects) is still validated first,
+Sparse fieldset responses are encoded as they are and `Response` objects are passed through.
+"""
+
+import inspect
+from functools import wraps
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+from base.sparse import SparseModel
+
+# Name of the parameter added to the endpoints which don't declare a `Response` one
+SUB_RESPONSE_PARAM = "_sub_response"
+
+
+def render_json(adapter: TypeAdapter, response_model: type[BaseModel], content) -> bytes:
+    """
+    Encode the content as the response model
+
+    :param adapter: Type adapter of the response model
+    :param response_model: Pydantic model declared as the response of the route
+    :param content: Value returned by the endpoint
+    :return: JSON encoded body
+    """
+
+    # Sparse fieldset responses are copies of the response model, Encoded with their own fields
+    if isinstance(content, SparseModel):
+        return content.model_dump_json(by_alias=True).encode("utf-8")
+
+    if not isinstance(content, response_model):
+        content = adapter.validate_python(content, from_attributes=True)
+
+    # Subclass instances are serialized with the fields of the response model only
+    return adapter.dump_json(content, by_alias=True)
+
+
+def get_rendering_endpoint(endpoint, response_model: type[BaseModel], status_code: int | None):
+    """
+    Wrap the endpoint, So that it returns a response with the already encoded body.
+    Status code and headers set on the `Response` parameter are copied to it, As FastAPI
+    does for the responses it creates.
+
+    :param endpoint: Async endpoint function
+    :param response_model: Pydantic model declared as the response of the route
+    :param status_code: Default status code of the route
+    :return: Wrapped endpoint function
+    """
+
+    adapter = TypeAdapter(response_model)
+    signature = inspect.signature(endpoint)
+    parameters = list(signature.parameters.values())
+    response_param = next(
+        (param.name for param in parameters if param.annotation is Response), None
+    )
+
+    if response_param is None:
+        parameters.append(inspect.Parameter(
+            SUB_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+        ))
+
+    @wraps(endpoint)
+    async def render(**values):
+        if response_param is None:
+            sub_response = values.pop(SUB_RESPONSE_PARAM)
+        else:
+            sub_response = values[response_param]
+
+        content = await endpoint(**values)
+
+        if isinstance(content, Response):
+            return content
+
+        response = Response(
+            content=render_json(adapter, response_model, content),
+            status_code=sub_response.status_code or status_code or 200,
+            media_type="application/json"
+        )
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    render.__signature__ = signature.replace(parameters=parameters)
+    render.is_rendering_endpoint = True
+    return render
+
+
+class ModelRoute(APIRoute):
+    """
+    API route skipping the second validation of the returned response model,
+    Used by all the routers
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        response_model = kwargs.get("response_model")
+
+        if (
+            inspect.isclass(response_model)
+            and issubclass(response_model, BaseModel)
+            and inspect.iscoroutinefunction(endpoint)
+            # Routes are created again when the router is included in the app
+            and not getattr(endpoint, "is_rendering_endpoint", False)
+        ):
+            endpoint = get_rendering_endpoint(endpoint, response_model, kwargs.get("status_code"))
+
+        super().__init__(path, endpoint, **kwargs)
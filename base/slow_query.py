@@ -0,0 +1,149 @@
+"""
+Contain opt-in slow query log, Enabled with `SLOW_QUERY_LOG_ENABLED=true`.
+
+Statements taking longer than the threshold are written as JSON lines into a rotating file,
+Along with their bound parameters and the CRUD function which issued them. Optionally the
+plan is captured as well, `EXPLAIN (ANALYZE, BUFFERS)` for SELECT statements and a plain
+`EXPLAIN` for the rest, As analyzing a write would execute it twice.
+Every worker process writes its own file (suffixed with the PID), So rotation is safe.
+"""
+
+import inspect
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import greenlet
+from sqlalchemy import event
+
+import settings
+from database import engine, replica_engine
+
+# Modules whose functions are reported as the caller of a slow statement
+CRUD_MODULES = ("movies.crud", "request.crud", "auth.crud")
+
+SAVEPOINT = "slow_query_explain"
+
+logger = logging.getLogger("slow_query")
+
+
+def get_crud_caller() -> str | None:
+    """
+    Return the CRUD function which issued the current statement.
+    Async session runs the statement inside a greenlet, So the stack of the parent greenlets
+    (where the CRUD coroutine is awaiting) is searched as well.
+
+    :return: Dotted path of the CRUD function or None
+    """
+
+    frame = inspect.currentframe()
+    current = greenlet.getcurrent()
+
+    while True:
+        while frame is not None:
+            module = frame.f_globals.get("__name__")
+
+            if module in CRUD_MODULES:
+                return f"{module}.{frame.f_code.co_name}"
+
+            frame = frame.f_back
+
+        current = current.parent
+
+        if current is None:
+            return None
+
+        frame = current.gr_frame
+
+
+def explain(conn, statement: str, parameters) -> list[str] | None:
+    """
+    Capture plan of the given statement, Within a savepoint so that a failure
+    does not abort the transaction of the request
+
+    :param conn: SQLAlchemy connection which executed the statement
+    :param statement: SQL statement
+    :param parameters: Bound parameters
+    :return: Lines of the plan or None if it could not be captured
+    """
+
+    is_select = statement.lstrip().upper().startswith("SELECT")
+    options = "(ANALYZE, BUFFERS) " if is_select else ""
+
+    # A separate cursor keeps the result of the original statement intact
+    cursor = conn.connection.cursor()
+
+    try:
+        cursor.execute(f"SAVEPOINT {SAVEPOINT}")
+
+        try:
+            cursor.execute(f"EXPLAIN {options}{statement}", parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"RELEASE SAVEPOINT {SAVEPOINT}")
+            return plan
+
+        except conn.dialect.dbapi.Error:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+            return None
+
+    except conn.dialect.dbapi.Error:
+        return None
+
+    finally:
+        cursor.close()
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    conn.info["slow_query_start_time"] = time.perf_counter()
+
+
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    start = conn.info.pop("slow_query_start_time", None)
+
+    if start is None:
+        return
+
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    record = {
+        "time": datetime.utcnow().isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "caller": get_crud_caller(),
+        "statement": statement,
+        "parameters": parameters,
+    }
+
+    if settings.SLOW_QUERY_EXPLAIN and not executemany:
+        record["plan"] = explain(conn, statement, parameters)
+
+    logger.warning(json.dumps(record, default=str))
+
+
+def enable_slow_query_log() -> None:
+    """
+    Start logging slow statements of the engine, Calling it again is a no-op
+    """
+
+    if event.contains(engine.sync_engine, "after_cursor_execute", _log_slow_query):
+        return
+
+    handler = RotatingFileHandler(
+        f"{settings.SLOW_QUERY_LOG_FILE}.{os.getpid()}",
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    for db_engine in filter(None, (engine, replica_engine)):
+        event.listen(db_engine.sync_engine, "before_cursor_execute", _start_timer)
+        event.listen(db_engine.sync_engine, "after_cursor_execute", _log_slow_query)
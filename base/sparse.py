@@ -0,0 +1,100 @@
+"""
+Contain sparse fieldset helpers, Letting the clients pick the fields of the items of a response
+with the `fields` query param (e.g. `?fields=id,name,year`).
+
+A sparse response is an instance of a copy of the response schema, Whose items have the picked
+fields only. So it is still encoded by pydantic-core in a single step, And the CRUD functions
+load only the columns of the picked fields.
+"""
+
+from functools import lru_cache
+from typing import get_args, get_origin
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+
+import strings
+
+
+class SparseModel(BaseModel):
+    """
+    Base of the sparse copies of the schemas, Read from the ORM objects
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> frozenset[str] | None:
+    """
+    Parse the comma separated field names passed by the client
+
+    :param fields: Value of the `fields` query param
+    :param model: Schema of the items the fields are picked from
+    :return: Set of the picked field names, None when all the fields are wanted
+    """
+
+    if not fields:
+        return None
+
+    picked_fields = frozenset(field.strip() for field in fields.split(",") if field.strip())
+
+    if not picked_fields or not picked_fields <= model.model_fields.keys():
+        raise HTTPException(
+            detail=strings.INVALID_FIELDS_ERROR.format(", ".join(model.model_fields)),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    return picked_fields
+
+
+@lru_cache(maxsize=1024)
+def get_sparse_model(model: type[BaseModel], fields: frozenset[str]) -> type[SparseModel]:
+    """
+    Return a copy of the schema with the given fields only, In the order of the schema
+
+    :param model: Pydantic schema
+    :param fields: Set of field names to keep
+    :return: Sparse schema class
+    """
+
+    return create_model(
+        model.__name__,
+        __base__=SparseModel,
+        __module__=model.__module__,
+        **{name: (field.annotation, field) for name, field in model.model_fields.items()
+           if name in fields}
+    )
+
+
+@lru_cache(maxsize=1024)
+def get_sparse_response_model(
+    response_model: type[BaseModel],
+    items_field: str,
+    fields: frozenset[str] | None
+) -> type[BaseModel]:
+    """
+    Return a copy of the response schema, Whose items have the given fields only
+
+    :param response_model: Pydantic response schema
+    :param items_field: Name of the field holding the item or list of items
+    :param fields: Set of item field names to keep, None to keep all of them
+    :return: Sparse response schema class, Or the response schema itself when fields is None
+    """
+
+    if fields is None:
+        return response_model
+
+    annotation = response_model.model_fields[items_field].annotation
+
+    if get_origin(annotation) is list:
+        annotation = list[get_sparse_model(get_args(annotation)[0], fields)]
+    else:
+        annotation = get_sparse_model(annotation, fields)
+
+    return create_model(
+        response_model.__name__,
+        __base__=SparseModel,
+        __module__=response_model.__module__,
+        **{name: (annotation if name == items_field else field.annotation, field.default)
+           for name, field in response_model.model_fields.items()}
+    )
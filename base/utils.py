@@ -1,37 +1,95 @@
 """
 Contain a centralize util functions
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta
+from typing import Callable
 
 import bcrypt
 import jwt
+from fastapi import HTTPException, status
 
 import settings
 import strings
 from auth.models import User
 
 
-def get_hashed_password(password: str) -> str:
+class BoundedExecutor:
     """
-    Generate hashed password from raw password string
+    Thread pool which runs blocking functions outside the event loop,
+    And rejects new work once the given number of tasks are already waiting
     """
 
+    def __init__(self, max_workers: int, queue_limit: int, retry_after: int, name: str):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.max_pending = max_workers + queue_limit
+        self.retry_after = retry_after
+        self.pending = 0
+
+    async def run(self, func: Callable, *args):
+        """
+        Run the given function in the pool and wait for its result
+
+        :param func: Blocking function
+        :param args: Function arguments
+        :return: Function result
+        """
+
+        # Apply back-pressure instead of queueing unbounded work
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                detail=strings.SERVER_BUSY,
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+        self.pending += 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+
+# bcrypt releases the GIL, So hashing in threads does not block the event loop
+password_executor = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+    name="password-hash"
+)
+
+
+def _hash_password(password: str) -> str:
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
     return hashed_password.decode('utf-8')
 
 
-def check_password(raw_password: str, hashed_password: str) -> bool:
-    """
-    Validate raw/input password with hashed password
-    """
-
+def _check_password(raw_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         raw_password.encode('utf-8'),
         hashed_password.encode('utf-8')
     )
 
 
+async def get_hashed_password(password: str) -> str:
+    """
+    Generate hashed password from raw password string
+    """
+
+    return await password_executor.run(_hash_password, password)
+
+
+async def check_password(raw_password: str, hashed_password: str) -> bool:
+    """
+    Validate raw/input password with hashed password
+    """
+
+    return await password_executor.run(_check_password, raw_password, hashed_password)
+
+
 def has_digits(password: str) -> bool:
     """
     Function for checking if password contains a digit or not
@@ -0,0 +1,3 @@
+"""
+Benchmark scripts for measuring the API and DB performance
+"""
@@ -0,0 +1,127 @@
+"""
+Measure email delivery throughput in messages/second against a local aiosmtpd server,
+Comparing a fresh SMTP connection per email with the pooled connections of the email sender.
+
+    python -m benchmarks.email_throughput --messages 1000 --pool-size 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiosmtpd.controller import Controller
+
+import settings
+from base.emails import SMTPConnection, create_multipart_message
+from base.models import EmailOutbox
+from benchmarks.utils import print_results
+
+
+class CountingHandler:
+    """
+    aiosmtpd handler which only counts the received messages
+    """
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):  # pylint: disable=invalid-name
+        """
+        Accept every message
+        """
+
+        # pylint: disable=unused-argument
+        self.received += 1
+        return "250 OK"
+
+
+def build_emails(count: int) -> list[EmailOutbox]:
+    """
+    Build unsaved outbox objects, Carrying a small HTML email
+    """
+
+    message = create_multipart_message(
+        "Yify <noreply@example.com>", ["user@example.com"], "Benchmark", html="<p>Hello</p>"
+    ).as_string()
+
+    return [
+        EmailOutbox(sender="noreply@example.com", recipients=["user@example.com"], message=message)
+        for _ in range(count)
+    ]
+
+
+def send_fresh(emails: list[EmailOutbox]) -> None:
+    """
+    Old behaviour, Connect (and authenticate) for every single email
+    """
+
+    for email in emails:
+        connection = SMTPConnection()
+        connection.send_batch([email])
+        connection.close()
+
+
+async def send_pooled(emails: list[EmailOutbox], pool_size: int) -> None:
+    """
+    Email sender behaviour, Spread the emails over long-lived connections
+    """
+
+    connections = [SMTPConnection() for _ in range(pool_size)]
+    chunks = [emails[i::pool_size] for i in range(pool_size)]
+
+    await asyncio.gather(*(
+        asyncio.to_thread(connection.send_batch, chunk)
+        for connection, chunk in zip(connections, chunks)
+    ))
+
+    for connection in connections:
+        connection.close()
+
+
+async def main(messages: int, pool_size: int, port: int) -> list[dict]:
+    """
+    Run both delivery modes against the same local SMTP server
+    """
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    settings.SMTP_SERVER = "127.0.0.1"
+    settings.SMTP_PORT = str(port)
+    settings.SMTP_USE_TLS = False
+    settings.SMTP_USERNAME = None
+
+    results = []
+
+    try:
+        for name, send in (
+            ("fresh connection per email", lambda emails: asyncio.to_thread(send_fresh, emails)),
+            (f"pooled ({pool_size} connections)", lambda emails: send_pooled(emails, pool_size)),
+        ):
+            handler.received = 0
+            start = time.perf_counter()
+            await send(build_emails(messages))
+            elapsed = time.perf_counter() - start
+
+            results.append({
+                "name": name,
+                "messages": messages,
+                "received": handler.received,
+                "seconds": round(elapsed, 3),
+                "messages_per_second": round(handler.received / elapsed, 2),
+            })
+    finally:
+        controller.stop()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=settings.EMAIL_SENDER_POOL_SIZE)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.messages, args.pool_size, args.port)))
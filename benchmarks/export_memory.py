@@ -0,0 +1,74 @@
+"""
+Measure peak memory (RSS) while exporting the movie catalog, Optionally seeding
+synthetic movies first. Peak RSS should stay flat as the number of rows grows.
+
+    python -m benchmarks.export_memory --seed 1000000 --email user@example.com
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+
+from auth import crud as auth_crud
+from benchmarks.movie_import import generate_lines
+from benchmarks.utils import print_results
+from database import SessionLocal, engine
+from movies import crud, exporter, importer
+
+
+def get_peak_rss_mb() -> float:
+    """
+    Return peak resident memory of the current process in MB
+    """
+
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+
+
+async def main(seed: int, email: str, file_format: str, batch_size: int) -> dict:
+    """
+    Export all the movies and report rows, bytes, time and peak RSS
+    """
+
+    if seed:
+        async with SessionLocal() as db:
+            db_user = await auth_crud.get_user_by_email(db=db, email=email)
+            await importer.import_movies(
+                db, generate_lines(seed, "Export"), importer.NDJSON, db_user.id
+            )
+
+    rss_before = get_peak_rss_mb()
+    rows = 0
+    size = 0
+    start = time.perf_counter()
+
+    async for chunk in exporter.export_rows(
+        crud.stream_movies_db, file_format, exporter.MOVIE_COLUMNS, batch_size=batch_size
+    ):
+        rows += chunk.count("\n")
+        size += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    return {
+        "format": file_format,
+        "rows": rows,
+        "megabytes": round(size / 1024 / 1024, 2),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_before_mb": rss_before,
+        "peak_rss_after_mb": get_peak_rss_mb(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic movies to import first")
+    parser.add_argument("--email", help="User adding the seeded movies")
+    parser.add_argument("--format", default=exporter.NDJSON, choices=list(exporter.MEDIA_TYPES))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.seed, args.email, args.format, args.batch_size)))
@@ -0,0 +1,112 @@
+"""
+Measure serialization of list responses, By serving the same `MovieListResponse` payload
+in-process from an app using the default FastAPI route and one using `ModelRoute`.
+No DB is needed, The payload is built from synthetic movies.
+
+    python -m benchmarks.json_response --items 1000 --requests 2000
+
+Both bodies are decoded and compared as well, So that the optimization can't change the output.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+
+from base.routing import ModelRoute
+from benchmarks.suggest_latency import generate_names
+from benchmarks.utils import summarize, print_results
+from movies import schemas
+
+PATH = "/movie/"
+
+
+def get_payload(count: int) -> schemas.MovieListResponse:
+    """
+    Build a movie list response of the given number of synthetic movies
+    """
+
+    rng = random.Random(0)
+    return schemas.MovieListResponse(results=[
+        schemas.MovieList(
+            id=uuid.uuid4(),
+            name=name,
+            year=rng.randint(1950, 2024),
+            avg_rating=round(rng.uniform(0, 10), 2)
+        ) for name in generate_names(count)
+    ], next_cursor="eyJ2YWx1ZXMiOiBbXX0=")
+
+
+def get_app(route_class: type[APIRoute], payload: schemas.MovieListResponse) -> FastAPI:
+    """
+    Build an app serving the payload with the given route class
+    """
+
+    router = APIRouter(route_class=route_class)
+
+    @router.get(path=PATH, response_model=schemas.MovieListResponse)
+    async def get_movie_list():
+        return payload
+
+    application = FastAPI()
+    application.include_router(router)
+    return application
+
+
+async def measure(client: httpx.AsyncClient, total: int) -> tuple[list[float], float, bytes]:
+    """
+    Call the route sequentially, Returning the latencies, elapsed time and the last body
+    """
+
+    latencies = []
+    start = time.perf_counter()
+
+    for _ in range(total):
+        call_start = time.perf_counter()
+        response = await client.get(PATH)
+        latencies.append(time.perf_counter() - call_start)
+
+    return latencies, time.perf_counter() - start, response.content
+
+
+async def main(items: int, total: int) -> list[dict]:
+    """
+    Serve the payload through both route classes and summarize them
+    """
+
+    payload = get_payload(items)
+    results = []
+    bodies = []
+
+    for name, route_class in (("default route", APIRoute), ("model route", ModelRoute)):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=get_app(route_class, payload)),
+            base_url="http://test"
+        ) as client:
+            # Warm up
+            await measure(client, 10)
+            latencies, elapsed, body = await measure(client, total)
+
+        results.append({
+            **summarize(f"GET {PATH} with {items} items ({name})", latencies, elapsed),
+            "body_bytes": len(body),
+        })
+        bodies.append(json.loads(body))
+
+    results.append({"same_body": bodies[0] == bodies[1]})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.items, args.requests)))
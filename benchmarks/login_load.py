@@ -0,0 +1,76 @@
+"""
+Measure latency of cheap endpoints while a burst of concurrent logins is in progress,
+To verify password hashing does not stall the event loop. Runs against a running server,
+The given user must exist.
+
+    python -m benchmarks.login_load --url http://localhost:8000 \
+        --email user@example.com --password 'Secret@123' --logins 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.utils import run_concurrently, summarize, print_results
+
+
+async def probe(client: httpx.AsyncClient, path: str, params: dict, stop: asyncio.Event) -> dict:
+    """
+    Call the given path sequentially until the stop event is set, And summarize latencies
+    """
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+
+    while not stop.is_set():
+        call_start = time.perf_counter()
+        response = await client.get(path, params=params)
+        latencies.append(time.perf_counter() - call_start)
+
+        if response.status_code != 200:
+            errors += 1
+
+    return summarize(f"GET {path} (during logins)", latencies, time.perf_counter() - start, errors)
+
+
+async def main(url: str, email: str, password: str, logins: int) -> list[dict]:
+    """
+    Fire all logins at once while probing the health check and movie list endpoints
+    """
+
+    limits = httpx.Limits(max_connections=logins + 10)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        stop = asyncio.Event()
+        probes = [
+            asyncio.create_task(probe(client, "/health-check/", {}, stop)),
+            asyncio.create_task(probe(client, "/v1/movie/", {"limit": 20}, stop)),
+        ]
+
+        async def _login() -> bool:
+            response = await client.post(
+                "/v1/login/",
+                json={"email": email, "password": password}
+            )
+            return response.status_code == 200
+
+        latencies, elapsed, errors = await run_concurrently(_login, logins, logins)
+        stop.set()
+
+        return [summarize("POST /v1/login/", latencies, elapsed, errors)] + [
+            await task for task in probes
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.url, args.email, args.password, args.logins)))
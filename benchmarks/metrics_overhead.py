@@ -0,0 +1,95 @@
+"""
+Measure overhead of the metrics middleware, By calling the same endpoint in-process on an app
+with and without the middleware. Rounds are interleaved, So that both apps see the same
+DB/cache state. `/v1/movie/` is served from the response cache after the first call,
+Which makes the endpoint cheap and the measured overhead a worst case.
+
+    python -m benchmarks.metrics_overhead --path '/v1/movie/?limit=20' --requests 5000
+
+Exits with a non-zero status if the p50 overhead exceeds the given percent.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from benchmarks.utils import summarize, print_results
+from main import get_application
+
+
+async def measure(client: httpx.AsyncClient, path: str, total: int) -> tuple[list[float], int]:
+    """
+    Call the given path sequentially, Returning the latencies and error count
+    """
+
+    latencies = []
+    errors = 0
+
+    for _ in range(total):
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+
+        if response.status_code != 200:
+            errors += 1
+
+    return latencies, errors
+
+
+async def main(path: str, total: int, rounds: int) -> list[dict]:
+    """
+    Run interleaved rounds against both apps and summarize them
+    """
+
+    clients = {
+        name: httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=get_application(metrics_enabled=enabled)),
+            base_url="http://test"
+        )
+        for name, enabled in (("without metrics", False), ("with metrics", True))
+    }
+    results = {name: ([], 0, 0.0) for name in clients}
+
+    for client in clients.values():
+        # Warm up the caches and the DB connection pool
+        await measure(client, path, 10)
+
+    for _ in range(rounds):
+        for name, client in clients.items():
+            start = time.perf_counter()
+            latencies, errors = await measure(client, path, total // rounds)
+            elapsed = time.perf_counter() - start
+
+            all_latencies, all_errors, all_elapsed = results[name]
+            results[name] = (all_latencies + latencies, all_errors + errors, all_elapsed + elapsed)
+
+    for client in clients.values():
+        await client.aclose()
+
+    return [
+        summarize(f"GET {path} ({name})", latencies, elapsed, errors)
+        for name, (latencies, errors, elapsed) in results.items()
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default="/v1/movie/?limit=20")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--max-overhead-percent", type=float, default=3.0)
+    args = parser.parse_args()
+
+    baseline, instrumented = asyncio.run(main(args.path, args.requests, args.rounds))
+    overhead = 0.0
+
+    if baseline["p50_ms"]:
+        overhead = round((instrumented["p50_ms"] / baseline["p50_ms"] - 1) * 100, 2)
+
+    print_results([baseline, instrumented, {"p50_overhead_percent": overhead}])
+
+    if overhead > args.max_overhead_percent:
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""
+Compare fetching a page of movie cards with one `GET /v1/movie/{movie_id}/` per movie against
+a single `GET /v1/movie/batch/` (and its POST variant). Runs `main.app` in-process against the
+seeded DB, Run `python -m benchmarks.seed` first.
+
+    python -m benchmarks.movie_batch --movies 40 --pages 200
+
+Every page is a fresh sample of seeded movies and the response cache of those movies is
+invalidated before fetching it, So every variant hits the DB.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from sqlalchemy import select
+
+from base.query_counter import count_queries
+from base.response_cache import get_movie_namespace, response_cache
+from benchmarks.seed import SEED_MOVIE_PREFIX
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+from main import app
+from movies import models
+
+
+def get_fetchers(client: httpx.AsyncClient) -> dict:
+    """
+    Build the ways of fetching a page of movies, Each returning whether all movies were fetched
+    """
+
+    async def single(movie_ids: list[str]) -> bool:
+        for movie_id in movie_ids:
+            response = await client.get(f"/v1/movie/{movie_id}/")
+
+            if response.status_code != 200:
+                return False
+
+        return True
+
+    async def concurrent(movie_ids: list[str]) -> bool:
+        responses = await asyncio.gather(*(
+            client.get(f"/v1/movie/{movie_id}/") for movie_id in movie_ids
+        ))
+        return all(response.status_code == 200 for response in responses)
+
+    async def batch_get(movie_ids: list[str]) -> bool:
+        response = await client.get("/v1/movie/batch/", params={"ids": ",".join(movie_ids)})
+        return response.status_code == 200 and not response.json()["missing"]
+
+    async def batch_post(movie_ids: list[str]) -> bool:
+        response = await client.post("/v1/movie/batch/", json={"ids": movie_ids})
+        return response.status_code == 200 and not response.json()["missing"]
+
+    return {
+        "N x GET /v1/movie/{movie_id}/ (sequential)": single,
+        "N x GET /v1/movie/{movie_id}/ (concurrent)": concurrent,
+        "GET /v1/movie/batch/": batch_get,
+        "POST /v1/movie/batch/": batch_post,
+    }
+
+
+async def main(movie_count: int, pages: int, random_seed: int) -> list[dict]:
+    """
+    Fetch the same pages with every fetcher, Reporting per page latency and DB queries
+    """
+
+    rng = random.Random(random_seed)
+
+    async with SessionLocal() as db:
+        seeded_ids = [str(movie_id) for movie_id in (await db.execute(
+            select(models.Movie.id).where(models.Movie.name.like(f"{SEED_MOVIE_PREFIX} %"))
+        )).scalars()]
+
+    if len(seeded_ids) < movie_count:
+        raise SystemExit("Not enough seeded movies, Run `python -m benchmarks.seed` first")
+
+    samples = [rng.sample(seeded_ids, movie_count) for _ in range(pages)]
+    results = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for name, fetch in get_fetchers(client).items():
+            # Warm up
+            await fetch(samples[0])
+
+            latencies = []
+            queries = 0
+            errors = 0
+
+            for movie_ids in samples:
+                await response_cache.invalidate(*map(get_movie_namespace, movie_ids))
+
+                with count_queries() as counter:
+                    start = time.perf_counter()
+                    is_success = await fetch(movie_ids)
+                    latencies.append(time.perf_counter() - start)
+
+                queries += counter.count
+                errors += not is_success
+
+            results.append({
+                **summarize(f"{name} with {movie_count} movies", latencies, sum(latencies), errors),
+                "queries_per_page": round(queries / pages, 2),
+            })
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=40, help="Movies per page")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--random-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.movies, args.pages, args.random_seed)))
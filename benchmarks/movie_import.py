@@ -0,0 +1,78 @@
+"""
+Measure bulk movie import throughput, Using synthetic NDJSON rows.
+The given user must exist, Imported movies are deleted at the end unless --keep is passed.
+
+    python -m benchmarks.movie_import --email user@example.com --movies 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from auth import crud as auth_crud
+from benchmarks.utils import print_results
+from database import SessionLocal, engine
+from movies import importer, models
+# Register remaining models, So that relationships of movie models can be resolved
+from request import models as _  # pylint: disable=unused-import
+
+
+async def generate_lines(count: int, prefix: str):
+    """
+    Yield synthetic NDJSON movie rows
+    """
+
+    for index in range(count):
+        yield json.dumps({
+            "name": f"{prefix} {index}",
+            "year": 1950 + index % 75,
+            "description": f"Synthetic movie number {index} used for import benchmark",
+            "extra": {"index": index},
+        }).encode("utf-8")
+
+
+async def main(email: str, movies: int, batch_size: int, keep: bool) -> dict:
+    """
+    Import the synthetic movies and report rows/second
+    """
+
+    prefix = f"Import {uuid.uuid4().hex[:8]}"
+
+    async with SessionLocal() as db:
+        db_user = await auth_crud.get_user_by_email(db=db, email=email)
+
+        start = time.perf_counter()
+        result = await importer.import_movies(
+            db, generate_lines(movies, prefix), importer.NDJSON, db_user.id, batch_size
+        )
+        elapsed = time.perf_counter() - start
+
+        if not keep:
+            await db.execute(delete(models.Movie).where(models.Movie.name.like(f"{prefix} %")))
+            await db.commit()
+
+    await engine.dispose()
+
+    return {
+        "movies": movies,
+        "batch_size": batch_size,
+        "inserted": result.inserted,
+        "failed": result.failed,
+        "seconds": round(elapsed, 3),
+        "movies_per_second": round(result.inserted / elapsed, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.email, args.movies, args.batch_size, args.keep)))
@@ -0,0 +1,45 @@
+"""
+Measure latency of `GET /v1/movie/` under concurrent load against a running server.
+
+Run it once against the old build and once against the new build to compare p99:
+
+    python -m benchmarks.movie_list_latency --url http://localhost:8000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+
+import httpx
+
+from benchmarks.utils import run_concurrently, summarize, print_results
+
+
+async def main(url: str, total: int, concurrency: int, search: str) -> dict:
+    """
+    Fire `total` movie list requests with the given concurrency and summarize them
+    """
+
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        async def _call() -> bool:
+            response = await client.get(
+                "/v1/movie/",
+                params={"limit": 20, "offset": 0, "search": search}
+            )
+            return response.status_code == 200
+
+        latencies, elapsed, errors = await run_concurrently(_call, total, concurrency)
+
+    return summarize("GET /v1/movie/", latencies, elapsed, errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--search", default="")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.url, args.requests, args.concurrency, args.search)))
@@ -0,0 +1,143 @@
+"""
+Sweep connection pool sizes against gunicorn worker counts. For every combination a gunicorn
+server is started on a free port, Loaded with uncached `GET /v1/movie/` requests, While the
+peak number of Postgres connections is sampled from `pg_stat_activity`.
+
+    python -m benchmarks.pool_sweep --workers 2 4 8 --pool-sizes 2 5 10 --concurrency 100
+
+Response cache is disabled for the spawned servers, So that every request reaches the DB.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks import movie_list_latency
+from benchmarks.utils import print_results
+from database import engine
+
+
+def get_free_port() -> int:
+    """
+    Return a free local TCP port
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(url: str, timeout: float = 60) -> None:
+    """
+    Poll the health check until the server responds
+    """
+
+    async with httpx.AsyncClient(base_url=url) as client:
+        for _ in range(int(timeout * 10)):
+            try:
+                if (await client.get("/health-check/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+
+            await asyncio.sleep(0.1)
+
+    raise TimeoutError(f"Server at {url} did not start")
+
+
+async def sample_connections(stop: asyncio.Event) -> int:
+    """
+    Sample the number of connections to the current DB until stopped, Returning the peak
+    """
+
+    peak = 0
+
+    async with engine.connect() as conn:
+        while not stop.is_set():
+            result = await conn.execute(text(
+                "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
+            ))
+            peak = max(peak, result.scalar())
+            await asyncio.sleep(0.2)
+
+    return peak
+
+
+async def run(workers: int, pool_size: int, max_overflow: int, total: int,
+              concurrency: int) -> dict:
+    """
+    Start gunicorn with the given workers and pool size, And load it
+    """
+
+    port = get_free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "DB_POOL_SIZE": str(pool_size),
+        "DB_MAX_OVERFLOW": str(max_overflow),
+        "RESPONSE_CACHE_TTL_SECONDS": "0",
+    }
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "gunicorn", "main:app", "--bind", f"127.0.0.1:{port}"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    try:
+        await wait_until_up(url)
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_connections(stop))
+        result = await movie_list_latency.main(url, total, concurrency, "")
+        stop.set()
+
+        return {
+            "workers": workers,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "max_connections": workers * (pool_size + max_overflow),
+            "peak_db_connections": await sampler,
+            **result,
+        }
+
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main(workers: list[int], pool_sizes: list[int], max_overflow: int, total: int,
+               concurrency: int) -> list[dict]:
+    """
+    Run every combination of worker count and pool size one after another
+    """
+
+    results = [
+        await run(worker_count, pool_size, max_overflow, total, concurrency)
+        for worker_count in workers
+        for pool_size in pool_sizes
+    ]
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(
+        args.workers, args.pool_sizes, args.max_overflow, args.requests, args.concurrency
+    )))
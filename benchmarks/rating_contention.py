@@ -0,0 +1,112 @@
+"""
+Rate a single movie from many users at the same time, And report throughput along with
+whether the precomputed rating stat matches the ratings table afterwards.
+Creates its own users and movie in the configured DB and removes them at the end.
+
+    python -m benchmarks.rating_contention --ratings 500 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+
+from auth.models import User
+from benchmarks.utils import print_results, run_concurrently, summarize
+from database import SessionLocal, engine
+from movies import crud, models, schemas
+# Register remaining models, So that relationships of movie models can be resolved
+from request import models as _  # pylint: disable=unused-import
+
+
+async def create_users(count: int) -> list[uuid.UUID]:
+    """
+    Insert the given number of benchmark users
+    """
+
+    user_ids = [uuid.uuid4() for _ in range(count)]
+
+    async with SessionLocal() as db:
+        db.add_all([User(
+            id=user_id,
+            created_at=datetime.utcnow(),
+            modified_at=datetime.utcnow(),
+            email=f"bench-{user_id.hex}@example.com",
+            password="-",
+            first_name="Bench",
+            last_name="User"
+        ) for user_id in user_ids])
+        await db.commit()
+
+    return user_ids
+
+
+async def main(ratings: int, concurrency: int) -> dict:
+    """
+    Fire all ratings on one movie, Each using its own DB session like separate requests
+    """
+
+    user_ids = await create_users(ratings)
+
+    async with SessionLocal() as db:
+        db_movie = await crud.add_movie_db(db, schemas.MovieAddRequest(
+            name=f"Benchmark {uuid.uuid4().hex}", year=2000, extra={}
+        ), user_ids[0])
+
+    values = [float(random.randint(0, 10)) for _ in range(ratings)]
+    pending = list(zip(user_ids, values))
+
+    async def _rate() -> bool:
+        user_id, value = pending.pop()
+
+        async with SessionLocal() as db:
+            await crud.add_rating_db(db, schemas.RatingRequest(
+                movie_id=db_movie.id, rating=value
+            ), user_id)
+
+        return True
+
+    start = time.perf_counter()
+    latencies, elapsed, errors = await run_concurrently(_rate, ratings, concurrency)
+    result = summarize("add_rating_db on one movie", latencies, elapsed, errors)
+    result["wall_seconds"] = round(time.perf_counter() - start, 3)
+
+    async with SessionLocal() as db:
+        movie = await db.get(models.Movie, db_movie.id)
+        rows_count, rows_sum = (await db.execute(
+            select(func.count(), func.sum(models.Rating.rating)).where(
+                models.Rating.movie_id == db_movie.id
+            )
+        )).one()
+
+        result["correct"] = (
+            movie.ratings_count == rows_count == ratings and
+            abs(movie.ratings_sum - sum(values)) < 1e-6 and
+            abs(float(rows_sum) - sum(values)) < 1e-6 and
+            sum(movie.ratings_histogram) == ratings
+        )
+        result["ratings_count"] = movie.ratings_count
+        result["ratings_sum"] = movie.ratings_sum
+        result["expected_sum"] = sum(values)
+
+        # Cleanup benchmark data
+        await db.execute(delete(models.Rating).where(models.Rating.movie_id == db_movie.id))
+        await db.execute(delete(models.Movie).where(models.Movie.id == db_movie.id))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+    await engine.dispose()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ratings", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.ratings, args.concurrency)))
@@ -0,0 +1,128 @@
+"""
+Measure latency of rating pages of a movie and of a user, Following the next page cursor
+like a client scrolling through them. Expects a seeded DB, e.g. 50M ratings:
+
+    python -m benchmarks.seed --ratings 50000000 --users 500000 --movies 500000
+    python -m benchmarks.rating_page_latency --movies 200 --pages 5
+
+Plans of a first and a cursor page are printed as well, To verify they are index scans
+on the rating pagination indexes without a sort.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from auth.models import User
+from benchmarks.seed import SEED_EMAIL_DOMAIN, SEED_MOVIE_PREFIX
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+from movies import crud, models
+
+PLAN_QUERY = """
+    EXPLAIN (ANALYZE, BUFFERS)
+    SELECT * FROM ratings WHERE {column} = :id {seek}
+    ORDER BY created_at DESC, id DESC LIMIT :limit
+"""
+
+
+async def measure(db, get_ratings, ids: list, limit: int, pages: int) -> tuple[list, list]:
+    """
+    Fetch the first pages of every ID, Returning latencies of first and cursor pages
+    """
+
+    first_latencies = []
+    cursor_latencies = []
+
+    for object_id in ids:
+        cursor = None
+
+        for page in range(pages):
+            call_start = time.perf_counter()
+            _, cursor = await get_ratings(db, object_id, limit, 0, cursor)
+            (cursor_latencies if page else first_latencies).append(
+                time.perf_counter() - call_start
+            )
+
+            if not cursor:
+                break
+
+    return first_latencies, cursor_latencies
+
+
+async def get_plan(db, column: str, object_id, limit: int, seek: bool) -> list[str]:
+    """
+    Return plan of a rating page, Seeking past the newest rating when `seek` is passed
+    """
+
+    seek_clause = ""
+    params = {"id": object_id, "limit": limit}
+
+    if seek:
+        seek_clause = "AND (created_at, id) < (:created_at, :rating_id)"
+        row = (await db.execute(text(
+            f"SELECT created_at, id FROM ratings WHERE {column} = :id "
+            "ORDER BY created_at DESC, id DESC LIMIT 1"
+        ), {"id": object_id})).one()
+        params.update(created_at=row.created_at, rating_id=row.id)
+
+    result = await db.execute(
+        text(PLAN_QUERY.format(column=column, seek=seek_clause)), params
+    )
+    return [row[0] for row in result]
+
+
+async def main(movie_count: int, user_count: int, limit: int, pages: int) -> list[dict]:
+    """
+    Measure movie and user rating pages, Most rated movies first
+    """
+
+    results = []
+
+    async with SessionLocal() as db:
+        movie_ids = list((await db.execute(
+            select(models.Movie.id).where(
+                models.Movie.name.like(f"{SEED_MOVIE_PREFIX} %")
+            ).order_by(models.Movie.ratings_count.desc()).limit(movie_count)
+        )).scalars())
+        user_ids = list((await db.execute(
+            select(User.id).where(User.email.like(f"%@{SEED_EMAIL_DOMAIN}")).limit(user_count)
+        )).scalars())
+
+        if not movie_ids or not user_ids:
+            raise SystemExit("No seeded data found, Run `python -m benchmarks.seed` first")
+
+        ratings_count = await db.scalar(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE relname = 'ratings'"
+        ))
+
+        for name, get_ratings, ids in (
+            ("movie ratings", crud.get_movie_ratings_db, movie_ids),
+            ("user ratings", crud.get_user_ratings_db, user_ids),
+        ):
+            first, following = await measure(db, get_ratings, ids, limit, pages)
+            results.append(summarize(f"{name} (first page)", first, sum(first)))
+            results.append(summarize(f"{name} (cursor page)", following, sum(following)))
+
+        results.append({
+            "ratings": ratings_count,
+            "movie_first_page_plan": await get_plan(db, "movie_id", movie_ids[0], limit, False),
+            "movie_cursor_page_plan": await get_plan(db, "movie_id", movie_ids[0], limit, True),
+            "user_cursor_page_plan": await get_plan(db, "user_id", user_ids[0], limit, True),
+        })
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=200, help="Most rated movies to page")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5, help="Pages to follow per movie/user")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.movies, args.users, args.limit, args.pages)))
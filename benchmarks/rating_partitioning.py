@@ -0,0 +1,265 @@
+"""
+Compare a plain ratings table with one partitioned by hash of the movie, Like the ratings
+table since the partitioning migration. Both are scratch copies of the ratings table with
+the same indexes, Filled with the same synthetic ratings and dropped afterwards.
+
+    python -m benchmarks.rating_partitioning --ratings 5000000 --movies 50000
+
+Reports bulk and single row insert throughput, And latency of movie and user rating pages.
+The partitions every page scans are counted from its plan, Since a user page can not be
+pruned to one partition like a movie page and reads all of them.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+
+# Name, table and whether it is partitioned
+TABLES = [
+    ("plain", "bench_ratings_plain", False),
+    ("hash partitioned", "bench_ratings_hash", True),
+]
+
+# Movie and user IDs are derived from their index, So both tables get the same ratings
+FILL_QUERY = """
+    INSERT INTO {table} (id, created_at, modified_at, user_id, movie_id, rating, review)
+    SELECT
+        gen_random_uuid(),
+        now() - make_interval(secs => (n * 7919) % 31536000),
+        now(),
+        md5('user-' || n / :movies)::uuid,
+        md5('movie-' || n % :movies)::uuid,
+        (n % 21) / 2.0,
+        NULL
+    FROM generate_series(CAST(:start AS BIGINT), CAST(:end AS BIGINT) - 1) AS n
+"""
+
+PAGE_QUERY = """
+    SELECT * FROM {table} WHERE {column} = md5(:key)::uuid
+    ORDER BY created_at DESC, id DESC LIMIT :limit
+"""
+
+INSERT_QUERY = """
+    INSERT INTO {table} (id, created_at, modified_at, user_id, movie_id, rating)
+    VALUES (:id, :created_at, :created_at, md5(:user_key)::uuid, md5(:movie_key)::uuid, :rating)
+"""
+
+
+async def create_table(db, table: str, partitions: int) -> None:
+    """
+    Create an empty copy of the ratings table, Partitioned when `partitions` is passed
+    """
+
+    partition_by = " PARTITION BY HASH (movie_id)" if partitions else ""
+    await db.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await db.execute(text(
+        f"CREATE TABLE {table} (LIKE ratings INCLUDING DEFAULTS){partition_by}"
+    ))
+
+    for remainder in range(partitions):
+        await db.execute(text(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+
+    primary_key = "(id, movie_id)" if partitions else "(id)"
+    await db.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY {primary_key}"))
+    await db.execute(text(f"ALTER TABLE {table} ADD UNIQUE (user_id, movie_id)"))
+    await db.execute(text(
+        f"CREATE INDEX ON {table} (movie_id, created_at DESC, id DESC)"
+    ))
+    await db.execute(text(
+        f"CREATE INDEX ON {table} (user_id, created_at DESC, id DESC)"
+    ))
+    await db.commit()
+
+
+async def fill(db, table: str, ratings: int, movies: int, batch_size: int) -> float:
+    """
+    Insert the ratings in batches
+
+    :return: Elapsed time in seconds
+    """
+
+    start = time.perf_counter()
+
+    for batch_start in range(0, ratings, batch_size):
+        await db.execute(text(FILL_QUERY.format(table=table)), {
+            "movies": movies,
+            "start": batch_start,
+            "end": min(batch_start + batch_size, ratings),
+        })
+        await db.commit()
+
+    elapsed = time.perf_counter() - start
+    await db.execute(text(f"ANALYZE {table}"))
+    await db.commit()
+    return elapsed
+
+
+async def insert_ratings(db, table: str, keys: list[tuple[str, str]]) -> list[float]:
+    """
+    Insert and commit the ratings one by one, Like `add_rating_db`
+
+    :return: Latencies in seconds
+    """
+
+    latencies = []
+
+    for user_key, movie_key in keys:
+        start = time.perf_counter()
+        await db.execute(text(INSERT_QUERY.format(table=table)), {
+            "id": uuid.uuid4(),
+            "created_at": datetime.utcnow(),
+            "user_key": user_key,
+            "movie_key": movie_key,
+            "rating": 5,
+        })
+        await db.commit()
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+async def fetch_pages(db, table: str, column: str, keys: list[str], limit: int) -> list[float]:
+    """
+    Fetch the first rating page of every key
+
+    :return: Latencies in seconds
+    """
+
+    latencies = []
+
+    for key in keys:
+        start = time.perf_counter()
+        (await db.execute(
+            text(PAGE_QUERY.format(table=table, column=column)), {"key": key, "limit": limit}
+        )).all()
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def get_scanned_relations(plan: dict) -> set[str]:
+    """
+    Collect the tables and partitions read by the nodes of a query plan
+    """
+
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+
+    for child in plan.get("Plans", []):
+        relations |= get_scanned_relations(child)
+
+    return relations
+
+
+async def count_scanned_partitions(db, table: str, column: str, key: str, limit: int) -> int:
+    """
+    Count the tables or partitions a rating page reads, From its plan
+    """
+
+    plan = await db.scalar(text(
+        f"EXPLAIN (FORMAT JSON) {PAGE_QUERY.format(table=table, column=column)}"
+    ), {"key": key, "limit": limit})
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return len(get_scanned_relations(plan[0]["Plan"]))
+
+
+async def main(
+    ratings: int,
+    movies: int,
+    partitions: int,
+    lookups: int,
+    inserts: int,
+    limit: int,
+    batch_size: int
+) -> list[dict]:
+    """
+    Build both tables, Measure them and drop them
+    """
+
+    rng = random.Random(0)
+    users = -(-ratings // movies)
+    movie_keys = [f"movie-{rng.randrange(movies)}" for _ in range(lookups)]
+    user_keys = [f"user-{rng.randrange(users)}" for _ in range(lookups)]
+
+    # New users, So the single row inserts never conflict with the filled ratings
+    insert_keys = [
+        (f"user-{users + index}", f"movie-{rng.randrange(movies)}") for index in range(inserts)
+    ]
+    results = []
+
+    async with SessionLocal() as db:
+        try:
+            for name, table, partitioned in TABLES:
+                await create_table(db, table, partitions if partitioned else 0)
+                elapsed = await fill(db, table, ratings, movies, batch_size)
+                # Partitioned table itself holds no rows, Its partitions do
+                size = await db.scalar(text(
+                    f"SELECT pg_total_relation_size('{table}') + coalesce(("
+                    f"SELECT sum(pg_total_relation_size(relid)) "
+                    f"FROM pg_partition_tree('{table}') WHERE isleaf), 0)"
+                ))
+
+                for label, column, keys in (
+                    ("movie", "movie_id", movie_keys),
+                    ("user", "user_id", user_keys),
+                ):
+                    # Warm up
+                    await fetch_pages(db, table, column, keys[:10], limit)
+                    latencies = await fetch_pages(db, table, column, keys, limit)
+                    results.append({
+                        **summarize(f"{label} rating page ({name})", latencies, sum(latencies)),
+                        "partitions_scanned": await count_scanned_partitions(
+                            db, table, column, keys[0], limit
+                        ),
+                    })
+
+                latencies = await insert_ratings(db, table, insert_keys)
+                results.append({
+                    **summarize(f"single rating insert ({name})", latencies, sum(latencies)),
+                    "bulk_insert_rows_per_second": round(ratings / elapsed),
+                    "total_bytes": int(size),
+                })
+
+        finally:
+            await db.rollback()
+
+            for _, table, _ in TABLES:
+                await db.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+            await db.commit()
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ratings", type=int, default=1000000)
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--lookups", type=int, default=1000, help="Pages fetched per column")
+    parser.add_argument("--inserts", type=int, default=1000, help="Ratings inserted one by one")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(
+        args.ratings,
+        args.movies,
+        args.partitions,
+        args.lookups,
+        args.inserts,
+        args.limit,
+        args.batch_size
+    )))
@@ -0,0 +1,124 @@
+"""
+Measure latency of the duplicate checks and similar name lookups done while adding a movie
+request, Optionally seeding synthetic requests first. The given user must exist, Seeded
+requests are deleted at the end unless --keep is passed.
+
+    python -m benchmarks.request_duplicate_check --email user@example.com --seed 500000
+
+Lookups alternate between duplicates of the seeded names ("Dark Night 42, The" for
+"The Dark Night 42") and names which don't exist. The plan of one similar name lookup is
+printed as well, To verify the trigram index is used instead of a sequential scan.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, insert, text
+
+from auth import crud as auth_crud
+from benchmarks.suggest_latency import WORDS
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+from movies.models import get_normalized_name
+from request import crud, models
+
+BATCH_SIZE = 5000
+
+
+def generate_name(rng: random.Random, prefix: str, index: int) -> str:
+    """
+    Generate a synthetic movie title
+    """
+
+    return f"The {' '.join(rng.choice(WORDS) for _ in range(2)).title()} {prefix} {index}"
+
+
+async def seed(db, user_id: uuid.UUID, count: int, prefix: str) -> list[str]:
+    """
+    Insert the synthetic requests in batches, Returning their names
+    """
+
+    rng = random.Random(0)
+    names = [generate_name(rng, prefix, index) for index in range(count)]
+    now = datetime.utcnow()
+
+    for start in range(0, count, BATCH_SIZE):
+        await db.execute(insert(models.Request), [{
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "modified_at": now,
+            "user_id": user_id,
+            "name": name,
+            "normalized_name": get_normalized_name(name),
+        } for name in names[start:start + BATCH_SIZE]])
+
+    await db.commit()
+    await db.execute(text("ANALYZE requests"))
+    return names
+
+
+async def main(email: str, count: int, lookups: int, keep: bool) -> list[dict]:
+    """
+    Seed the requests, Then time the movie and request lookups
+    """
+
+    prefix = uuid.uuid4().hex[:6]
+    rng = random.Random(1)
+
+    async with SessionLocal() as db:
+        db_user = await auth_crud.get_user_by_email(db=db, email=email)
+        names = await seed(db, db_user.id, count, prefix) if count else []
+
+        # "The Dark Night 42" -> "Dark Night 42, The"
+        candidates = [
+            f"{rng.choice(names)[4:]}, The" if names and index % 2 == 0
+            else generate_name(rng, "missing", index)
+            for index in range(lookups)
+        ]
+
+        results = []
+
+        for name, lookup in (
+            ("movie duplicate check", crud.get_movie_by_normalized_name_db),
+            ("similar movie names", crud.get_similar_movie_names_db),
+            ("request duplicate check", crud.get_open_request_by_normalized_name_db),
+            ("similar request names", crud.get_similar_request_names_db),
+        ):
+            latencies = []
+            start = time.perf_counter()
+
+            for candidate in candidates:
+                call_start = time.perf_counter()
+                await lookup(db, candidate)
+                latencies.append(time.perf_counter() - call_start)
+
+            results.append(summarize(name, latencies, time.perf_counter() - start))
+
+        plan = await db.execute(text(
+            "EXPLAIN SELECT id FROM requests WHERE normalized_name % :name"
+        ), {"name": get_normalized_name(candidates[0])})
+        results.append({"plan": [row[0] for row in plan]})
+
+        if count and not keep:
+            await db.execute(
+                delete(models.Request).where(models.Request.name.like(f"% {prefix} %"))
+            )
+            await db.commit()
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--seed", type=int, default=500000, help="Synthetic requests to add first")
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded requests")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.email, args.seed, args.lookups, args.keep)))
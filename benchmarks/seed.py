@@ -0,0 +1,324 @@
+"""
+Seed the configured DB with synthetic users, movies, ratings and requests, So that the
+benchmarks run against a realistic and reproducible data set. The counts of users, movies
+and requests default to 1% of the ratings, Which keeps about 100 ratings per user/movie.
+
+    python -m benchmarks.seed --ratings 10000
+    python -m benchmarks.seed --ratings 10000000 --users 200000 --movies 100000
+    python -m benchmarks.seed --clear
+
+The same arguments produce the same data (apart from the UUIDs and timestamps).
+Seeded users share the password given with --password, So that they can log in.
+Seeded rows are recognised by their name/email, `--clear` deletes them along with
+the rows other benchmarks added for the seeded users (e.g. by `benchmarks.workload`).
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from auth.models import User
+from base.utils import get_hashed_password
+from benchmarks.suggest_latency import WORDS
+from benchmarks.utils import print_results
+from database import SessionLocal, engine
+from movies import crud, models, schemas
+from request.models import Request, RequestVote
+
+SEED_EMAIL_DOMAIN = "seed.example.com"
+SEED_MOVIE_PREFIX = "Seed Movie"
+SEED_REQUEST_PREFIX = "Seed Request"
+SEED_PASSWORD = "Seed@12345"
+
+# Rows inserted per statement
+BATCH_SIZE = 10000
+MOVIE_BATCH_SIZE = 1000
+
+# User n rates the movies n * STRIDE, n * STRIDE + 1, ..., So pairs never repeat
+STRIDE = 7919
+
+# Ratings and votes are spread over this period, Ending now
+HISTORY_DAYS = 365
+
+
+def get_seed_email(index: int) -> str:
+    """
+    Return email of the n-th seeded user
+    """
+
+    return f"user-{index}@{SEED_EMAIL_DOMAIN}"
+
+
+def get_title(rng: random.Random, words: int) -> str:
+    """
+    Generate a random title of the given number of words
+    """
+
+    return " ".join(rng.choice(WORDS) for _ in range(words)).title()
+
+
+def get_created_at(rng: random.Random, now: datetime) -> datetime:
+    """
+    Return a random moment in the seeded history
+    """
+
+    return now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 24 * 3600))
+
+
+async def seed_users(db, count: int, password: str) -> list[uuid.UUID]:
+    """
+    Insert the users, All of them sharing the same hashed password
+    """
+
+    hashed_password = await get_hashed_password(password)
+    user_ids = [uuid.uuid4() for _ in range(count)]
+    now = datetime.utcnow()
+
+    for start in range(0, count, BATCH_SIZE):
+        await db.execute(insert(User), [{
+            "id": user_ids[index],
+            "created_at": now,
+            "modified_at": now,
+            "email": get_seed_email(index),
+            "password": hashed_password,
+            "first_name": "Seed",
+            "last_name": f"User {index}",
+        } for index in range(start, min(start + BATCH_SIZE, count))])
+        await db.commit()
+
+    return user_ids
+
+
+async def seed_movies(db, rng: random.Random, count: int, user_ids: list) -> list[uuid.UUID]:
+    """
+    Add the movies through the bulk CRUD function, So that the derived columns
+    (search vector, normalized name) are built like for the real movies
+    """
+
+    movie_ids = []
+
+    for start in range(0, count, MOVIE_BATCH_SIZE):
+        names = [
+            f"{SEED_MOVIE_PREFIX} {get_title(rng, 3)} {index}"
+            for index in range(start, min(start + MOVIE_BATCH_SIZE, count))
+        ]
+        await crud.bulk_add_movies_db(db, [schemas.MovieAddRequest(
+            name=name,
+            year=rng.randint(1950, 2024),
+            description=" ".join(rng.choice(WORDS) for _ in range(40)),
+            extra={"genre": rng.choice(WORDS)}
+        ) for name in names], rng.choice(user_ids))
+
+        result = await db.execute(
+            select(models.Movie.name, models.Movie.id).where(models.Movie.name.in_(names))
+        )
+        ids = dict(result.all())
+        movie_ids.extend(ids[name] for name in names)
+
+    return movie_ids
+
+
+async def seed_ratings(db, rng: random.Random, count: int, user_ids: list, movie_ids: list):
+    """
+    Insert the ratings, Spread evenly across the users and the movies
+    """
+
+    now = datetime.utcnow()
+    batch = []
+
+    for user_index, user_id in enumerate(user_ids):
+        user_count = count // len(user_ids) + (user_index < count % len(user_ids))
+
+        for position in range(user_count):
+            created_at = get_created_at(rng, now)
+            batch.append({
+                "id": uuid.uuid4(),
+                "created_at": created_at,
+                "modified_at": created_at,
+                "user_id": user_id,
+                "movie_id": movie_ids[(user_index * STRIDE + position) % len(movie_ids)],
+                "rating": rng.randint(0, 20) / 2,
+                "review": get_title(rng, 8) if rng.random() < 0.2 else None,
+            })
+
+            if len(batch) == BATCH_SIZE:
+                await db.execute(insert(models.Rating), batch)
+                await db.commit()
+                batch = []
+
+    if batch:
+        await db.execute(insert(models.Rating), batch)
+        await db.commit()
+
+    # Precomputed rating stat of the movies is rebuilt once, Instead of per rating
+    await crud.recompute_rating_stats_db(db)
+
+
+async def seed_requests(db, rng: random.Random, count: int, user_ids: list):
+    """
+    Insert the open requests with a long tailed number of votes
+    """
+
+    now = datetime.utcnow()
+
+    for start in range(0, count, BATCH_SIZE):
+        requests = []
+        votes = []
+
+        for index in range(start, min(start + BATCH_SIZE, count)):
+            name = f"{SEED_REQUEST_PREFIX} {get_title(rng, 3)} {index}"
+            request_id = uuid.uuid4()
+            created_at = get_created_at(rng, now)
+            user_id = rng.choice(user_ids)
+
+            # Requester votes for its own request, Few requests get most of the votes
+            voters = {user_id, *rng.sample(
+                user_ids, min(int(rng.paretovariate(1.2)) - 1, len(user_ids), 1000)
+            )}
+            votes.extend({
+                "id": uuid.uuid4(),
+                "created_at": created_at,
+                "request_id": request_id,
+                "user_id": voter_id,
+            } for voter_id in voters)
+
+            requests.append({
+                "id": request_id,
+                "created_at": created_at,
+                "modified_at": created_at,
+                "user_id": user_id,
+                "name": name,
+                "normalized_name": models.get_normalized_name(name),
+                "votes_count": len(voters),
+                "status": Request.OPEN,
+            })
+
+        await db.execute(insert(Request), requests)
+
+        for vote_start in range(0, len(votes), BATCH_SIZE):
+            await db.execute(insert(RequestVote), votes[vote_start:vote_start + BATCH_SIZE])
+
+        await db.commit()
+
+
+async def clear(db) -> None:
+    """
+    Delete the seeded rows, And the rows which reference the seeded users
+    """
+
+    user_ids = select(User.id).where(User.email.like(f"%@{SEED_EMAIL_DOMAIN}"))
+    movie_ids = select(models.Movie.id).where(models.Movie.name.like(f"{SEED_MOVIE_PREFIX} %"))
+
+    # Votes are deleted along with the requests and the users
+    await db.execute(delete(Request).where(Request.user_id.in_(user_ids)))
+    await db.execute(delete(models.Rating).where(models.Rating.user_id.in_(user_ids)))
+    await db.execute(delete(models.Rating).where(models.Rating.movie_id.in_(movie_ids)))
+    await db.execute(delete(models.Movie).where(models.Movie.id.in_(movie_ids)))
+    await db.execute(delete(User).where(User.id.in_(user_ids)))
+    await db.commit()
+    await crud.recompute_rating_stats_db(db)
+
+
+async def main(
+    ratings: int,
+    users: int,
+    movies: int,
+    requests: int,
+    password: str,
+    random_seed: int
+) -> dict:
+    """
+    Seed all the tables, Reporting the time taken by each of them
+    """
+
+    rng = random.Random(random_seed)
+    timings = {}
+
+    async with SessionLocal() as db:
+        seeded = await db.scalar(select(func.count()).select_from(User).where(
+            User.email.like(f"%@{SEED_EMAIL_DOMAIN}")
+        ))
+
+        if seeded:
+            raise SystemExit(f"{seeded} seeded users exist, Run with --clear first")
+
+        start = time.perf_counter()
+        user_ids = await seed_users(db, users, password)
+        timings["users_seconds"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        movie_ids = await seed_movies(db, rng, movies, user_ids)
+        timings["movies_seconds"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        await seed_ratings(db, rng, ratings, user_ids, movie_ids)
+        timings["ratings_seconds"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        await seed_requests(db, rng, requests, user_ids)
+        timings["requests_seconds"] = round(time.perf_counter() - start, 2)
+
+        for table in ("users", "movies", "ratings", "requests", "request_votes"):
+            await db.execute(text(f"ANALYZE {table}"))
+
+    await engine.dispose()
+
+    return {
+        "users": users,
+        "movies": movies,
+        "ratings": ratings,
+        "requests": requests,
+        **timings,
+    }
+
+
+async def clear_seed() -> dict:
+    """
+    Delete the seeded data
+    """
+
+    start = time.perf_counter()
+
+    async with SessionLocal() as db:
+        await clear(db)
+
+    await engine.dispose()
+    return {"cleared_seconds": round(time.perf_counter() - start, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ratings", type=int, default=10000)
+    parser.add_argument("--users", type=int, help="Defaults to 1%% of the ratings")
+    parser.add_argument("--movies", type=int, help="Defaults to 1%% of the ratings")
+    parser.add_argument("--requests", type=int, help="Defaults to 1%% of the ratings")
+    parser.add_argument("--password", default=SEED_PASSWORD, help="Password of seeded users")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--clear", action="store_true", help="Delete the seeded data instead")
+    args = parser.parse_args()
+
+    if args.clear:
+        print_results(asyncio.run(clear_seed()))
+    else:
+        default_count = max(args.ratings // 100, 100)
+        user_count = args.users or default_count
+        movie_count = args.movies or default_count
+
+        # Every user rates distinct movies
+        if math.ceil(args.ratings / user_count) > movie_count:
+            parser.error("Not enough movies for every user to rate distinct movies")
+
+        print_results(asyncio.run(main(
+            args.ratings,
+            user_count,
+            movie_count,
+            args.requests or default_count,
+            args.password,
+            args.random_seed
+        )))
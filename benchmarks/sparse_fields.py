@@ -0,0 +1,149 @@
+"""
+Measure what sparse fieldsets save, By calling the movie detail, list and batch routes of
+`main.app` in-process with all the fields and with `?fields=`. Expects the DB to be seeded
+with `benchmarks.seed` first.
+
+    python -m benchmarks.sparse_fields --requests 500 --limit 100
+
+Reports latency and response size of every route, And the width of the rows the SQL query
+of the route reads (from the plan of the same query), So both sides of the saving are visible.
+The response cache is invalidated before every call.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from base.response_cache import MOVIES_NAMESPACE, get_movie_namespace, response_cache
+from benchmarks.seed import SEED_MOVIE_PREFIX
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+from main import app
+from movies import crud, models
+
+DETAIL_FIELDS = "id,name,year"
+LIST_FIELDS = "id,name"
+
+
+async def get_row_width(db, query) -> int:
+    """
+    Return the estimated width of the rows read by the query, In bytes
+    """
+
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return plan[0]["Plan"]["Plan Width"]
+
+
+def get_cases(movie_ids: list, limit: int) -> list[tuple]:
+    """
+    Build the measured calls, Each with its name, path, query params and the SQL query it runs
+    """
+
+    list_query = select(models.Movie).order_by(
+        models.Movie.created_at.desc(), models.Movie.id.desc()
+    ).limit(limit)
+    cases = []
+
+    for route, path, params, query, default_fields, sparse_fields in (
+        (
+            "GET /v1/movie/{movie_id}/",
+            f"/v1/movie/{movie_ids[0]}/",
+            {},
+            select(models.Movie).where(models.Movie.id == movie_ids[0]),
+            None,
+            DETAIL_FIELDS,
+        ),
+        (
+            f"GET /v1/movie/?limit={limit}",
+            "/v1/movie/",
+            {"limit": limit},
+            list_query,
+            crud.MOVIE_LIST_FIELDS,
+            LIST_FIELDS,
+        ),
+        (
+            f"GET /v1/movie/batch/ with {len(movie_ids)} movies",
+            "/v1/movie/batch/",
+            {"ids": ",".join(map(str, movie_ids))},
+            select(models.Movie).where(models.Movie.id.in_(movie_ids)),
+            None,
+            DETAIL_FIELDS,
+        ),
+    ):
+        sparse_options = crud.get_movie_load_options(frozenset(sparse_fields.split(",")))
+        cases.append((
+            f"{route} (all fields)",
+            path,
+            params,
+            query.options(*crud.get_movie_load_options(default_fields)),
+        ))
+        cases.append((
+            f"{route} (fields={sparse_fields})",
+            path,
+            {**params, "fields": sparse_fields},
+            query.options(*sparse_options),
+        ))
+
+    return cases
+
+
+async def main(total: int, limit: int, batch: int) -> list[dict]:
+    """
+    Call every route with and without sparse fields, And summarize them
+    """
+
+    async with SessionLocal() as db:
+        movie_ids = list((await db.execute(
+            select(models.Movie.id).where(
+                models.Movie.name.like(f"{SEED_MOVIE_PREFIX} %")
+            ).order_by(models.Movie.id).limit(batch)
+        )).scalars())
+
+        if not movie_ids:
+            raise SystemExit("No seeded movies found, Run `python -m benchmarks.seed` first")
+
+        cases = get_cases(movie_ids, limit)
+        widths = [await get_row_width(db, query) for _, _, _, query in cases]
+
+    namespaces = [MOVIES_NAMESPACE, *map(get_movie_namespace, movie_ids)]
+    results = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for (name, path, params, _), width in zip(cases, widths):
+            latencies = []
+            errors = 0
+
+            for _ in range(total):
+                await response_cache.invalidate(*namespaces)
+                start = time.perf_counter()
+                response = await client.get(path, params=params)
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+            results.append({
+                **summarize(name, latencies, sum(latencies), errors),
+                "body_bytes": len(response.content),
+                "row_width_bytes": width,
+            })
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500, help="Calls per route")
+    parser.add_argument("--limit", type=int, default=100, help="Page size of the movie list")
+    parser.add_argument("--batch", type=int, default=40, help="Movies per batch call")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(args.requests, args.limit, args.batch)))
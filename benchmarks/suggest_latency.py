@@ -0,0 +1,114 @@
+"""
+Measure latency of movie name prefix lookups. The in-memory index is built from synthetic
+titles, So no DB is needed. With `--db` the same prefixes are looked up through the
+Postgres `text_pattern_ops` index as well, Which expects the catalog to be seeded first
+(e.g. with `benchmarks.export_memory --seed`).
+
+    python -m benchmarks.suggest_latency --names 1000000 --lookups 10000
+"""
+
+import argparse
+import asyncio
+import random
+import resource
+import time
+
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+from movies import crud
+from movies.suggest import MovieNameIndex
+# Register remaining models, So that relationships of movie models can be resolved
+from request import models as _  # pylint: disable=unused-import
+
+WORDS = [
+    "the", "last", "dark", "night", "star", "war", "love", "story", "return", "king",
+    "lost", "city", "man", "woman", "dead", "life", "secret", "house", "day", "world",
+]
+
+
+def generate_names(count: int) -> list[str]:
+    """
+    Generate unique synthetic movie titles
+    """
+
+    rng = random.Random(0)
+    return [
+        f"{' '.join(rng.choice(WORDS) for _ in range(3)).title()} {index}"
+        for index in range(count)
+    ]
+
+
+def generate_prefixes(names: list[str], count: int) -> list[str]:
+    """
+    Pick random 1 to 6 character prefixes of the existing names, Like a user typing
+    """
+
+    rng = random.Random(1)
+    return [rng.choice(names)[:rng.randint(1, 6)] for _ in range(count)]
+
+
+async def measure_db(prefixes: list[str], limit: int) -> dict:
+    """
+    Look up the prefixes one after another through the Postgres prefix index
+    """
+
+    latencies = []
+
+    async with SessionLocal() as db:
+        start = time.perf_counter()
+
+        for prefix in prefixes:
+            call_start = time.perf_counter()
+            await crud.get_movie_suggestions_db(db, prefix, limit)
+            latencies.append(time.perf_counter() - call_start)
+
+        elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+    return summarize("suggest (postgres index)", latencies, elapsed)
+
+
+def main(count: int, lookups: int, limit: int, use_db: bool) -> list[dict]:
+    """
+    Build the index, Then look up random prefixes and summarize the latencies
+    """
+
+    names = generate_names(count)
+    index = MovieNameIndex()
+
+    start = time.perf_counter()
+    index.build(names)
+    build_seconds = time.perf_counter() - start
+
+    prefixes = generate_prefixes(names, lookups)
+    latencies = []
+    start = time.perf_counter()
+
+    for prefix in prefixes:
+        call_start = time.perf_counter()
+        index.search(prefix, limit)
+        latencies.append(time.perf_counter() - call_start)
+
+    results = [{
+        **summarize("suggest (in-memory index)", latencies, time.perf_counter() - start),
+        "names": count,
+        "build_seconds": round(build_seconds, 3),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+    }]
+
+    if use_db:
+        results.append(asyncio.run(measure_db(prefixes, limit)))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--db", action="store_true", help="Measure the Postgres index as well")
+    args = parser.parse_args()
+
+    print_results(main(args.names, args.lookups, args.limit, args.db))
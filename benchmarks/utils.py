@@ -0,0 +1,90 @@
+"""
+Contain common helper functions used across the benchmark scripts
+"""
+
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Return the given percentile of a list of values, Using nearest rank method
+
+    :param values: List of measured values
+    :param pct: Percentile between 0 and 100
+    :return: Value at the given percentile
+    """
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(name: str, latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    """
+    Build a summary dict of the measured latencies
+
+    :param name: Benchmark/Route name
+    :param latencies: List of latencies in seconds
+    :param elapsed: Total wall time taken by the benchmark in seconds
+    :param errors: Number of failed calls
+    :return: Dict containing throughput and latency percentiles in milliseconds
+    """
+
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 2),
+    }
+
+
+async def run_concurrently(
+    call: Callable[[], Awaitable[bool]],
+    total: int,
+    concurrency: int
+) -> tuple[list[float], float, int]:
+    """
+    Execute the given coroutine function `total` times, With at most `concurrency` in flight
+
+    :param call: Coroutine function returning a boolean depicting the call succeeded or not
+    :param total: Total number of calls
+    :param concurrency: Number of concurrent calls
+    :return: Tuple of latencies, total elapsed time and error count
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def _worker():
+        nonlocal errors
+
+        async with semaphore:
+            start = time.perf_counter()
+            is_success = await call()
+            latencies.append(time.perf_counter() - start)
+
+            if not is_success:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(total)))
+    return latencies, time.perf_counter() - start, errors
+
+
+def print_results(results: list[dict] | dict) -> None:
+    """
+    Print benchmark results as JSON, So that they can be diffed between commits
+    """
+
+    print(json.dumps(results, indent=2))
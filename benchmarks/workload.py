@@ -0,0 +1,299 @@
+"""
+Drive a mixed workload (search, detail, rating, login, request listing) against the API,
+And report throughput and p50/p95/p99 latency of every route. Expects the DB to be seeded
+with `benchmarks.seed` first. By default `main.app` is called in-process, Pass --url to
+load a running server instead.
+
+    python -m benchmarks.workload --requests 20000 --concurrency 50
+    python -m benchmarks.workload --url http://localhost:8000 --mix search=50,detail=50
+
+The order of operations and their arguments is derived from --random-seed, So that runs
+of two commits are comparable. Ratings are given by users created for the run, Which are
+removed afterwards along with their ratings unless --keep is passed.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from auth.models import User
+from base.utils import get_hashed_password
+from benchmarks.seed import SEED_EMAIL_DOMAIN, SEED_MOVIE_PREFIX, SEED_PASSWORD
+from benchmarks.suggest_latency import WORDS
+from benchmarks.utils import summarize, print_results
+from database import SessionLocal, engine
+from main import app
+from movies import crud, models
+
+# Default share of each operation, In percent
+DEFAULT_MIX = {
+    "search": 30,
+    "detail": 30,
+    "rating": 10,
+    "login": 5,
+    "requests": 15,
+    "most_wanted": 10,
+}
+
+# "the" is a stop word, Searching it matches nothing
+SEARCH_WORDS = [word for word in WORDS if word != "the"]
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """
+    Parse `name=weight,...` into a dict, e.g. `search=50,detail=50`
+    """
+
+    mix = {}
+
+    for item in value.split(","):
+        name, weight = item.split("=")
+
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name}")
+
+        mix[name] = int(weight)
+
+    return mix
+
+
+async def create_users(count: int) -> list[tuple[uuid.UUID, str]]:
+    """
+    Insert the users of the run, They can log in with the seed password
+
+    :return: List of user IDs and emails
+    """
+
+    hashed_password = await get_hashed_password(SEED_PASSWORD)
+    run_id = uuid.uuid4().hex[:8]
+    users = [
+        (uuid.uuid4(), f"workload-{run_id}-{index}@{SEED_EMAIL_DOMAIN}") for index in range(count)
+    ]
+
+    async with SessionLocal() as db:
+        await db.execute(insert(User), [{
+            "id": user_id,
+            "created_at": datetime.utcnow(),
+            "modified_at": datetime.utcnow(),
+            "email": email,
+            "password": hashed_password,
+            "first_name": "Workload",
+            "last_name": "User",
+        } for user_id, email in users])
+        await db.commit()
+
+    return users
+
+
+async def get_movie_ids(rng: random.Random, count: int) -> list[uuid.UUID]:
+    """
+    Return a sample of the seeded movie IDs, In a reproducible order
+    """
+
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(models.Movie.id).where(
+                models.Movie.name.like(f"{SEED_MOVIE_PREFIX} %")
+            ).order_by(models.Movie.id).limit(count)
+        )
+        movie_ids = list(result.scalars())
+
+    if not movie_ids:
+        raise SystemExit("No seeded movies found, Run `python -m benchmarks.seed` first")
+
+    rng.shuffle(movie_ids)
+    return movie_ids
+
+
+async def remove_users(user_ids: list[uuid.UUID]) -> None:
+    """
+    Delete the users of the run along with their ratings, And rebuild the rating stat
+    """
+
+    async with SessionLocal() as db:
+        await db.execute(delete(models.Rating).where(models.Rating.user_id.in_(user_ids)))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+        await crud.recompute_rating_stats_db(db)
+
+
+def get_operations(
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    movie_ids: list,
+    users: list,
+    tokens: list
+) -> dict:
+    """
+    Build the operations of the workload, Each returning whether the call succeeded
+    """
+
+    # Every user rates every movie at most once
+    pairs = [(index, movie_id) for movie_id in movie_ids for index in range(len(users))]
+    rng.shuffle(pairs)
+
+    async def search() -> bool:
+        response = await client.get(
+            "/v1/movie/", params={"limit": 20, "search": rng.choice(SEARCH_WORDS)}
+        )
+        return response.status_code == 200
+
+    async def detail() -> bool:
+        response = await client.get(f"/v1/movie/{rng.choice(movie_ids)}/")
+        return response.status_code == 200
+
+    async def rating() -> bool:
+        if not pairs:
+            return False
+
+        index, movie_id = pairs.pop()
+        response = await client.post(
+            "/v1/rating/",
+            json={"movie_id": str(movie_id), "rating": rng.randint(0, 20) / 2},
+            headers={"Authorization": f"Bearer {tokens[index]}"}
+        )
+        return response.status_code == 201
+
+    async def login() -> bool:
+        response = await client.post(
+            "/v1/login/", json={"email": rng.choice(users)[1], "password": SEED_PASSWORD}
+        )
+        return response.status_code == 200
+
+    async def requests() -> bool:
+        response = await client.get(
+            "/v1/request/",
+            params={"limit": 20},
+            headers={"Authorization": f"Bearer {rng.choice(tokens)}"}
+        )
+        return response.status_code == 200
+
+    async def most_wanted() -> bool:
+        response = await client.get(
+            "/v1/request/most-wanted/",
+            params={"limit": 20},
+            headers={"Authorization": f"Bearer {rng.choice(tokens)}"}
+        )
+        return response.status_code == 200
+
+    return {
+        "search": ("GET /v1/movie/?search=", search),
+        "detail": ("GET /v1/movie/{movie_id}/", detail),
+        "rating": ("POST /v1/rating/", rating),
+        "login": ("POST /v1/login/", login),
+        "requests": ("GET /v1/request/", requests),
+        "most_wanted": ("GET /v1/request/most-wanted/", most_wanted),
+    }
+
+
+async def run(operations: dict, schedule: list[str], concurrency: int) -> list[dict]:
+    """
+    Execute the scheduled operations, With at most `concurrency` in flight
+
+    :param operations: Dict of operation name and its route and coroutine function
+    :param schedule: Names of the operations to execute, In order
+    :param concurrency: Number of concurrent calls
+    :return: Summary of every operation, Followed by the overall summary
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = {name: [] for name in operations}
+    errors = dict.fromkeys(operations, 0)
+
+    async def _worker(name: str):
+        async with semaphore:
+            start = time.perf_counter()
+            is_success = await operations[name][1]()
+            latencies[name].append(time.perf_counter() - start)
+
+            if not is_success:
+                errors[name] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(name) for name in schedule))
+    elapsed = time.perf_counter() - start
+
+    results = [
+        summarize(route, latencies[name], elapsed, errors[name])
+        for name, (route, _) in operations.items() if latencies[name]
+    ]
+    results.append(summarize(
+        "all", [latency for values in latencies.values() for latency in values],
+        elapsed, sum(errors.values())
+    ))
+    return results
+
+
+async def main(
+    url: str | None,
+    mix: dict[str, int],
+    total: int,
+    concurrency: int,
+    user_count: int,
+    random_seed: int,
+    keep: bool
+) -> list[dict]:
+    """
+    Prepare the users and movies, Run the workload and clean up
+    """
+
+    rng = random.Random(random_seed)
+    movie_ids = await get_movie_ids(rng, 1000)
+    users = await create_users(user_count)
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=url or "http://test",
+            transport=None if url else httpx.ASGITransport(app=app),
+            limits=httpx.Limits(max_connections=concurrency),
+            timeout=120
+        ) as client:
+            tokens = []
+
+            for _, email in users:
+                response = await client.post(
+                    "/v1/login/", json={"email": email, "password": SEED_PASSWORD}
+                )
+                response.raise_for_status()
+                tokens.append(response.json()["tokens"]["access"])
+
+            operations = get_operations(client, rng, movie_ids, users, tokens)
+            operations = {name: operations[name] for name in mix if mix[name]}
+            schedule = rng.choices(list(operations), [mix[name] for name in operations], k=total)
+
+            return await run(operations, schedule, concurrency)
+
+    finally:
+        if not keep:
+            await remove_users([user_id for user_id, _ in users])
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Running server to load, Defaults to in-process main.app")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Share of each operation, e.g. search=30,detail=30,rating=10")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20, help="Users created for the run")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep the users and their ratings")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(main(
+        args.url,
+        args.mix,
+        args.requests,
+        args.concurrency,
+        args.users,
+        args.random_seed,
+        args.keep
+    )))
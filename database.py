@@ -2,17 +2,296 @@
 Contains DB object, Which can be used at various places in application
 """
 
-from sqlalchemy import create_engine
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 import settings
 
-SQLALCHEMY_DATABASE_URL = (f"postgresql://{settings.DB_USER}:{settings.DB_PASSWORD}@"
+logger = settings.get_logger(name=__name__)
+
+SQLALCHEMY_DATABASE_URL = (f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@"
                            f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Read replica, Same credentials and DB name as the primary
+SQLALCHEMY_REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@"
+    f"{settings.DB_REPLICA_HOST}:{settings.DB_REPLICA_PORT}/{settings.DB_NAME}"
+) if settings.DB_REPLICA_HOST else None
+
+# Replication lag in seconds, 0 when the replica has replayed everything it received
+# (or when it is not a replica at all)
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class PoolStats:
+    """
+    Holds connection checkout wait time and exhaustion counters of the pool
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        """
+        Record wait time of a single checkout
+        """
+
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+# Kept outside of the pool, So that the counters survive `engine.dispose()`
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool which records how long each checkout waited for a connection
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            # Pool was exhausted for the whole pool timeout
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - start)
+
+
+def get_connect_args(read_only: bool = False) -> dict:
+    """
+    Return asyncpg connection arguments as per the settings
+
+    :param read_only: Reject writes on the connection, Used for the replica
+    """
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode can't keep server side prepared statements of a client,
+        # Nor startup parameters, Which are set per transaction by `get_transaction_settings`
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    server_settings = {}
+
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if read_only:
+        server_settings["default_transaction_read_only"] = "on"
+
+    return {"server_settings": server_settings} if server_settings else {}
+
+
+def get_transaction_settings(read_only: bool = False) -> dict:
+    """
+    Return settings applied at the start of every transaction when behind PgBouncer,
+    In place of the startup parameters of `get_connect_args`
+
+    :param read_only: Reject writes in the transaction, Used for the replica
+    """
+
+    transaction_settings = {}
+
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        transaction_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if read_only:
+        transaction_settings["transaction_read_only"] = "on"
+
+    return transaction_settings
+
+
+def get_engine(url: str, read_only: bool = False, poolclass=InstrumentedQueuePool):
+    """
+    Create an async engine with the configured connection pool
+
+    :param url: Database URL
+    :param read_only: Reject writes on the connections of the engine
+    :param poolclass: Connection pool class
+    :return: Async engine
+    """
+
+    # Each worker holds up to pool size + max overflow connections,
+    # So the total is multiplied by the number of gunicorn workers
+    db_engine = create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=get_connect_args(read_only=read_only)
+    )
+
+    transaction_settings = get_transaction_settings(read_only) if settings.DB_PGBOUNCER else {}
+
+    if transaction_settings:
+        # Applied in a single round trip, Local to the transaction so they never leak to the
+        # other clients of the PgBouncer server connection
+        statement = "SELECT " + ", ".join(
+            f"set_config('{name}', '{value}', true)" for name, value in transaction_settings.items()
+        )
+
+        @event.listens_for(db_engine.sync_engine, "begin")
+        def set_transaction_settings(conn):
+            conn.exec_driver_sql(statement)
+
+    return db_engine
+
+
+class ReplicaMonitor:
+    """
+    Periodically checks replication lag of the replica in the background, Reads fall back to
+    the primary while the replica is unreachable or lagging more than the allowed staleness
+    """
+
+    # Last check is trusted for these many check intervals, Then the replica is not used until
+    # a check completes again (e.g. while a connect to an unreachable replica is hanging)
+    STALE_CHECKS = 3
+
+    def __init__(self, db_engine, max_lag: float, check_interval: float):
+        self.engine = db_engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.checked_at = None
+        self.lag = None
+        self.task = None
+
+    async def check(self) -> None:
+        """
+        Measure the current replication lag, None when the replica is unreachable
+        """
+
+        try:
+            async with self.engine.connect() as conn:
+                self.lag = float((await conn.execute(text(REPLICA_LAG_QUERY))).scalar())
+        except (exc.SQLAlchemyError, OSError):
+            self.lag = None
+
+        self.checked_at = time.monotonic()
+
+    def is_usable(self) -> bool:
+        """
+        Return True if reads can be served from the replica, As per the last check.
+        Checks run in the background, So a request never waits for the replica.
+        """
+
+        return (
+            self.checked_at is not None
+            and time.monotonic() - self.checked_at < self.check_interval * self.STALE_CHECKS
+            and self.lag is not None
+            and self.lag <= self.max_lag
+        )
+
+    def status(self) -> dict:
+        """
+        Return last known state of the replica
+        """
+
+        return {
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "usable": self.is_usable(),
+        }
+
+    def start(self) -> None:
+        """
+        Check the replica in the background, Until stopped
+        """
+
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background task
+        """
+
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+
+            # Any other error must not end the task, Or the last lag would be trusted until
+            # it gets stale. Cancellation is not an Exception, So stop() still ends it.
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.exception({"error": str(e)})
+                self.lag = None
+
+            await asyncio.sleep(self.check_interval)
+
+
+engine = get_engine(SQLALCHEMY_DATABASE_URL)
+
+# Objects are kept loaded after commit, Since lazy refresh is not possible with async session
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Replica is optional, Reads are served by the primary when it is not configured.
+# Its pool is not instrumented, So that the pool stats only describe the primary.
+replica_engine = get_engine(
+    SQLALCHEMY_REPLICA_DATABASE_URL, read_only=True, poolclass=AsyncAdaptedQueuePool
+) if SQLALCHEMY_REPLICA_DATABASE_URL else None
+
+ReplicaSessionLocal = async_sessionmaker(
+    bind=replica_engine,
+    autoflush=False,
+    expire_on_commit=False
+) if replica_engine else None
+
+replica_monitor = ReplicaMonitor(
+    replica_engine,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_SECONDS
+) if replica_engine else None
 
 Base = declarative_base()
-Base.metadata.create_all(bind=engine)
+
+
+def get_pool_status() -> dict:
+    """
+    Return connection pool usage of the current worker, Along with the checkout wait time
+    """
+
+    pool = engine.pool
+
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "avg_wait_ms": round(pool_stats.total_wait / pool_stats.checkouts * 1000, 3)
+        if pool_stats.checkouts else 0.0,
+        "max_wait_ms": round(pool_stats.max_wait * 1000, 3),
+    }
@@ -1,8 +1,29 @@
 import os
 import multiprocessing
+import shutil
 
 PORT = os.getenv("PORT", "8000")
 
+# Workers write their metrics into this directory, So /metrics can aggregate all of them.
+# It must be set before prometheus_client is imported, Which picks the value class on import.
+# Workers are forked from this process, So prometheus_client is only imported in the hooks.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/yify-metrics")
+
 bind = f"0.0.0.0:{PORT}"
 worker_class = "uvicorn.workers.UvicornWorker"
-workers = multiprocessing.cpu_count() * 2
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2)))
+
+
+def on_starting(server):
+    # pylint: disable=unused-argument
+    # Samples of the previous run must not be aggregated with the new one
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    # pylint: disable=unused-argument,import-outside-toplevel
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
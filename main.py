@@ -2,22 +2,57 @@
 Main App
 """
 
-from fastapi import FastAPI, status
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response, status
 from pydantic import BaseModel
 
 from auth import routes as auth_routes
+from base.cache import user_cache
+from base.emails import email_sender
+from base.metrics import MetricsMiddleware, get_metrics
+from base.response_cache import response_cache
+from base.slow_query import enable_slow_query_log
+from database import get_pool_status, replica_monitor
 from movies import routes as movie_routes
+from movies.suggest import movie_name_index
 from request import router as request_routes
 
+import settings
 import strings
 
 
-def get_application() -> FastAPI:
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """
+    Start and stop the background tasks along with the application
+    """
+
+    email_sender.start()
+
+    if settings.SUGGEST_INDEX_ENABLED:
+        movie_name_index.start()
+
+    if replica_monitor:
+        replica_monitor.start()
+
+    yield
+
+    if replica_monitor:
+        await replica_monitor.stop()
+
+    await movie_name_index.stop()
+    await email_sender.stop()
+
+
+def get_application(metrics_enabled: bool = settings.METRICS_ENABLED) -> FastAPI:
     """
     Initialize main app with necessary configuration
+
+    :param metrics_enabled: Record per route latency and DB usage of every request
     """
 
-    application = FastAPI()
+    application = FastAPI(lifespan=lifespan)
 
     # Add title and description of the application
     application.title = strings.APP_TITLE
@@ -29,6 +64,12 @@ def get_application() -> FastAPI:
     application.include_router(movie_routes.router, prefix=prefix)
     application.include_router(request_routes.router, prefix=prefix)
 
+    if metrics_enabled:
+        application.add_middleware(MetricsMiddleware)
+
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        enable_slow_query_log()
+
     return application
 
 
@@ -41,6 +82,9 @@ class HealthCheck(BaseModel):
     """
 
     message: str
+    caches: dict[str, dict]
+    pool: dict
+    replica: dict | None = None
 
 
 @app.get(path="/health-check/", status_code=status.HTTP_200_OK, response_model=HealthCheck)
@@ -49,4 +93,17 @@ async def health_check() -> HealthCheck:
     Endpoint for checking if services are up or not
     """
 
-    return HealthCheck(message="Up & Running!")
+    return HealthCheck(message="Up & Running!", caches={
+        "user": user_cache.stats(),
+        "response": response_cache.stats(),
+    }, pool=get_pool_status(), replica=replica_monitor.status() if replica_monitor else None)
+
+
+@app.get(path="/metrics", status_code=status.HTTP_200_OK, include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Endpoint for scraping the request metrics in the Prometheus format
+    """
+
+    content, media_type = get_metrics()
+    return Response(content=content, media_type=media_type)
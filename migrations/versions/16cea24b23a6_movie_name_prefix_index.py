@@ -0,0 +1,34 @@
+"""movie name prefix index
+
+Revision ID: 16cea24b23a6
+Revises: c28231ed374b
+Create Date: 2026-10-17 15:12:40.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '16cea24b23a6'
+down_revision: Union[str, None] = 'c28231ed374b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pattern operator class makes the index usable for prefix matching in any locale
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "movie_name_prefix_idx",
+            "movies",
+            [sa.text("lower(name) text_pattern_ops")],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("movie_name_prefix_idx", "movies", postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""normalized name indexes
+
+Revision ID: 3ae0b02de72e
+Revises: 5069f1838cf3
+Create Date: 2026-10-17 18:24:07.315942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ae0b02de72e'
+down_revision: Union[str, None] = '5069f1838cf3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    ("movies", "movie_normalized_name_idx"),
+    ("requests", "request_normalized_name_idx"),
+]
+
+
+def upgrade() -> None:
+    # Build indexes without locking the tables against writes
+    with op.get_context().autocommit_block():
+        for table, index in TABLES:
+            op.create_index(index, table, ["normalized_name"], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index in TABLES:
+            op.drop_index(index, table, postgresql_concurrently=True)
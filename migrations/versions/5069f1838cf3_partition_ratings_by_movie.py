@@ -0,0 +1,149 @@
+"""partition ratings by movie
+
+Revision ID: 5069f1838cf3
+Revises: b585ec489fe4
+Create Date: 2026-10-17 17:42:19.518263
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5069f1838cf3'
+down_revision: Union[str, None] = 'b585ec489fe4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+
+BATCH_SIZE = 10000
+
+# New table is built next to the old one, It and its constraints and indexes get this suffix
+# until the tables are swapped
+SUFFIX = "_new"
+
+# Primary key of a partitioned table has to include the partition key
+PRIMARY_KEY = "ratings_pkey"
+
+CONSTRAINTS = [
+    ("unique_movie_rating", "UNIQUE (user_id, movie_id)"),
+    ("ratings_user_id_fkey", "FOREIGN KEY (user_id) REFERENCES users (id)"),
+    ("ratings_movie_id_fkey", "FOREIGN KEY (movie_id) REFERENCES movies (id)"),
+]
+
+INDEXES = [
+    ("ix_ratings_id", "(id)"),
+    ("rating_movie_created_at_id_idx", "(movie_id, created_at, id)"),
+    ("rating_user_created_at_id_idx", "(user_id, created_at, id)"),
+]
+
+# Mirrors the writes on the old table into the new one while it is backfilled
+SYNC_FUNCTION = f"""
+    CREATE FUNCTION ratings_partition_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM ratings{SUFFIX} WHERE id = OLD.id AND movie_id = OLD.movie_id;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO ratings{SUFFIX} SELECT NEW.* ON CONFLICT DO NOTHING;
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+# Copied rows are locked until the batch commits, So that a concurrent update or delete
+# waits for the copy and is then mirrored by the trigger
+BACKFILL_BATCH = f"""
+    WITH batch AS (
+        SELECT * FROM ratings WHERE id > CAST(:last_id AS UUID)
+        ORDER BY id LIMIT :batch_size FOR SHARE
+    ), copied AS (
+        INSERT INTO ratings{SUFFIX} SELECT * FROM batch ON CONFLICT DO NOTHING
+    )
+    SELECT CAST(id AS TEXT) FROM batch ORDER BY id DESC LIMIT 1
+"""
+
+
+def create_table(name: str, partitioned: bool) -> None:
+    """
+    Create an empty copy of the ratings table with the constraints and indexes
+    """
+
+    partition_by = " PARTITION BY HASH (movie_id)" if partitioned else ""
+    op.execute(f"CREATE TABLE {name} (LIKE ratings INCLUDING DEFAULTS){partition_by}")
+
+    if partitioned:
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f"CREATE TABLE ratings_p{remainder} PARTITION OF {name} "
+                f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+            )
+
+    primary_key = "(id, movie_id)" if partitioned else "(id)"
+    op.execute(f"ALTER TABLE {name} ADD CONSTRAINT {PRIMARY_KEY}{SUFFIX} PRIMARY KEY {primary_key}")
+
+    for constraint, definition in CONSTRAINTS:
+        op.execute(f"ALTER TABLE {name} ADD CONSTRAINT {constraint}{SUFFIX} {definition}")
+
+    for index, columns in INDEXES:
+        op.execute(f"CREATE INDEX {index}{SUFFIX} ON {name} {columns}")
+
+
+def backfill() -> None:
+    """
+    Copy the ratings in batches, Each committed on its own
+    """
+
+    connection = op.get_bind()
+    last_id = str(uuid.UUID(int=0))
+
+    while last_id:
+        last_id = connection.execute(
+            sa.text(BACKFILL_BATCH), {"last_id": last_id, "batch_size": BATCH_SIZE}
+        ).scalar()
+
+
+def swap_tables(old_table: str) -> None:
+    """
+    Replace the ratings table with the new one, Under a short exclusive lock
+    """
+
+    op.execute(f"DROP TABLE {old_table}")
+    op.execute(f"ALTER TABLE ratings{SUFFIX} RENAME TO ratings")
+
+    for constraint in [PRIMARY_KEY] + [constraint for constraint, _ in CONSTRAINTS]:
+        op.execute(f"ALTER TABLE ratings RENAME CONSTRAINT {constraint}{SUFFIX} TO {constraint}")
+
+    for index, _ in INDEXES:
+        op.execute(f"ALTER INDEX {index}{SUFFIX} RENAME TO {index}")
+
+
+def upgrade() -> None:
+    # Ratings keep being written while the new table is built and backfilled
+    with op.get_context().autocommit_block():
+        create_table(f"ratings{SUFFIX}", partitioned=True)
+        op.execute(SYNC_FUNCTION)
+        op.execute(
+            "CREATE TRIGGER ratings_partition_sync AFTER INSERT OR UPDATE OR DELETE ON ratings "
+            "FOR EACH ROW EXECUTE FUNCTION ratings_partition_sync()"
+        )
+        backfill()
+
+    # Trigger is dropped along with the old table
+    swap_tables("ratings")
+    op.execute("DROP FUNCTION ratings_partition_sync()")
+
+
+def downgrade() -> None:
+    # Ratings are copied back in a single transaction, Writes wait until it's done
+    op.execute("LOCK TABLE ratings IN EXCLUSIVE MODE")
+    create_table(f"ratings{SUFFIX}", partitioned=False)
+    op.execute(f"INSERT INTO ratings{SUFFIX} SELECT * FROM ratings")
+    swap_tables("ratings")
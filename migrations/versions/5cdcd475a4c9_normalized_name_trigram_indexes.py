@@ -0,0 +1,94 @@
+"""normalized name trigram indexes
+
+Revision ID: 5cdcd475a4c9
+Revises: 16cea24b23a6
+Create Date: 2026-10-17 15:48:06.731590
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5cdcd475a4c9'
+down_revision: Union[str, None] = '16cea24b23a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    ("movies", "movie_normalized_name_trgm_idx"),
+    ("requests", "request_normalized_name_trgm_idx"),
+]
+
+BATCH_SIZE = 5000
+
+NAME_ARTICLES = ("the", "a", "an")
+
+
+def get_normalized_name(name: str) -> str:
+    """
+    Frozen copy of `movies.models.get_normalized_name` at this revision, So that later changes
+    of the application never change what this migration writes
+    """
+
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char)).lower().strip()
+
+    match = re.fullmatch(rf"(.+),\s*(?:{'|'.join(NAME_ARTICLES)})", name)
+    words = re.findall(r"\w+", match.group(1) if match else name)
+
+    if len(words) > 1 and words[0] in NAME_ARTICLES:
+        words = words[1:]
+
+    return " ".join(words)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    connection = op.get_bind()
+
+    for table, _ in TABLES:
+        op.add_column(table, sa.Column("normalized_name", sa.String, nullable=True))
+
+        # Backfill in Python with the normalization above, One batch of rows at a time
+        # Nil UUID sorts before every other UUID
+        last_id = "00000000-0000-0000-0000-000000000000"
+
+        while True:
+            rows = connection.execute(sa.text(
+                f"SELECT id, name FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+
+            if not rows:
+                break
+
+            connection.execute(
+                sa.text(f"UPDATE {table} SET normalized_name = :normalized_name WHERE id = :id"),
+                [{"id": row.id, "normalized_name": get_normalized_name(row.name)} for row in rows]
+            )
+            last_id = rows[-1].id
+
+    # Build indexes without locking the tables against writes
+    with op.get_context().autocommit_block():
+        for table, index in TABLES:
+            op.create_index(
+                index,
+                table,
+                ["normalized_name"],
+                postgresql_using="gin",
+                postgresql_ops={"normalized_name": "gin_trgm_ops"},
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index in TABLES:
+            op.drop_index(index, table, postgresql_concurrently=True)
+
+    for table, _ in TABLES:
+        op.drop_column(table, "normalized_name")
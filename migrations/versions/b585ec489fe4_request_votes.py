@@ -0,0 +1,87 @@
+"""request votes
+
+Revision ID: b585ec489fe4
+Revises: 5cdcd475a4c9
+Create Date: 2026-10-17 16:32:14.208417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b585ec489fe4'
+down_revision: Union[str, None] = '5cdcd475a4c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'request_votes',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('request_id', sa.UUID(), nullable=True),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['request_id'], ['requests.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('request_id', 'user_id', name='unique_request_vote')
+    )
+    op.create_index(op.f('ix_request_votes_user_id'), 'request_votes', ['user_id'], unique=False)
+
+    op.add_column(
+        'requests',
+        sa.Column('votes_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.add_column(
+        'requests',
+        sa.Column('status', sa.String(), server_default='open', nullable=False)
+    )
+    op.add_column('requests', sa.Column('closed_at', sa.DateTime(), nullable=True))
+    op.add_column('requests', sa.Column('movie_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'requests_movie_id_fkey', 'requests', 'movies', ['movie_id'], ['id'], ondelete='SET NULL'
+    )
+
+    # Existing requests are voted by their requester
+    op.execute(
+        "INSERT INTO request_votes (id, created_at, request_id, user_id) "
+        "SELECT gen_random_uuid(), now(), id, user_id FROM requests WHERE user_id IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE requests SET votes_count = "
+        "(SELECT count(*) FROM request_votes WHERE request_votes.request_id = requests.id)"
+    )
+
+    # Requests of the already added movies are closed
+    op.execute(
+        "UPDATE requests SET status = 'closed', closed_at = now(), movie_id = movies.id "
+        "FROM movies WHERE requests.normalized_name = movies.normalized_name"
+    )
+
+    # Build index without locking the table against writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'request_status_votes_count_id_idx',
+            'requests',
+            ['status', 'votes_count', 'id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'request_status_votes_count_id_idx', 'requests', postgresql_concurrently=True
+        )
+
+    op.drop_constraint('requests_movie_id_fkey', 'requests', type_='foreignkey')
+    op.drop_column('requests', 'movie_id')
+    op.drop_column('requests', 'closed_at')
+    op.drop_column('requests', 'status')
+    op.drop_column('requests', 'votes_count')
+    op.drop_index(op.f('ix_request_votes_user_id'), table_name='request_votes')
+    op.drop_table('request_votes')
@@ -0,0 +1,47 @@
+"""email outbox
+
+Revision ID: ba837280b77e
+Revises: bc6d321f1de2
+Create Date: 2026-10-17 11:26:05.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ba837280b77e'
+down_revision: Union[str, None] = 'bc6d321f1de2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.UUID, primary_key=True, index=True),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("modified_at", sa.DateTime),
+
+        sa.Column("sender", sa.String(255), nullable=False),
+        sa.Column("recipients", sa.JSON, nullable=False),
+        sa.Column("message", sa.Text, nullable=False),
+        sa.Column("status", sa.String(10), nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime, nullable=False),
+        sa.Column("sent_at", sa.DateTime, nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+    )
+
+    op.create_index(
+        "email_outbox_status_next_attempt_idx",
+        "email_outbox",
+        ["status", "next_attempt_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("email_outbox_status_next_attempt_idx", "email_outbox")
+    op.drop_table("email_outbox")
@@ -0,0 +1,42 @@
+"""movie search vector
+
+Revision ID: bb61e435fd1f
+Revises: 9d268f11872f
+Create Date: 2026-10-17 09:12:41.204817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb61e435fd1f'
+down_revision: Union[str, None] = '9d268f11872f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("movies", sa.Column("search_vector", TSVECTOR, nullable=True))
+
+    # Backfill search vector of the existing movies
+    op.execute(
+        "UPDATE movies SET search_vector = "
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+
+    op.create_index(
+        "movie_search_vector_idx",
+        "movies",
+        ["search_vector"],
+        postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("movie_search_vector_idx", "movies")
+    op.drop_column("movies", "search_vector")
@@ -0,0 +1,39 @@
+"""keyset pagination indexes
+
+Revision ID: bc6d321f1de2
+Revises: bb61e435fd1f
+Create Date: 2026-10-17 10:03:18.550912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bc6d321f1de2'
+down_revision: Union[str, None] = 'bb61e435fd1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("movie_created_at_id_idx", "movies", ["created_at", "id"]),
+    ("movie_added_by_created_at_id_idx", "movies", ["added_by_id", "created_at", "id"]),
+    ("rating_movie_created_at_id_idx", "ratings", ["movie_id", "created_at", "id"]),
+    ("rating_user_created_at_id_idx", "ratings", ["user_id", "created_at", "id"]),
+    ("request_created_at_id_idx", "requests", ["created_at", "id"]),
+    ("request_user_created_at_id_idx", "requests", ["user_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    # Build indexes without locking the tables against writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table, postgresql_concurrently=True)
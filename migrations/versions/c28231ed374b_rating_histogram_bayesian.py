@@ -0,0 +1,68 @@
+"""rating histogram and bayesian rating
+
+Revision ID: c28231ed374b
+Revises: ba837280b77e
+Create Date: 2026-10-17 12:41:52.907113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+
+import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c28231ed374b'
+down_revision: Union[str, None] = 'ba837280b77e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("movies", sa.Column(
+        "ratings_histogram",
+        ARRAY(sa.Integer),
+        server_default=sa.text("ARRAY[0,0,0,0,0,0,0,0,0,0,0]")
+    ))
+    op.add_column("movies", sa.Column("bayesian_rating", sa.Float))
+
+    # Backfill stat of the existing movies from ratings table
+    op.execute(sa.text("""
+        UPDATE movies SET
+            ratings_count = COALESCE(stat.count, 0),
+            ratings_sum = COALESCE(stat.sum, 0),
+            ratings_histogram = COALESCE(stat.histogram, ARRAY[0,0,0,0,0,0,0,0,0,0,0]),
+            bayesian_rating = (
+                CAST(:weight AS FLOAT) * CAST(:mean AS FLOAT) + COALESCE(stat.sum, 0)
+            ) / (CAST(:weight AS FLOAT) + COALESCE(stat.count, 0))
+        FROM movies AS movie
+        LEFT JOIN (
+            SELECT movie_id, COUNT(*) AS count, SUM(rating) AS sum, ARRAY[
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 0),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 1),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 2),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 3),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 4),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 5),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 6),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 7),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 8),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 9),
+                COUNT(*) FILTER (WHERE LEAST(FLOOR(rating + 0.5), 10) = 10)
+            ] AS histogram
+            FROM ratings
+            GROUP BY movie_id
+        ) AS stat ON stat.movie_id = movie.id
+        WHERE movies.id = movie.id
+    """).bindparams(weight=settings.RATING_PRIOR_WEIGHT, mean=settings.RATING_PRIOR_MEAN))
+
+    op.create_index("movie_bayesian_rating_id_idx", "movies", ["bayesian_rating", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("movie_bayesian_rating_id_idx", "movies")
+    op.drop_column("movies", "bayesian_rating")
+    op.drop_column("movies", "ratings_histogram")
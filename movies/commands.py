@@ -0,0 +1,96 @@
+"""
+Contain movie related management commands
+
+    python -m movies.commands recompute-rating-stats
+    python -m movies.commands import-movies --file movies.ndjson --email user@example.com
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+import settings
+from auth import crud as auth_crud
+from database import SessionLocal, engine
+from movies import crud, importer
+# Register remaining models, So that relationships of movie models can be resolved
+from request import models as _  # pylint: disable=unused-import
+
+logger = settings.get_logger(name=__name__)
+
+
+async def recompute_rating_stats() -> None:
+    """
+    Rebuild precomputed rating stat of all the movies from the ratings table
+    """
+
+    async with SessionLocal() as db:
+        updated_count = await crud.recompute_rating_stats_db(db)
+
+    await engine.dispose()
+    logger.info("Rating stat recomputed for %s movies", updated_count)
+
+
+async def read_lines(path: Path):
+    """
+    Read the given file line by line, Lines are decoded by the importer
+    """
+
+    with path.open("rb") as file:
+        for line in file:
+            yield line.rstrip(b"\r\n")
+
+
+async def import_movies(file: str, email: str, file_format: str = None) -> None:
+    """
+    Bulk import movies from a NDJSON or CSV file, On behalf of the given user
+    """
+
+    path = Path(file)
+    file_format = file_format or (importer.CSV if path.suffix == ".csv" else importer.NDJSON)
+
+    async with SessionLocal() as db:
+        db_user = await auth_crud.get_user_by_email(db=db, email=email)
+
+        if not db_user:
+            raise SystemExit(f"User {email} does not exist")
+
+        start = time.perf_counter()
+
+        try:
+            result = await importer.import_movies(db, read_lines(path), file_format, db_user.id)
+        except ValueError as e:
+            raise SystemExit(f"Invalid {file_format} file: {e}") from e
+
+    await engine.dispose()
+    logger.info(
+        "Imported %s movies in %.2f seconds, %s duplicates, %s failed rows",
+        result.inserted, time.perf_counter() - start, result.duplicates, result.failed
+    )
+
+    for error in result.errors:
+        logger.info("Line %s: %s", error.line, error.error)
+
+    if result.errors_omitted:
+        logger.info("%s more errors omitted", result.errors_omitted)
+
+
+COMMANDS = {
+    "recompute-rating-stats": recompute_rating_stats,
+    "import-movies": import_movies,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=COMMANDS.keys())
+    parser.add_argument("--file", help="NDJSON or CSV file, For import-movies")
+    parser.add_argument("--email", help="Email of the user adding the movies, For import-movies")
+    parser.add_argument("--format", choices=[importer.NDJSON, importer.CSV])
+    args = parser.parse_args()
+
+    if args.command == "import-movies":
+        asyncio.run(import_movies(args.file, args.email, args.format))
+    else:
+        asyncio.run(COMMANDS[args.command]())
@@ -5,44 +5,158 @@ to interact with the data in the database.
 
 import uuid
 from datetime import datetime
+from functools import lru_cache
+
+import sqlalchemy as sa
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+
+import settings
+from auth.models import User
+from base.pagination import get_page
+from base.response_cache import MOVIES_NAMESPACE, get_movie_namespace, response_cache
+from movies import models, schemas
+from movies.suggest import movie_name_index
+from request.crud import close_requests_db
 
-from sqlalchemy import update, delete, or_
-from sqlalchemy.orm import Session
 
-from movies import models, schemas
+# Fields of the movie list items, Movie lists load only their columns
+MOVIE_LIST_FIELDS = frozenset(schemas.MovieList.model_fields)
+TOP_RATED_MOVIE_LIST_FIELDS = frozenset(schemas.TopRatedMovieList.model_fields)
+
+# Relative difference below which a recomputed rating sum is taken as unchanged
+RATING_STAT_TOLERANCE = 1e-9
 
 
-def get_movie_by_id_db(db: Session, movie_id: uuid.UUID):
+@lru_cache(maxsize=1024)
+def get_movie_load_options(fields: frozenset[str] | None) -> tuple:
+    """
+    Return loader options of a movie query, Loading only the columns of the given fields
+
+    :param fields: Set of movie schema field names, None to load all the columns
+    :return: Tuple of loader options
+    """
+
+    if fields is None:
+        return ()
+
+    # Average rating is derived from the rating stat, Which is always loaded
+    # as the routes set the average rating on every movie
+    columns = {"ratings_sum", "ratings_count"} | (fields - {"avg_rating"})
+    return (load_only(*[getattr(models.Movie, column) for column in sorted(columns)]),)
+
+
+async def get_movie_by_id_db(
+    db: AsyncSession,
+    movie_id: uuid.UUID,
+    fields: frozenset[str] = None
+):
     """
     Return movie object with the given ID
 
     :param db: DB Session object
     :param movie_id: Movie UUID
+    :param fields: Movie schema fields to load, All of them by default
     :return: DB query object
     """
-    return db.query(models.Movie).get(movie_id)
+    return await db.get(models.Movie, movie_id, options=get_movie_load_options(fields))
+
+
+async def get_movies_by_ids_db(
+    db: AsyncSession,
+    movie_ids: list[uuid.UUID],
+    fields: frozenset[str] = None
+) -> list:
+    """
+    Return movies with the given IDs in their order, Missing IDs are skipped
 
+    :param db: DB Session object
+    :param movie_ids: List of movie UUIDs
+    :param fields: Movie schema fields to load, All of them by default
+    :return: List of movie objects
+    """
 
-def get_movies_db(db: Session, search: str, limit: int, offset: int):
+    # IDs are bound as a single array, So the statement is the same for any number of IDs
+    result = await db.execute(select(models.Movie).options(
+        *get_movie_load_options(fields)
+    ).where(
+        models.Movie.id == sa.any_(sa.bindparam("movie_ids", movie_ids, type_=ARRAY(sa.UUID)))
+    ))
+    movies = {movie.id: movie for movie in result.scalars()}
+
+    return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+
+
+async def get_movies_db(
+    db: AsyncSession,
+    search: str,
+    limit: int,
+    offset: int,
+    cursor: str = None,
+    fields: frozenset[str] = None
+):
     """
-    Return list of movies
+    Return list of movies, Latest first or best ranked first when searched
 
     :param db: DB Session object
-    :param search: Contains string to be searched in movie name
+    :param search: Contains string to be searched in movie name and description
     :param limit: Limit the resulting rows
     :param offset: Offset for the rows
-    :return List of movie objects
+    :param cursor: Cursor of the page to fetch
+    :param fields: Movie list fields to load, All of them by default
+    :return Tuple of list of movie objects and next page cursor
     """
 
-    return db.query(models.Movie).filter(or_(
-        models.Movie.name.like(f"%{search}%"),
-        models.Movie.description.like(f"%{search}%"),
-    )).order_by(
+    query = select(models.Movie).options(*get_movie_load_options(fields or MOVIE_LIST_FIELDS))
+    order_by = [models.Movie.created_at, models.Movie.id]
+    search_query = models.get_search_query(search)
+
+    # Match against the indexed search vector and return the best ranked movies first
+    if search_query is not None:
+        query = query.where(models.Movie.search_vector.op("@@")(search_query))
+        order_by = [
+            func.ts_rank(models.Movie.search_vector, search_query, type_=sa.Float),
+            models.Movie.id
+        ]
 
-    ).limit(limit).offset(offset).all()
+    return await get_page(db, query, order_by, limit, offset, cursor)
 
 
-def get_movies_by_user_db(db: Session, user_id: uuid.UUID, limit: int, offset: int):
+async def get_movie_suggestions_db(db: AsyncSession, prefix: str, limit: int) -> list[str]:
+    """
+    Return movie names starting with the given prefix, Used until the in-memory index is loaded.
+    Pattern operators are compared against a range instead of `LIKE`, So that the
+    `text_pattern_ops` index is used even by a generic plan of the prepared statement.
+
+    :param db: DB Session object
+    :param prefix: Case-insensitive prefix
+    :param limit: Limit the resulting rows
+    :return: List of movie names
+    """
+
+    prefix = prefix.lower()
+    lower_name = func.lower(models.Movie.name)
+    query = select(models.Movie.name).where(lower_name.op("~>=~")(prefix))
+
+    # Upper bound is the prefix with its last character incremented, i.e. "abc" -> "abd"
+    if ord(prefix[-1]) < 0x10FFFF:
+        query = query.where(lower_name.op("~<~")(prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+
+    # Sorted with the pattern operator as well, So that rows are read in the index order
+    result = await db.execute(query.order_by(sa.text("lower(movies.name) USING ~<~")).limit(limit))
+    return list(result.scalars().all())
+
+
+async def get_movies_by_user_db(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    offset: int,
+    cursor: str = None,
+    fields: frozenset[str] = None
+):
     """
     Return list of movies added by a specific user
 
@@ -50,13 +164,20 @@ def get_movies_by_user_db(db: Session, user_id: uuid.UUID, limit: int, offset: i
     :param user_id: User UUID
     :param limit: Limit the resulting rows
     :param offset: Offset for the rows
-    :return: List of movie objects
+    :param cursor: Cursor of the page to fetch
+    :param fields: Movie list fields to load, All of them by default
+    :return: Tuple of list of movie objects and next page cursor
     """
 
-    return db.query(models.Movie).filter_by(added_by_id=user_id).limit(limit).offset(offset).all()
+    query = select(models.Movie).options(
+        *get_movie_load_options(fields or MOVIE_LIST_FIELDS)
+    ).filter_by(added_by_id=user_id)
+    order_by = [models.Movie.created_at, models.Movie.id]
 
+    return await get_page(db, query, order_by, limit, offset, cursor)
 
-def add_movie_db(db: Session, movie: schemas.MovieAddRequest, added_by_id: uuid.UUID):
+
+async def add_movie_db(db: AsyncSession, movie: schemas.MovieAddRequest, added_by_id: uuid.UUID):
     """
     Create a movie object in the DB
 
@@ -71,19 +192,81 @@ def add_movie_db(db: Session, movie: schemas.MovieAddRequest, added_by_id: uuid.
         created_at=datetime.utcnow(),
         modified_at=datetime.utcnow(),
         name=movie.name,
+        normalized_name=models.get_normalized_name(movie.name),
         year=movie.year,
         description=movie.description,
         extra=movie.extra,
-        added_by_id=added_by_id
+        added_by_id=added_by_id,
+        search_vector=models.get_search_vector(movie.name, movie.description)
     )
 
+    # Movie is flushed first, So that the matching requests can reference it
     db.add(db_movie)
-    db.commit()
+    await db.flush()
+    await close_requests_db(db, [db_movie.id])
+    await db.commit()
+    await response_cache.invalidate(MOVIES_NAMESPACE)
+    movie_name_index.add(db_movie.name)
 
     return db_movie
 
 
-def update_movie_db(db: Session, movie: models.Movie, updated_data: dict):
+async def bulk_add_movies_db(
+    db: AsyncSession,
+    movies: list[schemas.MovieAddRequest],
+    added_by_id: uuid.UUID
+) -> set[str]:
+    """
+    Create movie objects in the DB with a single multi-row insert,
+    Movies whose name already exists are skipped
+
+    :param db: DB Session object
+    :param movies: List of pydantic movie instances
+    :param added_by_id: User ID who is trying to add the movies
+    :return: Set of inserted movie names
+    """
+
+    now = datetime.utcnow()
+
+    result = await db.execute(
+        insert(models.Movie).on_conflict_do_nothing(
+            constraint="unique_movie_name"
+        ).returning(models.Movie.id, models.Movie.name),
+        [{
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "modified_at": now,
+            "name": movie.name,
+            "normalized_name": models.get_normalized_name(movie.name),
+            "year": movie.year,
+            "description": movie.description,
+            "extra": movie.extra,
+            "added_by_id": added_by_id,
+        } for movie in movies]
+    )
+    inserted = result.all()
+
+    # Search vector is built from the stored columns of the inserted rows in one go
+    if inserted:
+        await db.execute(update(models.Movie.__table__).where(
+            models.Movie.id.in_([row.id for row in inserted])
+        ).values(
+            search_vector=models.get_search_vector(models.Movie.name, models.Movie.description)
+        ))
+        await close_requests_db(db, [row.id for row in inserted])
+
+    await db.commit()
+
+    if inserted:
+        await response_cache.invalidate(MOVIES_NAMESPACE)
+
+    for row in inserted:
+        movie_name_index.add(row.name)
+
+    return {row.name for row in inserted}
+
+
+async def update_movie_db(db: AsyncSession, movie: models.Movie, updated_data: dict):
     """
     Update movie details as part of the partial update
 
@@ -93,16 +276,35 @@ def update_movie_db(db: Session, movie: models.Movie, updated_data: dict):
     :return: Refreshed DB object, With update data
     """
 
-    db.execute(update(models.Movie).where(
+    old_name = movie.name
+    # Detail ETag is built from the modified time, So every update must bump it
+    updated_data["modified_at"] = datetime.utcnow()
+
+    if "name" in updated_data:
+        updated_data["normalized_name"] = models.get_normalized_name(updated_data["name"])
+
+    # Rebuild search vector from the new values, Falling back to the existing column values
+    if "name" in updated_data or "description" in updated_data:
+        updated_data["search_vector"] = models.get_search_vector(
+            updated_data.get("name", models.Movie.name),
+            updated_data.get("description", models.Movie.description)
+        )
+
+    await db.execute(update(models.Movie).where(
         models.Movie.id == movie.id).values(updated_data))
 
-    db.commit()
-    db.refresh(movie)
+    await db.commit()
+    await response_cache.invalidate(MOVIES_NAMESPACE, get_movie_namespace(movie.id))
+    await db.refresh(movie)
+
+    if movie.name != old_name:
+        movie_name_index.remove(old_name)
+        movie_name_index.add(movie.name)
 
     return movie
 
 
-def delete_movie_db(db: Session, movie: models.Movie):
+async def delete_movie_db(db: AsyncSession, movie: models.Movie):
     """
     Delete a given movie object from DB
 
@@ -111,11 +313,17 @@ def delete_movie_db(db: Session, movie: models.Movie):
     :return: None
     """
 
-    db.execute(delete(models.Movie).where(models.Movie.id == movie.id))
-    db.commit()
+    await db.execute(delete(models.Movie).where(models.Movie.id == movie.id))
+    await db.commit()
+    await response_cache.invalidate(MOVIES_NAMESPACE, get_movie_namespace(movie.id))
+    movie_name_index.remove(movie.name)
 
 
-def add_rating_db(db: Session, rating_request: schemas.RatingRequest, user_id: uuid.UUID):
+async def add_rating_db(
+    db: AsyncSession,
+    rating_request: schemas.RatingRequest,
+    user_id: uuid.UUID
+):
     """
     Add rating of a movie in DB
 
@@ -134,24 +342,43 @@ def add_rating_db(db: Session, rating_request: schemas.RatingRequest, user_id: u
         review=rating_request.review
     )
 
-    db.add(db_rating)
-    db.commit()
-
-    # Update movie rating stat
-    with db.begin():
-        movie = db.query(models.Movie).with_for_update().get(
-            rating_request.movie_id)
-
-        movie.ratings_count += 1
-        movie.ratings_sum += rating_request.rating
+    rating = models.get_stored_rating(rating_request.rating)
+    movies = models.Movie.__table__
+    bucket = movies.c.ratings_histogram[models.get_rating_bucket(rating) + 1]
 
-        db.add(movie)
-        db.commit()
+    # Insert the rating first, So that the movie row is locked only for the stat update.
+    # Rating and stat are committed together, Old column values are used on the right side.
+    db.add(db_rating)
+    await db.flush()
+
+    await db.execute(update(movies).where(
+        movies.c.id == rating_request.movie_id
+    ).values({
+        movies.c.ratings_count: movies.c.ratings_count + 1,
+        movies.c.ratings_sum: movies.c.ratings_sum + rating,
+        bucket: bucket + 1,
+        movies.c.bayesian_rating: models.get_bayesian_rating(
+            movies.c.ratings_sum + rating, movies.c.ratings_count + 1
+        ),
+    }))
+
+    await db.commit()
+
+    # Rating changes the movie detail, Its ratings and the average shown in every list
+    await response_cache.invalidate(
+        MOVIES_NAMESPACE, get_movie_namespace(rating_request.movie_id)
+    )
 
     return db_rating
 
 
-def get_movie_ratings_db(db: Session, movie_id: uuid.UUID, limit: int, offset: int):
+async def get_movie_ratings_db(
+    db: AsyncSession,
+    movie_id: uuid.UUID,
+    limit: int,
+    offset: int,
+    cursor: str = None
+):
     """
     Get ratings by a specific movie
 
@@ -159,19 +386,191 @@ def get_movie_ratings_db(db: Session, movie_id: uuid.UUID, limit: int, offset: i
     :param movie_id: Movie UUID
     :param limit: Limit the resulting rows
     :param offset: Offset for the rows
+    :param cursor: Cursor of the page to fetch
+    :return: Tuple of list of rating objects and next page cursor
     """
 
-    return db.query(models.Rating).filter_by(movie_id=movie_id).limit(limit).offset(offset).all()
+    # Only public columns of the related users are loaded in the same query
+    query = select(models.Rating).options(
+        joinedload(models.Rating.user).load_only(User.id, User.first_name, User.last_name)
+    ).filter_by(movie_id=movie_id)
+    order_by = [models.Rating.created_at, models.Rating.id]
+
+    return await get_page(db, query, order_by, limit, offset, cursor)
 
 
-def get_user_ratings_db(db: Session, user_id: uuid.UUID, limit: int, offset: int):
+async def get_user_ratings_db(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    offset: int,
+    cursor: str = None
+):
     """
     Get ratings posted by a user
 
     :param db: DB session object
     :param user_id: User UUID
     :param limit: Limit the resulting rows
-    :param offset: Offset for the rowss
+    :param offset: Offset for the rows
+    :param cursor: Cursor of the page to fetch
+    :return: Tuple of list of rating objects and next page cursor
+    """
+
+    # Only listing columns of the related movies are loaded in the same query
+    query = select(models.Rating).options(
+        joinedload(models.Rating.movie).load_only(
+            models.Movie.id,
+            models.Movie.name,
+            models.Movie.year,
+            models.Movie.ratings_count,
+            models.Movie.ratings_sum
+        )
+    ).filter_by(user_id=user_id)
+    # Ratings are partitioned by movie, So a user page reads the user index of every partition
+    # and merges them (`benchmarks.rating_partitioning` measures it)
+    order_by = [models.Rating.created_at, models.Rating.id]
+
+    return await get_page(db, query, order_by, limit, offset, cursor)
+
+
+async def get_top_rated_movies_db(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    cursor: str = None
+):
+    """
+    Return movies ranked by their precomputed bayesian average rating
+
+    :param db: DB session object
+    :param limit: Limit the resulting rows
+    :param offset: Offset for the rows
+    :param cursor: Cursor of the page to fetch
+    :return: Tuple of list of movie objects and next page cursor
+    """
+
+    query = select(models.Movie).options(*get_movie_load_options(TOP_RATED_MOVIE_LIST_FIELDS))
+    order_by = [models.Movie.bayesian_rating, models.Movie.id]
+
+    return await get_page(db, query, order_by, limit, offset, cursor)
+
+
+async def recompute_rating_stats_db(db: AsyncSession) -> int:
     """
+    Rebuild rating stat of all the movies from the ratings table, In a single set based update.
+    Only the movies whose stat changed are updated, Their modified time is bumped so that
+    their detail ETag changes too.
+
+    :param db: DB session object
+    :return: Number of updated movies
+    """
+
+    # Ratings are added up in double precision, Like `add_rating_db` does
+    rating = "CAST(rating AS FLOAT)"
+    bucket = f"LEAST(FLOOR({rating} + 0.5), {models.RATING_BUCKETS - 1})"
+    histogram = ", ".join(
+        f"COUNT(*) FILTER (WHERE {bucket} = {index})" for index in range(models.RATING_BUCKETS)
+    )
+    empty_histogram = ", ".join("0" for _ in range(models.RATING_BUCKETS))
+    stat_columns = {
+        "ratings_count": "COALESCE(stat.count, 0)",
+        "ratings_sum": "COALESCE(stat.sum, 0)",
+        "ratings_histogram": (
+            f"CAST(COALESCE(stat.histogram, ARRAY[{empty_histogram}]) AS INTEGER[])"
+        ),
+        "bayesian_rating": (
+            "(CAST(:weight AS FLOAT) * CAST(:mean AS FLOAT) + COALESCE(stat.sum, 0))"
+            " / (CAST(:weight AS FLOAT) + COALESCE(stat.count, 0))"
+        ),
+    }
+    # Sums are added up in a different order than the incremental updates did, So they are
+    # compared with a relative tolerance instead of exactly
+    changed = [
+        f"(movies.{column} IS NULL OR ABS(movies.{column} - {value})"
+        f" > CAST(:tolerance AS FLOAT) * GREATEST(ABS({value}), 1))"
+        if column in ("ratings_sum", "bayesian_rating")
+        else f"(movies.{column} IS DISTINCT FROM {value})"
+        for column, value in stat_columns.items()
+    ]
+
+    result = await db.execute(sa.text(f"""
+        UPDATE movies SET
+            modified_at = timezone('utc', now()),
+            {", ".join(f"{column} = {value}" for column, value in stat_columns.items())}
+        FROM movies AS movie
+        LEFT JOIN (
+            SELECT movie_id, COUNT(*) AS count, SUM({rating}) AS sum,
+                ARRAY[{histogram}] AS histogram
+            FROM ratings
+            GROUP BY movie_id
+        ) AS stat ON stat.movie_id = movie.id
+        WHERE movies.id = movie.id AND ({" OR ".join(changed)})
+        RETURNING movies.id
+    """), {
+        "weight": settings.RATING_PRIOR_WEIGHT,
+        "mean": settings.RATING_PRIOR_MEAN,
+        "tolerance": RATING_STAT_TOLERANCE,
+    })
+
+    movie_ids = result.scalars().all()
+    await db.commit()
+
+    if movie_ids:
+        await response_cache.invalidate(MOVIES_NAMESPACE, *map(get_movie_namespace, movie_ids))
+
+    return len(movie_ids)
+
+
+async def stream_movies_db(db: AsyncSession, batch_size: int):
+    """
+    Stream all movies through a server side cursor, Plain rows are fetched instead of
+    ORM objects, So memory stays constant regardless of the table size
+
+    :param db: DB session object
+    :param batch_size: Number of rows fetched per round trip
+    :return: Async iterator of list of row mappings
+    """
+
+    result = await db.stream(select(
+        models.Movie.id,
+        models.Movie.created_at,
+        models.Movie.name,
+        models.Movie.year,
+        models.Movie.description,
+        models.Movie.extra,
+        models.Movie.ratings_count,
+        models.Movie.ratings_sum,
+        models.Movie.added_by_id
+    ).execution_options(yield_per=batch_size))
+
+    async for partition in result.mappings().partitions():
+        yield partition
+
+
+async def stream_ratings_db(db: AsyncSession, batch_size: int, movie_id: uuid.UUID = None):
+    """
+    Stream all ratings (or ratings of a movie) through a server side cursor
+
+    :param db: DB session object
+    :param batch_size: Number of rows fetched per round trip
+    :param movie_id: Optional Movie UUID
+    :return: Async iterator of list of row mappings
+    """
+
+    query = select(
+        models.Rating.id,
+        models.Rating.created_at,
+        models.Rating.movie_id,
+        models.Rating.user_id,
+        models.Rating.rating,
+        models.Rating.review
+    )
+
+    if movie_id:
+        query = query.where(models.Rating.movie_id == movie_id)
+
+    result = await db.stream(query.execution_options(yield_per=batch_size))
 
-    return db.query(models.Rating).filter_by(user_id=user_id).limit(limit).offset(offset).all()
+    async for partition in result.mappings().partitions():
+        yield partition
@@ -0,0 +1,78 @@
+"""
+Contain catalog export helpers, Which serialize streamed DB rows into NDJSON or CSV chunks
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from database import SessionLocal
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+MOVIE_COLUMNS = [
+    "id", "created_at", "name", "year", "description",
+    "extra", "ratings_count", "ratings_sum", "added_by_id"
+]
+RATING_COLUMNS = ["id", "created_at", "movie_id", "user_id", "rating", "review"]
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv",
+}
+
+
+def serialize_rows(rows: list, file_format: str, columns: list[str], header: bool) -> str:
+    """
+    Serialize a batch of row mappings
+
+    :param rows: List of row mappings
+    :param file_format: ndjson or csv
+    :param columns: Column names
+    :param header: Include CSV header or not
+    :return: Serialized text chunk
+    """
+
+    if file_format == NDJSON:
+        return "".join(json.dumps(dict(row), default=str) + "\n" for row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if header:
+        writer.writerow(columns)
+
+    for row in rows:
+        writer.writerow([
+            json.dumps(row[column]) if isinstance(row[column], (dict, list)) else row[column]
+            for column in columns
+        ])
+
+    return buffer.getvalue()
+
+
+async def export_rows(
+    stream_func,
+    file_format: str,
+    columns: list[str],
+    **kwargs
+) -> AsyncIterator[str]:
+    """
+    Run the given CRUD stream function in its own DB session and yield serialized chunks.
+    Session is opened here, Since the response keeps streaming after the route returns.
+
+    :param stream_func: CRUD function streaming batches of row mappings
+    :param file_format: ndjson or csv
+    :param columns: Column names, Used for the CSV header and order
+    :param kwargs: Keyword arguments of the stream function
+    :return: Async iterator of text chunks
+    """
+
+    header = True
+
+    async with SessionLocal() as db:
+        async for rows in stream_func(db, **kwargs):
+            yield serialize_rows(rows, file_format, columns, header)
+            header = False
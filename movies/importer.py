@@ -0,0 +1,234 @@
+"""
+Contain bulk movie import helpers, Shared by the import API and the import command.
+
+Rows are streamed line by line (NDJSON or CSV with a header), Validated with the same
+rules as the add movie API and written in batches, So memory stays flat for large files.
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import settings
+import strings
+from movies import crud, schemas
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a stream of byte chunks into lines, Lines are decoded by the importer
+    so that a line which is not valid UTF-8 fails its own row only
+
+    :param chunks: Async iterable of byte chunks, e.g. request body stream
+    :return: Async iterator of lines
+    """
+
+    buffer = b""
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            yield line.rstrip(b"\r")
+
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+async def iter_records(
+    lines: AsyncIterable[bytes],
+    file_format: str
+) -> AsyncIterator[tuple[int, str | None]]:
+    """
+    Decode the lines and group them into records, A CSV record spans several lines
+    when a quoted field (e.g. description) contains line breaks
+
+    :param lines: Async iterable of raw NDJSON/CSV lines
+    :param file_format: ndjson or csv
+    :return: Async iterator of the first line number and text of every record,
+        Text is None when the record is not valid UTF-8
+    """
+
+    line_number = 0
+    record_line = 0
+    record = []
+    quote_count = 0
+
+    async for line in lines:
+        line_number += 1
+
+        try:
+            text = line.decode("utf-8")
+        except UnicodeDecodeError:
+            # Rest of the broken record is dropped along with it
+            yield (record_line if record else line_number), None
+            record.clear()
+            quote_count = 0
+            continue
+
+        if not record and not text.strip():
+            continue
+
+        if file_format == NDJSON:
+            yield line_number, text
+            continue
+
+        if not record:
+            record_line = line_number
+
+        record.append(text)
+        quote_count += text.count('"')
+
+        # Quotes are balanced at the end of a record, Since quotes within a field are doubled
+        if quote_count % 2 == 0:
+            yield record_line, "\n".join(record)
+            record.clear()
+
+    if record:
+        yield record_line, "\n".join(record)
+
+
+def parse_csv_record(record: str) -> list[str]:
+    """
+    Parse a single CSV record, Which may contain line breaks within quoted fields
+
+    :param record: Raw record
+    :return: List of field values
+    """
+
+    return next(csv.reader(io.StringIO(record), strict=True))
+
+
+def parse_row(record: str, file_format: str, header: list[str] | None) -> dict:
+    """
+    Parse a single NDJSON or CSV record into a dict
+
+    :param record: Raw record
+    :param file_format: ndjson or csv
+    :param header: CSV header columns
+    :return: Dict of movie data
+    """
+
+    if file_format == NDJSON:
+        data = json.loads(record)
+
+        if not isinstance(data, dict):
+            raise ValueError(strings.IMPORT_INVALID_ROW)
+
+        return data
+
+    data = dict(zip(header, parse_csv_record(record)))
+
+    # Extra metadata is passed as a JSON string in CSV
+    data["extra"] = json.loads(data["extra"]) if data.get("extra") else {}
+    return data
+
+
+def validate_row(data: dict) -> schemas.MovieAddRequest:
+    """
+    Validate movie data, With the same rules as the add movie API
+
+    :param data: Dict of movie data
+    :return: Movie add request instance
+    """
+
+    movie = schemas.MovieAddRequest(**data)
+
+    if not 1000 <= movie.year <= 9999:
+        raise ValueError(strings.INVALID_YEAR_ERROR)
+
+    return movie
+
+
+async def import_movies(
+    db: AsyncSession,
+    lines: AsyncIterable[bytes],
+    file_format: str,
+    added_by_id,
+    batch_size: int = settings.MOVIE_IMPORT_BATCH_SIZE,
+    max_errors: int = settings.MOVIE_IMPORT_MAX_ERRORS
+) -> schemas.MovieImportResponse:
+    """
+    Import movies from the given lines, Rows with a name which already exists are skipped
+
+    :param db: DB session object
+    :param lines: Async iterable of raw NDJSON/CSV lines
+    :param file_format: ndjson or csv
+    :param added_by_id: User ID who is importing the movies
+    :param batch_size: Number of rows written per insert
+    :param max_errors: Number of row errors returned, The rest are only counted
+    :return: Import summary along with the per row errors
+    :raises ValueError: If the CSV header is not valid UTF-8
+    """
+
+    header = None
+    batch = []
+    inserted_count = 0
+    duplicate_count = 0
+    failed_count = 0
+    errors = []
+
+    def _add_error(error: schemas.MovieImportError):
+        if len(errors) < max_errors:
+            errors.append(error)
+
+    async def _flush():
+        nonlocal inserted_count, duplicate_count
+
+        inserted_names = await crud.bulk_add_movies_db(
+            db, [movie for _, movie in batch], added_by_id
+        )
+        inserted_count += len(inserted_names)
+
+        for line_number, movie in batch:
+            if movie.name in inserted_names:
+                # Same name again within the file is a duplicate as well
+                inserted_names.discard(movie.name)
+                continue
+
+            duplicate_count += 1
+            _add_error(schemas.MovieImportError(
+                line=line_number, name=movie.name, error=strings.IMPORT_DUPLICATE_MOVIE
+            ))
+
+        batch.clear()
+
+    async for line_number, record in iter_records(lines, file_format):
+        if file_format == CSV and header is None:
+            if record is None:
+                raise ValueError(strings.IMPORT_HEADER_ERROR)
+
+            header = parse_csv_record(record)
+            continue
+
+        try:
+            if record is None:
+                raise ValueError(strings.IMPORT_ENCODING_ERROR)
+
+            batch.append((line_number, validate_row(parse_row(record, file_format, header))))
+        except (ValueError, TypeError, ValidationError, csv.Error) as e:
+            failed_count += 1
+            _add_error(schemas.MovieImportError(line=line_number, error=str(e)))
+
+        if len(batch) >= batch_size:
+            await _flush()
+
+    if batch:
+        await _flush()
+
+    return schemas.MovieImportResponse(
+        message=strings.MOVIE_IMPORT_SUCCESS,
+        inserted=inserted_count,
+        duplicates=duplicate_count,
+        failed=failed_count,
+        errors=errors,
+        errors_omitted=duplicate_count + failed_count - len(errors)
+    )
@@ -2,12 +2,126 @@
 Contain movie related model
 """
 
+import re
+import struct
+import unicodedata
+
 import sqlalchemy as sa
-from sqlalchemy.orm import validates, relationship
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import validates, relationship, deferred
 
+import settings
 import strings
 from database import Base
 
+# Text search configuration used for building and querying movie search vector
+SEARCH_CONFIG = "english"
+
+# Leading articles are ignored while comparing movie names, i.e. "The Matrix" == "Matrix, The"
+NAME_ARTICLES = ("the", "a", "an")
+
+# Ratings histogram has one bucket for each whole rating from 0 to 10
+RATING_BUCKETS = 11
+
+
+def get_stored_rating(rating: float) -> float:
+    """
+    Round a rating to the single precision (REAL) of the ratings column, So that the
+    precomputed stat adds up the same values as a recompute from the ratings table does
+    """
+
+    return struct.unpack("f", struct.pack("f", float(rating)))[0]
+
+
+def get_rating_bucket(rating: float) -> int:
+    """
+    Return histogram bucket index of a rating, Rating is rounded half up to the whole number
+    """
+
+    return min(int(float(rating) + 0.5), RATING_BUCKETS - 1)
+
+
+def get_bayesian_rating(ratings_sum, ratings_count):
+    """
+    Weighted average which pulls movies with few ratings towards the prior mean,
+    So that a single 10 does not rank a movie above well rated popular movies
+
+    :param ratings_sum: Sum of all the ratings of a movie, Value or SQL expression
+    :param ratings_count: Number of ratings of a movie, Value or SQL expression
+    :return: Bayesian average rating value or SQL expression
+    """
+
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (weight * settings.RATING_PRIOR_MEAN + ratings_sum) / (weight + ratings_count)
+
+
+def get_search_vector(name, description):
+    """
+    Build weighted search vector SQL expression, Movie name is ranked higher than description
+
+    :param name: Movie name value or column
+    :param description: Movie description value or column
+    :return: SQL expression of tsvector type
+    """
+
+    name_vector = sa.func.setweight(
+        sa.func.to_tsvector(SEARCH_CONFIG, sa.func.coalesce(name, "")),
+        sa.literal_column("'A'")
+    )
+    description_vector = sa.func.setweight(
+        sa.func.to_tsvector(SEARCH_CONFIG, sa.func.coalesce(description, "")),
+        sa.literal_column("'B'")
+    )
+
+    return name_vector.op("||", return_type=TSVECTOR)(description_vector)
+
+
+def get_search_query(search: str):
+    """
+    Build prefix matching tsquery SQL expression from the raw search string,
+    So that partially typed last word also matches
+
+    :param search: Raw search string
+    :return: SQL expression of tsquery type or None if search contains no words
+    """
+
+    words = re.findall(r"\w+", search.lower())
+
+    if not words:
+        return None
+
+    return sa.func.to_tsquery(SEARCH_CONFIG, " & ".join(words) + ":*")
+
+
+def get_normalized_name(name: str) -> str:
+    """
+    Normalize a movie name for duplicate detection, Case, accents, punctuation and
+    leading (or trailing after a comma) article are ignored
+
+    :param name: Raw movie name
+    :return: Normalized name, i.e. "Matrix, The" -> "matrix"
+    """
+
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char)).lower().strip()
+
+    # "Matrix, The" is the library style of "The Matrix"
+    match = re.fullmatch(rf"(.+),\s*(?:{'|'.join(NAME_ARTICLES)})", name)
+    words = re.findall(r"\w+", match.group(1) if match else name)
+
+    if len(words) > 1 and words[0] in NAME_ARTICLES:
+        words = words[1:]
+
+    return " ".join(words)
+
+
+def get_trigram_index(name: str, column: str) -> sa.Index:
+    """
+    Build trigram GIN index of a column, For similarity lookups using the `%` operator
+    """
+
+    return sa.Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
 
 class Movie(Base):
     """
@@ -21,15 +135,22 @@ class Movie(Base):
 
     added_by_id = sa.Column(sa.UUID, sa.ForeignKey("users.id"), index=True)
     name = sa.Column(sa.String, unique=True, index=True)
+    # Kept in sync with name on write, For duplicate detection and similar names
+    normalized_name = sa.Column(sa.String, nullable=True)
     year = sa.Column(sa.Integer)
     description = sa.Column(sa.Text(length=2000), nullable=True)
 
     # This will store any other metadata related to the movie
     extra = sa.Column(sa.JSON, default={})
 
+    # Full text search document, Kept in sync with name and description on write
+    search_vector = deferred(sa.Column(TSVECTOR, nullable=True))
+
     # Rating stat
     ratings_count = sa.Column(sa.Integer, default=0)
     ratings_sum = sa.Column(sa.Float, default=0.0)
+    ratings_histogram = sa.Column(ARRAY(sa.Integer), default=lambda: [0] * RATING_BUCKETS)
+    bayesian_rating = sa.Column(sa.Float, default=lambda: get_bayesian_rating(0.0, 0))
 
     rating = relationship("Rating", back_populates="movie")
 
@@ -37,6 +158,17 @@ class Movie(Base):
 
     __table_args__ = (
         sa.UniqueConstraint("name", name="unique_movie_name"),
+        sa.Index("movie_search_vector_idx", "search_vector", postgresql_using="gin"),
+        # Keyset pagination indexes
+        sa.Index("movie_created_at_id_idx", "created_at", "id"),
+        sa.Index("movie_added_by_created_at_id_idx", "added_by_id", "created_at", "id"),
+        # Top rated movies index
+        sa.Index("movie_bayesian_rating_id_idx", "bayesian_rating", "id"),
+        # Name prefix (autocomplete) index
+        sa.Index("movie_name_prefix_idx", sa.text("lower(name) text_pattern_ops")),
+        # Exact duplicate and similar name lookup indexes
+        sa.Index("movie_normalized_name_idx", "normalized_name"),
+        get_trigram_index("movie_normalized_name_trgm_idx", "normalized_name"),
     )
 
     def __str__(self):
@@ -57,6 +189,7 @@ class Movie(Base):
         return round(self.ratings_sum / self.ratings_count, 2) if self.ratings_count else 0.00
 
 
+
 class Rating(Base):
     """
     Store rating given by user to a movie
@@ -67,7 +200,8 @@ class Rating(Base):
     modified_at = sa.Column(sa.DateTime)
 
     user_id = sa.Column(sa.UUID, sa.ForeignKey("users.id"))
-    movie_id = sa.Column(sa.UUID, sa.ForeignKey("movies.id"))
+    # Partition key, So it is a part of the primary key as Postgres requires
+    movie_id = sa.Column(sa.UUID, sa.ForeignKey("movies.id"), primary_key=True)
     rating = sa.Column(
         sa.Float(precision=2, asdecimal=True, decimal_return_scale=2))
     review = sa.Column(sa.String, nullable=True)
@@ -79,6 +213,12 @@ class Rating(Base):
 
     __table_args__ = (
         sa.UniqueConstraint("user_id", "movie_id", name="unique_movie_rating"),
+        # Keyset pagination indexes
+        sa.Index("rating_movie_created_at_id_idx", "movie_id", "created_at", "id"),
+        sa.Index("rating_user_created_at_id_idx", "user_id", "created_at", "id"),
+        # Hash partitioned by movie, So that all the ratings of a movie are in one partition.
+        # Partitions (ratings_p0, ratings_p1, ...) are created by the migration.
+        {"postgresql_partition_by": "HASH (movie_id)"},
     )
 
     def __str__(self):
@@ -5,18 +5,26 @@ Contain all movie and rating related API routes
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import exc
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+import settings
 import strings
 from auth.models import User
 from auth.schemas import UserPublic
-from base.dependencies import get_current_user, get_db
+from base.dependencies import get_current_user, get_db, get_read_db
+from base.response_cache import MOVIES_NAMESPACE, get_movie_namespace, response_cache
+from base.routing import ModelRoute
+from base.sparse import get_sparse_response_model, parse_fields
 from movies import crud
+from movies import exporter
+from movies import importer
 from movies import schemas
+from movies.suggest import movie_name_index
 
-router = APIRouter()
+router = APIRouter(route_class=ModelRoute)
 
 
 @router.post(
@@ -27,7 +35,7 @@ router = APIRouter()
 async def add_movie(
     movie_request: schemas.MovieAddRequest,
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     API route for adding a movie
@@ -48,7 +56,7 @@ async def add_movie(
             raise HTTPException(detail=strings.INVALID_YEAR_ERROR,
                                 status_code=status.HTTP_400_BAD_REQUEST)
 
-        db_movie = crud.add_movie_db(
+        db_movie = await crud.add_movie_db(
             db=db,
             movie=movie_request,
             added_by_id=str(user.id)
@@ -64,37 +72,322 @@ async def add_movie(
         ) from e
 
 
+@router.post(
+    path="/movie/import/",
+    response_model=schemas.MovieImportResponse,
+    status_code=status.HTTP_200_OK
+)
+async def import_movies(
+    request: Request,
+    user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_format: str = importer.NDJSON
+):
+    """
+    API route for bulk importing movies, Request body is streamed as NDJSON
+    or CSV (with header: name,year,description,extra) lines
+
+    :param request: Request object
+    :param user: Current User object
+    :param db: DB session object
+    :param file_format: query param, ndjson or csv
+    :return: Instance of movie import response schema
+    """
+
+    if file_format not in (importer.NDJSON, importer.CSV):
+        raise HTTPException(detail=strings.IMPORT_FORMAT_ERROR,
+                            status_code=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        return await importer.import_movies(
+            db=db,
+            lines=importer.iter_lines(request.stream()),
+            file_format=file_format,
+            added_by_id=user.id
+        )
+    except ValueError as e:
+        # CSV header is not readable, So none of the rows can be
+        raise HTTPException(detail=str(e), status_code=status.HTTP_400_BAD_REQUEST) from e
+    except exc.SQLAlchemyError as e:
+        # Sent error response if any SQL exception caught
+        raise HTTPException(
+            detail=strings.MOVIE_IMPORT_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from e
+
+
 @router.get(
     path="/movie/",
     response_model=schemas.MovieListResponse,
     status_code=status.HTTP_200_OK
 )
 async def get_movie_list(
+    request: Request,
     limit: int,
-    offset: int,
-    db: Annotated[Session, Depends(get_db)],
-    search: str = ""
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    offset: int = 0,
+    search: str = "",
+    cursor: str = None,
+    fields: str = None
 ):
     """
-    Public API for getting list of movies
+    Public API for getting list of movies, Served from the response cache
 
+    :param request: Request object
     :param limit: query param
     :param offset: query param
     :param search: Search query params
+    :param cursor: Next page cursor returned by the previous page
+    :param fields: query param, Comma separated movie fields to return, All of them by default
     :param db: DB session object
     :return: Instance of movie list response pydantic model
     """
 
-    db_movies = crud.get_movies_db(db, search, limit, offset)
+    movie_fields = parse_fields(fields, schemas.MovieList)
+    response_model = get_sparse_response_model(schemas.MovieListResponse, "results", movie_fields)
+
+    async def build():
+        db_movies, next_cursor = await crud.get_movies_db(
+            db, search, limit, offset, cursor, movie_fields)
+
+        for db_movie in db_movies:
+            setattr(db_movie, "avg_rating", db_movie.get_avg_rating())
+
+        return response_model.model_validate(
+            {"results": db_movies, "next_cursor": next_cursor}, from_attributes=True
+        ), None
+
+    return await response_cache.get_response(request, [MOVIES_NAMESPACE], build)
+
+
+@router.get(
+    path="/movie/top-rated/",
+    response_model=schemas.TopRatedMovieListResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_top_rated_movie_list(
+    request: Request,
+    limit: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    offset: int = 0,
+    cursor: str = None
+):
+    """
+    Public API for getting movies ranked by their bayesian average rating,
+    Served from the response cache
+
+    :param request: Request object
+    :param limit: query param
+    :param offset: query param
+    :param cursor: Next page cursor returned by the previous page
+    :param db: DB session object
+    :return: Instance of top rated movie list response pydantic model
+    """
+
+    async def build():
+        db_movies, next_cursor = await crud.get_top_rated_movies_db(db, limit, offset, cursor)
 
-    movies = [schemas.MovieList(
-        id=db_movie.id,
-        name=db_movie.name,
-        year=db_movie.year,
-        avg_rating=db_movie.get_avg_rating()
-    ) for db_movie in db_movies]
+        movies = [schemas.TopRatedMovieList(
+            id=db_movie.id,
+            name=db_movie.name,
+            year=db_movie.year,
+            avg_rating=db_movie.get_avg_rating(),
+            ratings_count=db_movie.ratings_count,
+            bayesian_rating=round(db_movie.bayesian_rating, 2)
+        ) for db_movie in db_movies]
 
-    return schemas.MovieListResponse(results=movies)
+        return schemas.TopRatedMovieListResponse(results=movies, next_cursor=next_cursor), None
+
+    return await response_cache.get_response(request, [MOVIES_NAMESPACE], build)
+
+
+@router.get(
+    path="/movie/suggest/",
+    response_model=schemas.MovieSuggestionResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_movie_suggestions(
+    prefix: str,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: int = 10
+):
+    """
+    Public API for autocompleting movie names, Served from the in-memory name index
+
+    :param prefix: query param, Case-insensitive start of the movie name
+    :param limit: query param
+    :param db: DB session object, Only used until the name index is loaded
+    :return: Instance of movie suggestion response pydantic model
+    """
+
+    prefix = prefix.strip()
+    limit = max(min(limit, settings.SUGGEST_MAX_LIMIT), 0)
+
+    if not prefix or not limit:
+        return schemas.MovieSuggestionResponse(results=[])
+
+    if movie_name_index.is_loaded:
+        return schemas.MovieSuggestionResponse(results=movie_name_index.search(prefix, limit))
+
+    names = await crud.get_movie_suggestions_db(db, prefix, limit)
+    return schemas.MovieSuggestionResponse(results=names)
+
+
+@router.get(
+    path="/movie/export/",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK
+)
+async def export_movies(
+    _: Annotated[User, Depends(get_current_user)],
+    file_format: str = exporter.NDJSON
+):
+    """
+    API for exporting the whole movie catalog, Streamed as NDJSON or CSV
+
+    :param file_format: query param, ndjson or csv
+    :return: Streaming response
+    """
+
+    if file_format not in exporter.MEDIA_TYPES:
+        raise HTTPException(detail=strings.EXPORT_FORMAT_ERROR,
+                            status_code=status.HTTP_400_BAD_REQUEST)
+
+    return StreamingResponse(
+        exporter.export_rows(
+            crud.stream_movies_db,
+            file_format,
+            exporter.MOVIE_COLUMNS,
+            batch_size=settings.EXPORT_BATCH_SIZE
+        ),
+        media_type=exporter.MEDIA_TYPES[file_format]
+    )
+
+
+def get_batch_movie_ids(movie_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+    """
+    Validate the number of requested movie IDs, Duplicates are dropped
+
+    :param movie_ids: Requested movie IDs
+    :return: Unique movie IDs in the requested order
+    """
+
+    movie_ids = list(dict.fromkeys(movie_ids))
+
+    if not 0 < len(movie_ids) <= settings.MOVIE_BATCH_MAX_IDS:
+        raise HTTPException(
+            detail=strings.MOVIE_BATCH_IDS_ERROR.format(settings.MOVIE_BATCH_MAX_IDS),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    return movie_ids
+
+
+async def get_movie_batch(
+    db: AsyncSession,
+    movie_ids: list[uuid.UUID],
+    fields: str | None
+) -> schemas.MovieBatchResponse:
+    """
+    Fetch the given movies in a single query, Shared by the GET and POST batch routes
+
+    :param db: DB session object
+    :param movie_ids: Unique movie IDs
+    :param fields: Comma separated movie fields to return, All of them when None
+    :return: Instance of movie batch response pydantic model
+    """
+
+    movie_fields = parse_fields(fields, schemas.Movie)
+    response_model = get_sparse_response_model(schemas.MovieBatchResponse, "results", movie_fields)
+    db_movies = await crud.get_movies_by_ids_db(db, movie_ids, movie_fields)
+
+    for db_movie in db_movies:
+        setattr(db_movie, "avg_rating", db_movie.get_avg_rating())
+
+    found_ids = {db_movie.id for db_movie in db_movies}
+    return response_model(
+        results=db_movies,
+        missing=[movie_id for movie_id in movie_ids if movie_id not in found_ids]
+    )
+
+
+@router.get(
+    path="/movie/batch/",
+    response_model=schemas.MovieBatchResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_movie_batch_by_ids(
+    request: Request,
+    ids: str,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    fields: str = None
+):
+    """
+    Public API for getting details of several movies at once, Served from the response cache.
+    Use the POST variant when the IDs don't fit in the URL
+
+    :param request: Request object
+    :param ids: query param, Comma separated movie IDs
+    :param fields: query param, Comma separated movie fields to return, All of them by default
+    :param db: DB session object
+    :return: Instance of movie batch response pydantic model
+    """
+
+    try:
+        movie_ids = get_batch_movie_ids(
+            [uuid.UUID(movie_id.strip()) for movie_id in ids.split(",") if movie_id.strip()]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            detail=strings.MOVIE_BATCH_IDS_ERROR.format(settings.MOVIE_BATCH_MAX_IDS),
+            status_code=status.HTTP_400_BAD_REQUEST
+        ) from e
+
+    async def build():
+        return await get_movie_batch(db, movie_ids, fields), None
+
+    try:
+        # Response is stale once any of the movies changes
+        return await response_cache.get_response(
+            request, [get_movie_namespace(movie_id) for movie_id in movie_ids], build
+        )
+
+    except exc.SQLAlchemyError as e:
+        # Sent error response if any SQL exception caught
+        raise HTTPException(
+            detail=strings.MOVIE_DETAIL_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from e
+
+
+@router.post(
+    path="/movie/batch/",
+    response_model=schemas.MovieBatchResponse,
+    status_code=status.HTTP_200_OK
+)
+async def post_movie_batch_by_ids(
+    batch_request: schemas.MovieBatchRequest,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    fields: str = None
+):
+    """
+    Public API for getting details of several movies at once, With the IDs in the request body
+
+    :param batch_request: Movie batch request pydantic model instance
+    :param fields: query param, Comma separated movie fields to return, All of them by default
+    :param db: DB session object
+    :return: Instance of movie batch response pydantic model
+    """
+
+    try:
+        return await get_movie_batch(db, get_batch_movie_ids(batch_request.ids), fields)
+
+    except exc.SQLAlchemyError as e:
+        # Sent error response if any SQL exception caught
+        raise HTTPException(
+            detail=strings.MOVIE_DETAIL_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from e
 
 
 @router.get(
@@ -103,21 +396,39 @@ async def get_movie_list(
     status_code=status.HTTP_200_OK
 )
 async def get_movie_by_id(
+    request: Request,
     movie_id: uuid.UUID,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    fields: str = None
 ):
     """
-    Public API for getting detail of a movie by its ID
+    Public API for getting detail of a movie by its ID, Served from the response cache
 
+    :param request: Request object
     :param movie_id: Path parameter
+    :param fields: query param, Comma separated movie fields to return, All of them by default
     :param db: DB session object
     :return: Instance of movie response pydantic model
     """
 
-    try:
-        db_movie = crud.get_movie_by_id_db(db, movie_id)
+    movie_fields = parse_fields(fields, schemas.Movie)
+    response_model = get_sparse_response_model(schemas.MovieResponse, "data", movie_fields)
+
+    async def build():
+        db_movie = await crud.get_movie_by_id_db(db, movie_id, movie_fields)
         setattr(db_movie, "avg_rating", db_movie.get_avg_rating())
-        return schemas.MovieResponse(message="", data=db_movie)
+
+        # Detail changes only on update or on a new rating, A sparse detail is tagged
+        # by its body instead as the modified time may not be loaded
+        etag = None if movie_fields else (
+            f'"{db_movie.id}-{db_movie.modified_at.timestamp()}-{db_movie.ratings_count}"'
+        )
+        return response_model(message="", data=db_movie), etag
+
+    try:
+        return await response_cache.get_response(
+            request, [get_movie_namespace(movie_id)], build
+        )
 
     except exc.SQLAlchemyError as e:
         # Sent error response if any SQL exception caught
@@ -136,7 +447,7 @@ async def update_movie_detail(
     movie_id: uuid.UUID,
     movie_request: schemas.MovieUpdateRequest,
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     API route for update a movie details
@@ -149,7 +460,7 @@ async def update_movie_detail(
     """
 
     try:
-        db_movie = crud.get_movie_by_id_db(db, movie_id)
+        db_movie = await crud.get_movie_by_id_db(db, movie_id)
 
         # Check if current is the owener of the given movie
         if db_movie.added_by_id != user.id:
@@ -172,7 +483,7 @@ async def update_movie_detail(
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        db_movie = crud.update_movie_db(db, db_movie, updated_data)
+        db_movie = await crud.update_movie_db(db, db_movie, updated_data)
         setattr(db_movie, "avg_rating", db_movie.get_avg_rating())
 
         return schemas.MovieResponse(message=strings.MOVIE_UPDATE_SUCCESS, data=db_movie)
@@ -193,7 +504,7 @@ async def update_movie_detail(
 async def delete_movie(
     movie_id: uuid.UUID,
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     API route to delete a movie
@@ -205,14 +516,14 @@ async def delete_movie(
     """
 
     try:
-        db_movie = crud.get_movie_by_id_db(db, movie_id)
+        db_movie = await crud.get_movie_by_id_db(db, movie_id)
 
         # Check if current is the owener of the given movie
         if db_movie.added_by_id != user.id:
             raise HTTPException(detail=strings.PERMISSION_ERROR,
                                 status_code=status.HTTP_403_FORBIDDEN)
 
-        crud.delete_movie_db(db, db_movie)
+        await crud.delete_movie_db(db, db_movie)
         return schemas.GenericMessageResponse(message=strings.MOVIE_DELETE_SUCCESS)
 
     except exc.SQLAlchemyError as e:
@@ -230,30 +541,35 @@ async def delete_movie(
 )
 async def get_user_movie_list(
     limit: int,
-    offset: int,
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)],
+    offset: int = 0,
+    cursor: str = None,
+    fields: str = None
 ):
     """
     API for getting list of movies added by current user
 
     :param limit: query param
     :param offset: query param
+    :param cursor: Next page cursor returned by the previous page
+    :param fields: query param, Comma separated movie fields to return, All of them by default
     :param user: Current User object
     :param db: DB session object
     :return: Instance of movie list response pydantic model
     """
 
-    db_movies = crud.get_movies_by_user_db(db, user.id, limit, offset)
+    movie_fields = parse_fields(fields, schemas.MovieList)
+    response_model = get_sparse_response_model(schemas.MovieListResponse, "results", movie_fields)
+    db_movies, next_cursor = await crud.get_movies_by_user_db(
+        db, user.id, limit, offset, cursor, movie_fields)
 
-    movies = [schemas.MovieList(
-        id=db_movie.id,
-        name=db_movie.name,
-        year=db_movie.year,
-        avg_rating=db_movie.get_avg_rating()
-    ) for db_movie in db_movies]
+    for db_movie in db_movies:
+        setattr(db_movie, "avg_rating", db_movie.get_avg_rating())
 
-    return schemas.MovieListResponse(results=movies)
+    return response_model.model_validate(
+        {"results": db_movies, "next_cursor": next_cursor}, from_attributes=True
+    )
 
 
 @router.post(
@@ -264,7 +580,7 @@ async def get_user_movie_list(
 async def add_rating(
     rating_request: schemas.RatingRequest,
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     API adding rating & review of a movie
@@ -284,7 +600,7 @@ async def add_rating(
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        db_rating = crud.add_rating_db(db, rating_request, user.id)
+        db_rating = await crud.add_rating_db(db, rating_request, user.id)
         rating = schemas.Rating(
             id=db_rating.id,
             rating=db_rating.rating,
@@ -308,21 +624,23 @@ async def add_rating(
 )
 async def get_user_ratings(
     limit: int,
-    offset: int,
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)],
+    offset: int = 0,
+    cursor: str = None
 ):
     """
     API for getting ratings given by current user
 
     :param limit: query param
     :param offset: query param
+    :param cursor: Next page cursor returned by the previous page
     :param user: Current User object
     :param db: DB session object
     :return: Instance of rating list movie response schema
     """
 
-    db_ratings = crud.get_user_ratings_db(db, user.id, limit, offset)
+    db_ratings, next_cursor = await crud.get_user_ratings_db(db, user.id, limit, offset, cursor)
 
     ratings = [schemas.RatingMovieList(
         id=db_rating.id,
@@ -336,7 +654,41 @@ async def get_user_ratings(
         )
     ) for db_rating in db_ratings]
 
-    return schemas.RatingListMovieResponse(results=ratings)
+    return schemas.RatingListMovieResponse(results=ratings, next_cursor=next_cursor)
+
+
+@router.get(
+    path="/movie-rating/export/",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK
+)
+async def export_movie_ratings(
+    _: Annotated[User, Depends(get_current_user)],
+    movie_id: uuid.UUID = None,
+    file_format: str = exporter.NDJSON
+):
+    """
+    API for exporting all the ratings or ratings of a movie, Streamed as NDJSON or CSV
+
+    :param movie_id: Optional query param
+    :param file_format: query param, ndjson or csv
+    :return: Streaming response
+    """
+
+    if file_format not in exporter.MEDIA_TYPES:
+        raise HTTPException(detail=strings.EXPORT_FORMAT_ERROR,
+                            status_code=status.HTTP_400_BAD_REQUEST)
+
+    return StreamingResponse(
+        exporter.export_rows(
+            crud.stream_ratings_db,
+            file_format,
+            exporter.RATING_COLUMNS,
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            movie_id=movie_id
+        ),
+        media_type=exporter.MEDIA_TYPES[file_format]
+    )
 
 
 @router.get(
@@ -345,32 +697,40 @@ async def get_user_ratings(
     status_code=status.HTTP_200_OK
 )
 async def get_movie_ratings(
+    request: Request,
     limit: int,
-    offset: int,
     movie_id: uuid.UUID,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    offset: int = 0,
+    cursor: str = None
 ):
     """
-    Public API for getting ratings given by users to a movie
+    Public API for getting ratings given by users to a movie, Served from the response cache
 
+    :param request: Request object
     :param limit: query param
     :param offset: query param
+    :param cursor: Next page cursor returned by the previous page
     :param movie_id: query parms
     :param db: DB session object
     :return: Instance of rating list user response schema
     """
 
-    db_ratings = crud.get_movie_ratings_db(db, movie_id, limit, offset)
+    async def build():
+        db_ratings, next_cursor = await crud.get_movie_ratings_db(
+            db, movie_id, limit, offset, cursor)
 
-    ratings = [schemas.RatingUserList(
-        id=db_rating.id,
-        rating=db_rating.rating,
-        review=db_rating.review,
-        user=UserPublic(
-            id=db_rating.user.id,
-            first_name=db_rating.user.first_name,
-            last_name=db_rating.user.last_name
-        )
-    ) for db_rating in db_ratings]
+        ratings = [schemas.RatingUserList(
+            id=db_rating.id,
+            rating=db_rating.rating,
+            review=db_rating.review,
+            user=UserPublic(
+                id=db_rating.user.id,
+                first_name=db_rating.user.first_name,
+                last_name=db_rating.user.last_name
+            )
+        ) for db_rating in db_ratings]
+
+        return schemas.RatingUserListResponse(results=ratings, next_cursor=next_cursor), None
 
-    return schemas.RatingUserListResponse(results=ratings)
+    return await response_cache.get_response(request, [get_movie_namespace(movie_id)], build)
@@ -3,6 +3,7 @@ Contain movie and rating models related pydantic schemas
 """
 
 
+import uuid
 from datetime import datetime
 
 from pydantic import BaseModel, UUID4
@@ -22,6 +23,9 @@ class Movie(BaseModel):
     year: int
     description: str | None
     avg_rating: float
+    ratings_count: int
+    ratings_histogram: list[int]
+    bayesian_rating: float
     extra: dict
 
     class Config:
@@ -62,6 +66,23 @@ class MovieResponse(BaseModel):
     data: Movie
 
 
+class MovieBatchRequest(BaseModel):
+    """
+    Movie batch detail request schema
+    """
+
+    ids: list[uuid.UUID]
+
+
+class MovieBatchResponse(BaseModel):
+    """
+    Movie batch detail response schema, Movies are in the order of the requested IDs
+    """
+
+    results: list[Movie]
+    missing: list[uuid.UUID]
+
+
 class GenericMessageResponse(BaseModel):
     """
     Generic message response schema
@@ -124,6 +145,33 @@ class MovieListResponse(BaseModel):
     """
 
     results: list[MovieList]
+    next_cursor: str | None = None
+
+
+class TopRatedMovieList(MovieList):
+    """
+    Top rated movie list schema
+    """
+
+    ratings_count: int
+    bayesian_rating: float
+
+
+class TopRatedMovieListResponse(BaseModel):
+    """
+    Top rated movie list response schema
+    """
+
+    results: list[TopRatedMovieList]
+    next_cursor: str | None = None
+
+
+class MovieSuggestionResponse(BaseModel):
+    """
+    Movie name autocomplete response schema
+    """
+
+    results: list[str]
 
 
 class RatingMovieList(BaseModel):
@@ -143,6 +191,7 @@ class RatingListMovieResponse(BaseModel):
     """
 
     results: list[RatingMovieList]
+    next_cursor: str | None = None
 
 
 class RatingUserList(BaseModel):
@@ -162,3 +211,28 @@ class RatingUserListResponse(BaseModel):
     """
 
     results: list[RatingUserList]
+    next_cursor: str | None = None
+
+
+class MovieImportError(BaseModel):
+    """
+    Error of a single row of movie import
+    """
+
+    line: int
+    name: str | None = None
+    error: str
+
+
+class MovieImportResponse(BaseModel):
+    """
+    Movie import summary response schema
+    """
+
+    message: str
+    inserted: int
+    duplicates: int
+    failed: int
+    errors: list[MovieImportError]
+    # Number of errors left out of the list, Beyond `MOVIE_IMPORT_MAX_ERRORS`
+    errors_omitted: int = 0
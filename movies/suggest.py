@@ -0,0 +1,182 @@
+"""
+Contain in-memory movie name index used for autocomplete.
+
+Names are kept sorted by their lowercase form, So that a prefix lookup is a binary search
+followed by a slice. The index is loaded at startup, Updated in place by the movie CRUD
+functions of this worker, And reloaded periodically to pick up writes of the other workers.
+Until it is loaded the lookups fall back to the `text_pattern_ops` index in Postgres.
+"""
+
+import asyncio
+import bisect
+
+from sqlalchemy import select
+
+import settings
+from database import SessionLocal
+from movies import models
+
+logger = settings.get_logger(name=__name__)
+
+
+class MovieNameIndex:
+    """
+    Sorted list of movie names, Searchable by a case-insensitive prefix
+    """
+
+    # Failed loads are retried after 1, 2, 4... seconds, Up to the refresh interval
+    RETRY_SECONDS = 1
+    MAX_RETRY_SECONDS = 300
+
+    def __init__(self, refresh_seconds: int = 0):
+        self.refresh_seconds = refresh_seconds
+        self.keys = []
+        self.names = []
+        self.is_loaded = False
+        self.task = None
+        # Changes made while the index is being reloaded, Replayed on the new content
+        self.pending = None
+
+    @staticmethod
+    def get_key(name: str) -> str:
+        """
+        Return sort key of a name, Same string object is reused when it is already lowercase
+        """
+
+        key = name.lower()
+        return name if key == name else key
+
+    def build(self, names: list[str]) -> None:
+        """
+        Replace the index content with the given names
+        """
+
+        entries = sorted((self.get_key(name), name) for name in names)
+        self.keys = [key for key, _ in entries]
+        self.names = [name for _, name in entries]
+        self.is_loaded = True
+
+    def add(self, name: str) -> None:
+        """
+        Add a name to the index
+        """
+
+        if self.pending is not None:
+            self.pending.append((self.add, name))
+
+        key = self.get_key(name)
+        position = bisect.bisect_left(self.keys, key)
+
+        # Names are unique, So an existing entry is not added twice
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.names[position] == name:
+                return
+            position += 1
+
+        self.keys.insert(position, key)
+        self.names.insert(position, name)
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a name from the index, If it exists
+        """
+
+        if self.pending is not None:
+            self.pending.append((self.remove, name))
+
+        key = self.get_key(name)
+        position = bisect.bisect_left(self.keys, key)
+
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.names[position] == name:
+                del self.keys[position]
+                del self.names[position]
+                return
+            position += 1
+
+    def search(self, prefix: str, limit: int) -> list[str]:
+        """
+        Return first names (alphabetically) starting with the given prefix
+
+        :param prefix: Case-insensitive prefix
+        :param limit: Maximum number of names
+        :return: List of movie names
+        """
+
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        names = []
+
+        for position in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[position].startswith(prefix):
+                break
+            names.append(self.names[position])
+
+        return names
+
+    async def load(self) -> None:
+        """
+        Load all the movie names from the DB
+        """
+
+        self.pending = []
+
+        try:
+            async with SessionLocal() as db:
+                result = await db.stream(select(models.Movie.name).execution_options(
+                    yield_per=settings.EXPORT_BATCH_SIZE
+                ))
+                names = [name async for name in result.scalars()]
+        finally:
+            pending, self.pending = self.pending, None
+
+        self.build(names)
+
+        for change, name in pending:
+            change(name)
+
+        logger.info("Movie name index loaded with %s names", len(names))
+
+    def start(self) -> None:
+        """
+        Load the index in the background, So that startup is not delayed
+        """
+
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background task
+        """
+
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self) -> None:
+        failures = 0
+
+        while True:
+            try:
+                await self.load()
+                failures = 0
+
+            # Any error (e.g. DB not up yet at startup) must not end the task, Or the index
+            # would never be loaded. Cancellation is not an Exception, So stop() still ends it.
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.exception({"error": str(e)})
+                failures += 1
+                await asyncio.sleep(min(
+                    self.RETRY_SECONDS * 2 ** (failures - 1),
+                    self.refresh_seconds or self.MAX_RETRY_SECONDS
+                ))
+                continue
+
+            if not self.refresh_seconds:
+                return
+
+            await asyncio.sleep(self.refresh_seconds)
+
+
+movie_name_index = MovieNameIndex(refresh_seconds=settings.SUGGEST_INDEX_REFRESH_SECONDS)
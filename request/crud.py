@@ -5,14 +5,18 @@ Contain request model related CRUD ORM queries/functions
 import uuid
 from datetime import datetime
 
-from sqlalchemy import delete
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from movies.models import Movie
+import settings
+from base.pagination import get_page
+from movies.models import Movie, get_normalized_name
 from request import models, schemas
 
 
-def add_request_db(db: Session, request: schemas.RequestData, user_id: uuid.UUID):
+async def add_request_db(db: AsyncSession, request: schemas.RequestData, user_id: uuid.UUID):
     """
     Add request object to DB
 
@@ -27,15 +31,26 @@ def add_request_db(db: Session, request: schemas.RequestData, user_id: uuid.UUID
         modified_at=datetime.utcnow(),
         user_id=user_id,
         name=request.name,
+        normalized_name=get_normalized_name(request.name),
+        votes_count=1,
+        status=models.Request.OPEN
     )
 
+    # Requester votes for its own request
     db.add(db_request)
-    db.commit()
+    await db.flush()
+    db.add(models.RequestVote(
+        id=uuid.uuid4(),
+        created_at=datetime.utcnow(),
+        request_id=db_request.id,
+        user_id=user_id
+    ))
+    await db.commit()
 
     return db_request
 
 
-def get_request_detail_db(db: Session, request_id: uuid.UUID):
+async def get_request_detail_db(db: AsyncSession, request_id: uuid.UUID):
     """
     Get details of a request object by ID from DB
 
@@ -43,10 +58,11 @@ def get_request_detail_db(db: Session, request_id: uuid.UUID):
     :param request_id: Request UUID
     """
 
-    return db.query(models.Request).get(request_id)
+    # Request owner is loaded along with the request, Since lazy loading is not available in async
+    return await db.get(models.Request, request_id, options=[joinedload(models.Request.user)])
 
 
-def delete_request_db(db: Session, request_id: uuid.UUID):
+async def delete_request_db(db: AsyncSession, request_id: uuid.UUID):
     """
     Delete request object from DB
 
@@ -54,23 +70,190 @@ def delete_request_db(db: Session, request_id: uuid.UUID):
     :param request_id: Request UUID
     """
 
-    db.execute(delete(models.Request).where(models.Request.id == request_id))
-    db.commit()
+    await db.execute(delete(models.Request).where(models.Request.id == request_id))
+    await db.commit()
+
+
+async def get_similar_names_db(
+    db: AsyncSession,
+    model,
+    name: str,
+    filters: list = None
+) -> list[str]:
+    """
+    Return names of the given model whose normalized name is similar (but not equal) to the
+    given name, Most similar first. These are only suggestions, Sequels like "Toy Story 2" and
+    "Toy Story 3" are similar enough to show up here although they are different movies.
+
+    :param db: DB Session object
+    :param model: Movie or Request model
+    :param name: Raw movie name
+    :param filters: Additional where clauses of the query
+    :return: List of names, At most `REQUEST_SIMILAR_LIMIT`
+    """
+
+    normalized_name = get_normalized_name(name)
+
+    # Threshold of the `%` operator, Applies only to the current transaction
+    await db.execute(select(func.set_config(
+        "pg_trgm.similarity_threshold", str(settings.REQUEST_SIMILARITY_THRESHOLD), True
+    )))
+
+    result = await db.execute(
+        select(model.name).where(
+            model.normalized_name.op("%")(normalized_name),
+            model.normalized_name != normalized_name,
+            *(filters or [])
+        ).order_by(
+            func.similarity(model.normalized_name, normalized_name).desc(), model.name
+        ).limit(settings.REQUEST_SIMILAR_LIMIT)
+    )
+    return list(result.scalars())
+
+
+async def get_movie_by_normalized_name_db(db: AsyncSession, name: str):
+    """
+    Return already added movie with the same normalized name, i.e. "Matrix, The" for
+    "The Matrix", Served by the normalized name index
+
+    :param db: DB Session object
+    :param name: Requested movie name
+    """
+
+    result = await db.execute(
+        select(Movie).where(Movie.normalized_name == get_normalized_name(name)).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def get_similar_movie_names_db(db: AsyncSession, name: str) -> list[str]:
+    """
+    Return names of the added movies similar to the requested one, To suggest them
+
+    :param db: DB Session object
+    :param name: Requested movie name
+    """
+
+    return await get_similar_names_db(db, Movie, name)
+
+
+async def get_similar_request_names_db(db: AsyncSession, name: str) -> list[str]:
+    """
+    Return names of the open requests similar to the requested movie, To suggest them
+
+    :param db: DB Session object
+    :param name: Requested movie name
+    """
+
+    return await get_similar_names_db(
+        db, models.Request, name, filters=[models.Request.status == models.Request.OPEN]
+    )
+
+
+async def get_open_request_by_normalized_name_db(db: AsyncSession, name: str):
+    """
+    Return open request with the same normalized name, Along with its owner.
+    Served by the normalized name index.
+
+    :param db: DB Session object
+    :param name: Requested movie name
+    """
+
+    result = await db.execute(
+        select(models.Request).options(joinedload(models.Request.user)).where(
+            models.Request.normalized_name == get_normalized_name(name),
+            models.Request.status == models.Request.OPEN
+        ).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def vote_request_db(db: AsyncSession, request_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    """
+    Add vote of a user to a request, Counter is incremented in the same transaction
+    only when the vote is new, So concurrent votes can't drift the counter
+
+    :param db: DB Session object
+    :param request_id: Request UUID
+    :param user_id: User UUID
+    :return: True if the vote was added, False if the user had already voted
+    """
+
+    result = await db.execute(insert(models.RequestVote).values(
+        id=uuid.uuid4(),
+        created_at=datetime.utcnow(),
+        request_id=request_id,
+        user_id=user_id
+    ).on_conflict_do_nothing(constraint="unique_request_vote").returning(models.RequestVote.id))
+
+    is_added = result.first() is not None
+
+    if is_added:
+        await db.execute(update(models.Request.__table__).where(
+            models.Request.id == request_id
+        ).values(votes_count=models.Request.votes_count + 1))
+
+    await db.commit()
+
+    return is_added
+
+
+async def unvote_request_db(db: AsyncSession, request_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    """
+    Remove vote of a user from a request, Counter is decremented in the same transaction
+
+    :param db: DB Session object
+    :param request_id: Request UUID
+    :param user_id: User UUID
+    :return: True if the vote was removed, False if the user had not voted
+    """
+
+    result = await db.execute(delete(models.RequestVote).where(
+        models.RequestVote.request_id == request_id,
+        models.RequestVote.user_id == user_id
+    ).returning(models.RequestVote.id))
+
+    is_removed = result.first() is not None
+
+    if is_removed:
+        await db.execute(update(models.Request.__table__).where(
+            models.Request.id == request_id
+        ).values(votes_count=models.Request.votes_count - 1))
 
+    await db.commit()
 
-def get_movie_by_name_db(db: Session, name: str):
+    return is_removed
+
+
+async def close_requests_db(db: AsyncSession, movie_ids: list[uuid.UUID]) -> None:
     """
-    Get boolean depicting a movie object exists or not, This will ensure no request
-    gets created for those movies which are already added
+    Close open requests whose normalized name matches the given added movies,
+    Caller is responsible for committing along with the movies
 
     :param db: DB Session object
-    :param name: movie name
+    :param movie_ids: List of added movie UUIDs
     """
 
-    return db.query(Movie).filter_by(name=name).first()
+    requests = models.Request.__table__
+
+    await db.execute(update(requests).where(
+        requests.c.status == models.Request.OPEN,
+        requests.c.normalized_name == Movie.normalized_name,
+        Movie.id.in_(movie_ids)
+    ).values(
+        status=models.Request.CLOSED,
+        closed_at=datetime.utcnow(),
+        movie_id=Movie.id
+    ))
 
 
-def get_request_list_db(db: Session, search: str, limit: int, offset: int):
+async def get_request_list_db(
+    db: AsyncSession,
+    search: str,
+    limit: int,
+    offset: int,
+    cursor: str = None
+):
     """
     Get request list from DB
 
@@ -78,14 +261,45 @@ def get_request_list_db(db: Session, search: str, limit: int, offset: int):
     :param search: search based on movie name
     :param limit: Limit the resulting rows
     :param offset: Offset for the rows
+    :param cursor: Cursor of the page to fetch
+    :return: Tuple of list of request objects and next page cursor
     """
 
-    return db.query(models.Request).filter(
-        models.Request.name.like(f"%{search}%")
-    ).limit(limit).offset(offset).all()
+    query = select(models.Request).where(models.Request.name.like(f"%{search}%"))
+    order_by = [models.Request.created_at, models.Request.id]
 
+    return await get_page(db, query, order_by, limit, offset, cursor)
 
-def get_requests_by_user_db(db: Session, user_id: uuid.UUID, limit: int, offset: int):
+
+async def get_most_wanted_requests_db(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    cursor: str = None
+):
+    """
+    Get open requests, Most voted first
+
+    :param db: DB Session object
+    :param limit: Limit the resulting rows
+    :param offset: Offset for the rows
+    :param cursor: Cursor of the page to fetch
+    :return: Tuple of list of request objects and next page cursor
+    """
+
+    query = select(models.Request).where(models.Request.status == models.Request.OPEN)
+    order_by = [models.Request.votes_count, models.Request.id]
+
+    return await get_page(db, query, order_by, limit, offset, cursor)
+
+
+async def get_requests_by_user_db(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    offset: int,
+    cursor: str = None
+):
     """
     Get requests raised by given user
 
@@ -93,6 +307,11 @@ def get_requests_by_user_db(db: Session, user_id: uuid.UUID, limit: int, offset:
     :param user_id: User UUID
     :param limit: Limit the resulting rows
     :param offset: Offset for the rows
+    :param cursor: Cursor of the page to fetch
+    :return: Tuple of list of request objects and next page cursor
     """
 
-    return db.query(models.Request).filter_by(user_id=user_id).limit(limit).offset(offset).all()
+    query = select(models.Request).filter_by(user_id=user_id)
+    order_by = [models.Request.created_at, models.Request.id]
+
+    return await get_page(db, query, order_by, limit, offset, cursor)
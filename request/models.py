@@ -6,6 +6,7 @@ import sqlalchemy as sa
 from sqlalchemy.orm import relationship
 
 from database import Base
+from movies.models import get_trigram_index
 
 
 class Request(Base):
@@ -14,6 +15,10 @@ class Request(Base):
     So that other users can view the request and add the wanted movie
     """
 
+    # Request status
+    OPEN = "open"
+    CLOSED = "closed"
+
     id = sa.Column(sa.UUID, primary_key=True, index=True)
     created_at = sa.Column(sa.DateTime)
     modified_at = sa.Column(sa.DateTime)
@@ -24,12 +29,48 @@ class Request(Base):
 
     # Movie name
     name = sa.Column(sa.String, unique=True, index=True)
+    # Kept in sync with name on write, For duplicate detection and similar names
+    normalized_name = sa.Column(sa.String, nullable=True)
+
+    # Number of votes, Maintained along with the request votes in the same transaction
+    votes_count = sa.Column(sa.Integer, default=0, server_default="0", nullable=False)
+
+    # Request is closed once the movie is added
+    status = sa.Column(sa.String, default=OPEN, server_default=OPEN, nullable=False)
+    closed_at = sa.Column(sa.DateTime, nullable=True)
+    movie_id = sa.Column(sa.UUID, sa.ForeignKey("movies.id", ondelete="SET NULL"), nullable=True)
 
     __tablename__ = "requests"
 
     __table_args__ = (
         sa.UniqueConstraint("name", name="unique_movie_request_name"),
+        # Keyset pagination indexes
+        sa.Index("request_created_at_id_idx", "created_at", "id"),
+        sa.Index("request_user_created_at_id_idx", "user_id", "created_at", "id"),
+        # Exact duplicate and similar name lookup indexes
+        sa.Index("request_normalized_name_idx", "normalized_name"),
+        get_trigram_index("request_normalized_name_trgm_idx", "normalized_name"),
+        # Most wanted requests index
+        sa.Index("request_status_votes_count_id_idx", "status", "votes_count", "id"),
     )
 
     def __str__(self):
         return self.name
+
+
+class RequestVote(Base):
+    """
+    Request vote model, A user can vote for a request only once
+    """
+
+    id = sa.Column(sa.UUID, primary_key=True)
+    created_at = sa.Column(sa.DateTime)
+
+    request_id = sa.Column(sa.UUID, sa.ForeignKey("requests.id", ondelete="CASCADE"))
+    user_id = sa.Column(sa.UUID, sa.ForeignKey("users.id", ondelete="CASCADE"), index=True)
+
+    __tablename__ = "request_votes"
+
+    __table_args__ = (
+        sa.UniqueConstraint("request_id", "user_id", name="unique_request_vote"),
+    )
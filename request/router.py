@@ -5,41 +5,47 @@ Contain movie request related API routes and handlers
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import exc
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import strings
 from auth.models import User
 from auth.schemas import UserPublic
 from request import schemas, crud
-from base.dependencies import get_current_user, get_db
+from base.dependencies import get_current_user, get_db, get_read_db
+from base.routing import ModelRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=ModelRoute)
 
 
 @router.post(
     path="/request/",
-    response_model=schemas.RequestDataResponse,
+    response_model=schemas.RequestAddResponse,
     status_code=status.HTTP_201_CREATED
 )
 async def add_movie_request(
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
-    request_data: schemas.RequestData
+    db: Annotated[AsyncSession, Depends(get_db)],
+    request_data: schemas.RequestData,
+    response: Response
 ):
     """
-    API for adding movie request
+    API for adding movie request, Duplicates (i.e. "Matrix, The" for "The Matrix") of an
+    added movie are rejected, While those of an open request are merged into it as a vote.
+    Names of the similar movies and open requests are returned with a new request, So the
+    client can point the user to them.
 
     :param: user: Current user object
     :param db: DB session object
     :param request: Request model schema instance
+    :param response: Response object, Status is 200 when merged into an existing request
     :return: Instance of request response schema 
     """
 
     try:
-        db_movie = crud.get_movie_by_name_db(db, request_data.name)
+        db_movie = await crud.get_movie_by_normalized_name_db(db, request_data.name)
 
         if db_movie:
             raise HTTPException(
@@ -47,20 +53,42 @@ async def add_movie_request(
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        db_request = crud.add_request_db(db, request_data, user.id)
+        db_request = await crud.get_open_request_by_normalized_name_db(db, request_data.name)
+        similar = {}
+
+        if db_request:
+            # Asking for an already requested movie counts as a vote for it
+            if await crud.vote_request_db(db, db_request.id, user.id):
+                db_request.votes_count += 1
+
+            response.status_code = status.HTTP_200_OK
+            message = strings.REQUEST_ALREADY_EXISTS
+            owner = db_request.user
+        else:
+            similar = {
+                "similar_movies": await crud.get_similar_movie_names_db(db, request_data.name),
+                "similar_requests": await crud.get_similar_request_names_db(
+                    db, request_data.name
+                ),
+            }
+            db_request = await crud.add_request_db(db, request_data, user.id)
+            message = strings.REQUEST_ADD_SUCCESS
+            owner = user
 
         request = schemas.RequestUser(
             id=db_request.id,
             name=db_request.name,
             created_at=db_request.created_at,
+            votes_count=db_request.votes_count,
+            status=db_request.status,
             user=UserPublic(
-                id=user.id,
-                first_name=user.first_name,
-                last_name=user.last_name
+                id=owner.id,
+                first_name=owner.first_name,
+                last_name=owner.last_name
             )
         )
 
-        return schemas.RequestDataResponse(message=strings.REQUEST_ADD_SUCCESS, data=request)
+        return schemas.RequestAddResponse(message=message, data=request, **similar)
 
     except exc.SQLAlchemyError as e:
         # Sent error response if any SQL exception caught
@@ -70,6 +98,41 @@ async def add_movie_request(
         ) from e
 
 
+@router.get(
+    path="/request/most-wanted/",
+    response_model=schemas.RequestListResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_most_wanted_request_list(
+    _: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: int,
+    offset: int = 0,
+    cursor: str = None
+):
+    """
+    API for getting open requests, Most voted first
+
+    :param db: DB session object
+    :param limit: query param
+    :param offset: query param
+    :param cursor: Next page cursor returned by the previous page
+    :return: Instance of request list response schema
+    """
+
+    db_requests, next_cursor = await crud.get_most_wanted_requests_db(db, limit, offset, cursor)
+
+    requests = [schemas.RequestList(
+        id=db_request.id,
+        created_at=db_request.created_at,
+        name=db_request.name,
+        votes_count=db_request.votes_count,
+        status=db_request.status
+    ) for db_request in db_requests]
+
+    return schemas.RequestListResponse(results=requests, next_cursor=next_cursor)
+
+
 @router.get(
     path="/request/{request_id}/",
     response_model=schemas.RequestDataResponse,
@@ -77,7 +140,7 @@ async def add_movie_request(
 )
 async def get_request_detail(
     _: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_db)],
     request_id: uuid.UUID
 ):
     """
@@ -88,11 +151,13 @@ async def get_request_detail(
     :return: Instance of request response schema 
     """
 
-    db_request = crud.get_request_detail_db(db, request_id)
+    db_request = await crud.get_request_detail_db(db, request_id)
     request = schemas.RequestUser(
         id=db_request.id,
         name=db_request.name,
         created_at=db_request.created_at,
+        votes_count=db_request.votes_count,
+        status=db_request.status,
         user=UserPublic(
             id=db_request.user.id,
             first_name=db_request.user.first_name,
@@ -110,7 +175,7 @@ async def get_request_detail(
 )
 async def delete_request(
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_db)],
     request_id: uuid.UUID
 ):
     """
@@ -122,7 +187,7 @@ async def delete_request(
     """
 
     try:
-        db_request = crud.get_request_detail_db(db, request_id)
+        db_request = await crud.get_request_detail_db(db, request_id)
 
         if db_request.user_id != user.id:
             raise HTTPException(
@@ -130,7 +195,7 @@ async def delete_request(
                 status_code=status.HTTP_403_FORBIDDEN
             )
 
-        crud.delete_request_db(db, request_id)
+        await crud.delete_request_db(db, request_id)
         return schemas.MessageResponse(message=strings.REQUEST_DELETE_SUCCESS)
 
     except exc.SQLAlchemyError as e:
@@ -141,6 +206,98 @@ async def delete_request(
         ) from e
 
 
+@router.post(
+    path="/request/{request_id}/vote/",
+    response_model=schemas.RequestVoteResponse,
+    status_code=status.HTTP_200_OK
+)
+async def vote_request(
+    user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    request_id: uuid.UUID
+):
+    """
+    API for voting a request, Voting again is a no-op
+
+    :param user: Current user object
+    :param db: DB session object
+    :param request_id: Request UUID
+    :return: Instance of request vote response schema
+    """
+
+    try:
+        db_request = await crud.get_request_detail_db(db, request_id)
+
+        if not db_request:
+            raise HTTPException(
+                detail=strings.REQUEST_NOT_FOUND,
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        if db_request.status != db_request.CLOSED:
+            is_added = await crud.vote_request_db(db, request_id, user.id)
+
+            return schemas.RequestVoteResponse(
+                message=strings.REQUEST_VOTE_SUCCESS,
+                votes_count=db_request.votes_count + int(is_added)
+            )
+
+        raise HTTPException(
+            detail=strings.REQUEST_CLOSED_ERROR,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    except exc.SQLAlchemyError as e:
+        # Sent error response if any SQL exception caught
+        raise HTTPException(
+            detail=strings.REQUEST_VOTE_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from e
+
+
+@router.delete(
+    path="/request/{request_id}/vote/",
+    response_model=schemas.RequestVoteResponse,
+    status_code=status.HTTP_200_OK
+)
+async def unvote_request(
+    user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    request_id: uuid.UUID
+):
+    """
+    API for removing vote of a request
+
+    :param user: Current user object
+    :param db: DB session object
+    :param request_id: Request UUID
+    :return: Instance of request vote response schema
+    """
+
+    try:
+        db_request = await crud.get_request_detail_db(db, request_id)
+
+        if not db_request:
+            raise HTTPException(
+                detail=strings.REQUEST_NOT_FOUND,
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        is_removed = await crud.unvote_request_db(db, request_id, user.id)
+
+        return schemas.RequestVoteResponse(
+            message=strings.REQUEST_UNVOTE_SUCCESS,
+            votes_count=db_request.votes_count - int(is_removed)
+        )
+
+    except exc.SQLAlchemyError as e:
+        # Sent error response if any SQL exception caught
+        raise HTTPException(
+            detail=strings.REQUEST_VOTE_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from e
+
+
 @router.get(
     path="/request/",
     response_model=schemas.RequestListResponse,
@@ -148,10 +305,11 @@ async def delete_request(
 )
 async def get_request_list(
     _: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     limit: int,
-    offset: int,
-    search: str = ""
+    offset: int = 0,
+    search: str = "",
+    cursor: str = None
 ):
     """
     API for getting list of requests
@@ -160,18 +318,21 @@ async def get_request_list(
     :param limit: query param
     :param offset: query param
     :param search: Search parameter
+    :param cursor: Next page cursor returned by the previous page
     :return: Instance of request list response schema
     """
 
-    db_requests = crud.get_request_list_db(db, search, limit, offset)
+    db_requests, next_cursor = await crud.get_request_list_db(db, search, limit, offset, cursor)
 
     requests = [schemas.RequestList(
         id=db_request.id,
         created_at=db_request.created_at,
-        name=db_request.name
+        name=db_request.name,
+        votes_count=db_request.votes_count,
+        status=db_request.status
     ) for db_request in db_requests]
 
-    return schemas.RequestListResponse(results=requests)
+    return schemas.RequestListResponse(results=requests, next_cursor=next_cursor)
 
 
 @router.get(
@@ -181,9 +342,10 @@ async def get_request_list(
 )
 async def get_user_request_list(
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_db)],
     limit: int,
-    offset: int
+    offset: int = 0,
+    cursor: str = None
 ):
     """
     API for getting list of requests created/raised by current user
@@ -192,15 +354,19 @@ async def get_user_request_list(
     :param db: DB session object
     :param limit: query param
     :param offset: query param
+    :param cursor: Next page cursor returned by the previous page
     :return: Instance of request list response schema
     """
 
-    db_requests = crud.get_requests_by_user_db(db, user.id, limit, offset)
+    db_requests, next_cursor = await crud.get_requests_by_user_db(
+        db, user.id, limit, offset, cursor)
 
     requests = [schemas.RequestList(
         id=db_request.id,
         created_at=db_request.created_at,
-        name=db_request.name
+        name=db_request.name,
+        votes_count=db_request.votes_count,
+        status=db_request.status
     ) for db_request in db_requests]
 
-    return schemas.RequestListResponse(results=requests)
+    return schemas.RequestListResponse(results=requests, next_cursor=next_cursor)
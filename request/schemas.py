@@ -42,6 +42,8 @@ class RequestUser(BaseModel):
     id: UUID4
     name: str
     created_at: datetime
+    votes_count: int
+    status: str
     user: UserPublic
 
 
@@ -62,6 +64,15 @@ class RequestDataResponse(BaseModel):
     data: RequestUser
 
 
+class RequestAddResponse(RequestDataResponse):
+    """
+    Add request response schema, With names of the similar movies and open requests
+    """
+
+    similar_movies: list[str] = []
+    similar_requests: list[str] = []
+
+
 class RequestList(BaseModel):
     """
     Request list schema
@@ -70,6 +81,8 @@ class RequestList(BaseModel):
     id: UUID4
     name: str
     created_at: datetime
+    votes_count: int
+    status: str
 
 
 class RequestListResponse(BaseModel):
@@ -78,3 +91,13 @@ class RequestListResponse(BaseModel):
     """
 
     results: list[RequestList]
+    next_cursor: str | None = None
+
+
+class RequestVoteResponse(BaseModel):
+    """
+    Request vote response schema
+    """
+
+    message: str
+    votes_count: int
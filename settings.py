@@ -20,18 +20,101 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 
+# Optional read replica for public reads, Served by the primary when it is not configured.
+# Reads fall back to the primary while the replica lags more than the max lag.
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+DB_REPLICA_PORT = os.getenv("DB_REPLICA_PORT", DB_PORT)
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "1"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+# Reads of a client stay on the primary for these many seconds after its last write
+DB_PRIMARY_STICKY_SECONDS = int(os.getenv("DB_PRIMARY_STICKY_SECONDS", "5"))
+
+# Connection pool config, Per gunicorn worker
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Statement timeout in milliseconds, 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# Disable server side prepared statements and set the startup parameters on every transaction,
+# When connecting through PgBouncer
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
 SECRET_KEY = os.getenv("SECRET_KEY")
 ACCESS_TOKEN_EXP_MINUTES = os.getenv("ACCESS_TOKEN_EXP_MINUTES")
 REFRESH_TOKEN_EXP_MINUTES = os.getenv("REFRESH_TOKEN_EXP_MINUTES")
 
 RESET_PASSWORD_EXP_MINUTES = os.getenv("RESET_PASSWORD_EXP_MINUTES")
 
+# Bayesian average rating prior, Movies are assumed to have these many ratings of the mean value
+RATING_PRIOR_MEAN = float(os.getenv("RATING_PRIOR_MEAN", "6.0"))
+RATING_PRIOR_WEIGHT = int(os.getenv("RATING_PRIOR_WEIGHT", "10"))
+
+# Trigram similarity (0 to 1) above which movie names are similar, And the number of
+# similar movies and requests suggested with a new movie request
+REQUEST_SIMILARITY_THRESHOLD = float(os.getenv("REQUEST_SIMILARITY_THRESHOLD", "0.6"))
+REQUEST_SIMILAR_LIMIT = int(os.getenv("REQUEST_SIMILAR_LIMIT", "5"))
+
+# Number of movies written per insert while bulk importing, And row errors returned by it
+MOVIE_IMPORT_BATCH_SIZE = int(os.getenv("MOVIE_IMPORT_BATCH_SIZE", "1000"))
+MOVIE_IMPORT_MAX_ERRORS = int(os.getenv("MOVIE_IMPORT_MAX_ERRORS", "100"))
+
+# Maximum number of movies fetched by a single batch detail request
+MOVIE_BATCH_MAX_IDS = int(os.getenv("MOVIE_BATCH_MAX_IDS", "500"))
+
+# Number of rows fetched per round trip while exporting
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Movie name autocomplete config, The in-memory index is reloaded periodically
+# to pick up movies written by the other workers (0 disables the reload)
+SUGGEST_INDEX_ENABLED = os.getenv("SUGGEST_INDEX_ENABLED", "true").lower() == "true"
+SUGGEST_INDEX_REFRESH_SECONDS = int(os.getenv("SUGGEST_INDEX_REFRESH_SECONDS", "300"))
+SUGGEST_MAX_LIMIT = int(os.getenv("SUGGEST_MAX_LIMIT", "20"))
+
+# Authenticated user cache config, With the memory response cache backend a changed or deleted
+# user is seen by the other workers only once its cached copy expires
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "10"))
+
+# Public response cache config, Backend is either memory or redis
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Record per route latency and DB usage of every request, Exposed on /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Opt-in log of statements slower than the threshold, Optionally along with their plan
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() == "true"
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUP_COUNT = int(os.getenv("SLOW_QUERY_LOG_BACKUP_COUNT", "5"))
+
+# Password hashing worker pool config
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
 FROM_EMAIL = os.getenv("FROM_EMAIL")
 SMTP_SERVER = os.getenv("SMTP_SERVER")
 SMTP_PORT = os.getenv("SMTP_PORT")
 SMTP_USERNAME = os.getenv("SMTP_USERNAME")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 DEFAULT_RECIPIENT_EMAIL = os.getenv("DEFAULT_RECIPIENT_EMAIL")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+SMTP_TIMEOUT_SECONDS = int(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+
+# Background email sender config
+EMAIL_SENDER_POOL_SIZE = int(os.getenv("EMAIL_SENDER_POOL_SIZE", "2"))
+EMAIL_SENDER_BATCH_SIZE = int(os.getenv("EMAIL_SENDER_BATCH_SIZE", "50"))
+EMAIL_SENDER_POLL_SECONDS = int(os.getenv("EMAIL_SENDER_POLL_SECONDS", "5"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_SENDER_MAX_BACKOFF_SECONDS = int(os.getenv("EMAIL_SENDER_MAX_BACKOFF_SECONDS", "300"))
 
 # Template config
 TEMPLATES_PATH = BASE_DIR / "templates"
@@ -38,6 +38,8 @@ PASSWORD_NOT_MATCH = "New password and confirm password does not match"
 MOVIE_ADDED_SUCCESSFULLY = "Movie details added successfully!"
 MOVIE_DETAIL_ERROR = "Error while fetching movie details"
 INVALID_YEAR_ERROR = "Invalid year value"
+MOVIE_BATCH_IDS_ERROR = "Pass between 1 and {} valid movie IDs"
+INVALID_FIELDS_ERROR = "Invalid fields, Choose from: {}"
 MOVIE_UPDATE_ERROR = "Error while updating movie details, Please check the request data"
 PERMISSION_ERROR = "You cannot perform this action."
 MOVIE_UPDATE_SUCCESS = "Movie details updated successfully!"
@@ -50,5 +52,21 @@ MOVIE_CREATE_ERROR = "Error while adding the movie details"
 REQUEST_ADD_ERROR = "Error while adding your movie request, Please try again later."
 REQUEST_ADD_SUCCESS = "Movie request added successfully!"
 REQUEST_MOVIE_ALREADY_EXISTS = "Requested movie already exists"
+REQUEST_ALREADY_EXISTS = "Movie is already requested, Your vote is added to the request"
+REQUEST_NOT_FOUND = "Request does not exists"
+REQUEST_CLOSED_ERROR = "Requested movie is already added"
+REQUEST_VOTE_SUCCESS = "Voted successfully!"
+REQUEST_UNVOTE_SUCCESS = "Vote removed successfully!"
+REQUEST_VOTE_ERROR = "Error while voting the request, Please try again later."
 REQUEST_DELETE_ERROR = "Error while deleting request detail"
 REQUEST_DELETE_SUCCESS = "Request deleted successfullt!"
+INVALID_CURSOR = "Invalid or expired page cursor"
+SERVER_BUSY = "Server is busy, Please try again later."
+MOVIE_IMPORT_SUCCESS = "Movies imported successfully!"
+MOVIE_IMPORT_ERROR = "Error while importing the movies"
+IMPORT_INVALID_ROW = "Row should be a JSON object"
+IMPORT_ENCODING_ERROR = "Row is not valid UTF-8"
+IMPORT_HEADER_ERROR = "CSV header is not valid UTF-8"
+IMPORT_DUPLICATE_MOVIE = "Movie with this name already exists"
+IMPORT_FORMAT_ERROR = "Unsupported import format, Use ndjson or csv"
+EXPORT_FORMAT_ERROR = "Unsupported export format, Use ndjson or csv"
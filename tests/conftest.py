@@ -0,0 +1,25 @@
+"""
+Shared test setup, Lets the app modules be imported without a `.env` file.
+
+Values of `.env` and of the environment win over these defaults, So the DB backed tests
+run against the configured DB.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+for name, value in {
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "yify",
+    "SECRET_KEY": "test-secret-key",
+    "ACCESS_TOKEN_EXP_MINUTES": "30",
+    "REFRESH_TOKEN_EXP_MINUTES": "60",
+    "RESET_PASSWORD_EXP_MINUTES": "30",
+}.items():
+    os.environ.setdefault(name, value)
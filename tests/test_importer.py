@@ -0,0 +1,170 @@
+"""
+Tests of the bulk movie import parsing and validation, Without a DB
+"""
+
+import asyncio
+import json
+
+import pytest
+from pydantic import ValidationError
+
+import strings
+from movies import crud, importer
+
+
+async def _iter(items):
+    for item in items:
+        yield item
+
+
+def _collect(iterator) -> list:
+    async def collect():
+        return [item async for item in iterator]
+
+    return asyncio.run(collect())
+
+
+def _import(monkeypatch, lines: list[bytes], file_format: str, existing=(), **kwargs):
+    """
+    Run the import with the DB insert replaced, Names in `existing` are treated as duplicates
+    """
+
+    async def bulk_add_movies_db(db, movies, added_by_id):
+        return {movie.name for movie in movies if movie.name not in existing}
+
+    monkeypatch.setattr(crud, "bulk_add_movies_db", bulk_add_movies_db)
+    return asyncio.run(importer.import_movies(None, _iter(lines), file_format, None, **kwargs))
+
+
+def test_iter_lines_splits_chunks():
+    """
+    Lines split across chunks are joined, And CRLF line endings are stripped
+    """
+
+    chunks = [b'{"name": "A"}\r\n{"na', b'me": "B"}\n', b'{"name": "C"}']
+
+    assert _collect(importer.iter_lines(_iter(chunks))) == [
+        b'{"name": "A"}', b'{"name": "B"}', b'{"name": "C"}'
+    ]
+
+
+def test_iter_records_joins_quoted_line_breaks():
+    """
+    CSV record with a line break within a quoted field is a single record
+    """
+
+    lines = [b"name,year,description", b'Heat,1995,"Two lines', b'of ""plot"""', b"", b"Up,2009,"]
+
+    assert _collect(importer.iter_records(_iter(lines), importer.CSV)) == [
+        (1, "name,year,description"),
+        (2, 'Heat,1995,"Two lines\nof ""plot"""'),
+        (5, "Up,2009,"),
+    ]
+
+
+def test_iter_records_reports_bad_utf8_per_row():
+    """
+    Line which is not valid UTF-8 fails on its own, The next lines are still read
+    """
+
+    lines = [b'{"name": "A"}', b'{"name": "\xff"}', b'{"name": "C"}']
+
+    assert _collect(importer.iter_records(_iter(lines), importer.NDJSON)) == [
+        (1, '{"name": "A"}'), (2, None), (3, '{"name": "C"}')
+    ]
+
+
+def test_parse_csv_row():
+    """
+    CSV values are keyed by the header, And the extra column is parsed as JSON
+    """
+
+    header = ["name", "year", "extra"]
+    record = 'Heat,1995,"{""genre"": ""crime""}"'
+
+    assert importer.parse_row(record, importer.CSV, header) == {
+        "name": "Heat", "year": "1995", "extra": {"genre": "crime"}
+    }
+
+
+def test_parse_ndjson_row_must_be_object():
+    """
+    NDJSON row which is not a JSON object is rejected
+    """
+
+    with pytest.raises(ValueError, match=strings.IMPORT_INVALID_ROW):
+        importer.parse_row("[1, 2]", importer.NDJSON, None)
+
+
+def test_validate_row():
+    """
+    Valid row is converted to an add movie request
+    """
+
+    movie = importer.validate_row({"name": "Heat", "year": "1995", "extra": {}})
+
+    assert (movie.name, movie.year) == ("Heat", 1995)
+
+
+def test_validate_row_year():
+    """
+    Year has to have four digits, Like in the add movie API
+    """
+
+    with pytest.raises(ValueError, match=strings.INVALID_YEAR_ERROR):
+        importer.validate_row({"name": "Heat", "year": 95, "extra": {}})
+
+
+@pytest.mark.parametrize("data", [
+    {"name": "Heat", "year": "soon", "extra": {}},
+    {"year": 1995, "extra": {}},
+])
+def test_validate_invalid_row(data):
+    """
+    Rows are validated with the add movie request schema
+    """
+
+    with pytest.raises(ValidationError):
+        importer.validate_row(data)
+
+
+def test_import_counts_failed_and_duplicate_rows(monkeypatch):
+    """
+    Invalid and duplicate rows are reported with their line numbers, The rest are inserted
+    """
+
+    lines = [
+        json.dumps({"name": "Heat", "year": 1995, "extra": {}}).encode(),
+        b"not json",
+        json.dumps({"name": "Up", "year": 2009, "extra": {}}).encode(),
+        json.dumps({"name": "Heat", "year": 1995, "extra": {}}).encode(),
+    ]
+
+    result = _import(monkeypatch, lines, importer.NDJSON, existing={"Up"})
+
+    assert (result.inserted, result.duplicates, result.failed) == (1, 2, 1)
+    assert sorted(error.line for error in result.errors) == [2, 3, 4]
+    assert result.errors_omitted == 0
+
+
+def test_import_caps_errors(monkeypatch):
+    """
+    Errors beyond the limit are only counted
+    """
+
+    lines = [b"name,year,extra"] + [f"Movie {index},bad,".encode() for index in range(10)]
+
+    result = _import(monkeypatch, lines, importer.CSV, max_errors=3)
+
+    assert result.failed == 10
+    assert [error.line for error in result.errors] == [2, 3, 4]
+    assert result.errors_omitted == 7
+
+
+def test_import_rejects_bad_csv_header(monkeypatch):
+    """
+    CSV whose header is not valid UTF-8 can not be imported at all
+    """
+
+    with pytest.raises(ValueError, match=strings.IMPORT_HEADER_ERROR):
+        _import(monkeypatch, [b"\xffname,year", b"Heat,1995"], importer.CSV)
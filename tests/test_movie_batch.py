@@ -0,0 +1,72 @@
+"""
+Tests of the movie batch routes, Against the configured DB through the API.
+Skipped when the DB is not reachable.
+"""
+
+import uuid
+
+from tests.utils import add_movies, get_client, run_with_db
+
+
+async def _get_batch(ids: str, as_post: bool = False) -> tuple[list, int, dict]:
+    """
+    Add two movies and fetch them with the given IDs, `{0}` and `{1}` are replaced by their IDs
+
+    :return: IDs of the added movies, Status code and body of the batch response
+    """
+
+    async with get_client() as (client, headers), add_movies(client, headers, 2) as movie_ids:
+        ids = ids.format(*movie_ids)
+
+        if as_post:
+            response = await client.post("/v1/movie/batch/", json={"ids": ids.split(",")})
+        else:
+            response = await client.get("/v1/movie/batch/", params={"ids": ids})
+
+        return movie_ids, response.status_code, response.json()
+
+
+def test_batch_ids_with_spaces_and_duplicates():
+    """
+    IDs around spaces and empty pieces are accepted, Duplicates are returned once in order
+    """
+
+    movie_ids, status_code, body = run_with_db(lambda: _get_batch(" {1}, {0} ,,{1}, "))
+
+    assert status_code == 200
+    assert [movie["id"] for movie in body["results"]] == [movie_ids[1], movie_ids[0]]
+    assert not body["missing"]
+
+
+def test_batch_missing_ids():
+    """
+    Unknown IDs are listed as missing
+    """
+
+    missing_id = str(uuid.uuid4())
+    movie_ids, status_code, body = run_with_db(lambda: _get_batch(f"{{0}},{missing_id}"))
+
+    assert status_code == 200
+    assert [movie["id"] for movie in body["results"]] == [movie_ids[0]]
+    assert body["missing"] == [missing_id]
+
+
+def test_batch_invalid_id():
+    """
+    Piece which is not a UUID is rejected with 400
+    """
+
+    _, status_code, _ = run_with_db(lambda: _get_batch("{0},not-a-uuid"))
+
+    assert status_code == 400
+
+
+def test_post_batch_duplicates():
+    """
+    Duplicate IDs of the POST variant are returned once as well
+    """
+
+    movie_ids, status_code, body = run_with_db(lambda: _get_batch("{0},{1},{0}", as_post=True))
+
+    assert status_code == 200
+    assert [movie["id"] for movie in body["results"]] == [movie_ids[0], movie_ids[1]]
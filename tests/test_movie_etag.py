@@ -0,0 +1,38 @@
+"""
+Tests of the conditional GET of the movie detail, Against the configured DB through the API.
+Skipped when the DB is not reachable.
+"""
+
+from tests.utils import add_movies, get_client, run_with_db
+
+
+async def _check_etag_after_update() -> tuple[str, str, int, int]:
+    """
+    Add a movie, Update it and fetch it again with the ETag of before the update
+
+    :return: ETags before and after the update, And status codes of the conditional
+        GET before and after the update
+    """
+
+    async with get_client() as (client, headers), add_movies(client, headers, 1) as movie_ids:
+        path = f"/v1/movie/{movie_ids[0]}/"
+        old_etag = (await client.get(path)).headers["ETag"]
+        unchanged = await client.get(path, headers={"If-None-Match": old_etag})
+
+        response = await client.patch(path, headers=headers, json={"description": "Updated"})
+        assert response.status_code == 200
+
+        changed = await client.get(path, headers={"If-None-Match": old_etag})
+        return old_etag, changed.headers["ETag"], unchanged.status_code, changed.status_code
+
+
+def test_movie_etag_changes_on_update():
+    """
+    Conditional GET returns the updated movie, Instead of 304 with the stale ETag
+    """
+
+    old_etag, new_etag, unchanged_status, changed_status = run_with_db(_check_etag_after_update)
+
+    assert unchanged_status == 304
+    assert changed_status == 200
+    assert new_etag != old_etag
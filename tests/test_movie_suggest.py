@@ -0,0 +1,98 @@
+"""
+Tests of the in-memory movie name index used for autocomplete
+"""
+
+import asyncio
+
+from movies.suggest import MovieNameIndex
+
+
+def _get_index(names: list[str]) -> MovieNameIndex:
+    index = MovieNameIndex()
+    index.build(names)
+    return index
+
+
+def test_search_is_case_insensitive():
+    """
+    Names are matched by a case-insensitive prefix, In alphabetical order
+    """
+
+    index = _get_index(["The Matrix", "the mummy", "Toy Story", "THE THING", "Heat"])
+
+    assert index.search("THE M", 10) == ["The Matrix", "the mummy"]
+    assert index.search("the", 10) == ["The Matrix", "the mummy", "THE THING"]
+
+
+def test_search_limit_and_no_match():
+    """
+    At most `limit` names are returned, And none when nothing starts with the prefix
+    """
+
+    index = _get_index([f"Movie {number}" for number in range(10)])
+
+    assert index.search("movie", 3) == ["Movie 0", "Movie 1", "Movie 2"]
+    assert not index.search("zzz", 3)
+    assert not index.search("movie", 0)
+
+
+def test_add_keeps_order_without_duplicates():
+    """
+    Added names are found in order, And adding an existing name again is a no-op
+    """
+
+    index = _get_index(["Alien", "Avatar"])
+    index.add("Aliens")
+    index.add("alien")
+    index.add("Aliens")
+
+    assert index.search("ali", 10) == ["Alien", "alien", "Aliens"]
+    assert index.keys == sorted(index.keys)
+
+
+def test_remove():
+    """
+    Only the exact name is removed, Missing names are ignored
+    """
+
+    index = _get_index(["Alien", "alien", "Aliens"])
+    index.remove("alien")
+    index.remove("Predator")
+
+    assert index.search("ali", 10) == ["Alien", "Aliens"]
+
+
+def test_changes_during_load_are_recorded():
+    """
+    Changes made while the index is being reloaded are kept for replaying on the new content
+    """
+
+    index = _get_index(["Alien"])
+    index.pending = []
+    index.add("Heat")
+    index.remove("Alien")
+
+    assert [(change.__name__, name) for change, name in index.pending] == [
+        ("add", "Heat"), ("remove", "Alien")
+    ]
+
+
+def test_load_is_retried_after_errors():
+    """
+    Index keeps retrying to load when the DB is not reachable, Instead of ending its task
+    """
+
+    index = MovieNameIndex()
+    index.RETRY_SECONDS = 0
+    errors = [OSError("Connection refused"), RuntimeError("Unexpected")]
+
+    async def load():
+        if errors:
+            raise errors.pop(0)
+        index.build(["Heat"])
+
+    index.load = load
+    asyncio.run(index._run())  # pylint: disable=protected-access
+
+    assert index.is_loaded
+    assert index.search("he", 10) == ["Heat"]
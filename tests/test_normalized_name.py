@@ -0,0 +1,63 @@
+"""
+Tests of the movie name normalization used for duplicate detection
+"""
+
+import importlib.util
+
+import pytest
+
+import settings
+from movies.models import get_normalized_name
+
+NAMES = [
+    ("The Matrix", "matrix"),
+    ("Matrix, The", "matrix"),
+    ("matrix,the", "matrix"),
+    ("  THE   MATRIX!  ", "matrix"),
+    ("Amélie", "amelie"),
+    ("Léon: The Professional", "leon the professional"),
+    ("A Beautiful Mind", "beautiful mind"),
+    ("An American Tail", "american tail"),
+    ("Spider-Man 2", "spider man 2"),
+    ("Toy Story 3", "toy story 3"),
+    # Article is kept when it is the whole name
+    ("The", "the"),
+    ("Them!", "them"),
+    ("Anastasia", "anastasia"),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("name, normalized_name", NAMES)
+def test_normalized_name(name, normalized_name):
+    """
+    Case, accents, punctuation and a leading or library style trailing article are ignored
+    """
+
+    assert get_normalized_name(name) == normalized_name
+
+
+def test_different_names_stay_different():
+    """
+    Sequels only differing by a number are not normalized to the same name
+    """
+
+    assert get_normalized_name("Toy Story 2") != get_normalized_name("Toy Story 3")
+
+
+def test_migration_normalizer_matches_app():
+    """
+    Frozen copy in the trigram migration backfills the same names as the app writes,
+    So that the exact duplicate lookup finds the backfilled rows
+    """
+
+    path = (
+        settings.BASE_DIR / "migrations" / "versions"
+        / "5cdcd475a4c9_normalized_name_trigram_indexes.py"
+    )
+    spec = importlib.util.spec_from_file_location("normalized_name_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    for name, _ in NAMES:
+        assert migration.get_normalized_name(name) == get_normalized_name(name)
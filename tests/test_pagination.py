@@ -0,0 +1,103 @@
+"""
+Tests of the keyset pagination cursor helpers
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from base.pagination import decode_cursor, encode_cursor
+from movies import models
+from request import models as request_models
+
+ORDER_BY = [models.Rating.created_at, models.Rating.id]
+
+
+def test_cursor_round_trip():
+    """
+    Decoded cursor has the same typed values as the row it was encoded from
+    """
+
+    values = [datetime(2023, 12, 1, 10, 30, 15, 123456), uuid.uuid4()]
+    cursor = encode_cursor(values)
+
+    assert decode_cursor(cursor, ORDER_BY) == values
+
+
+def test_cursor_is_url_safe():
+    """
+    Cursor can be passed as a query param without escaping
+    """
+
+    cursor = encode_cursor([datetime(2023, 12, 1), uuid.UUID(int=2 ** 128 - 1)])
+
+    assert all(char.isalnum() or char in "-_=" for char in cursor)
+
+
+def test_cursor_keeps_untyped_values():
+    """
+    Values of sort keys which are not dates or UUIDs are returned as they were encoded
+    """
+
+    order_by = [models.Movie.ratings_count, models.Movie.id]
+    movie_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor([42, movie_id]), order_by) == [42, movie_id]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor({"created_at": "2023-12-01"}),
+    encode_cursor(["2023-12-01T00:00:00"]),
+    encode_cursor(["2023-12-01T00:00:00", str(uuid.uuid4()), "extra"]),
+    encode_cursor(["yesterday", str(uuid.uuid4())]),
+    encode_cursor(["2023-12-01T00:00:00", "not a uuid"]),
+    encode_cursor([None, str(uuid.uuid4())]),
+])
+def test_invalid_cursor(cursor):
+    """
+    Malformed or tampered cursors are rejected with 400
+    """
+
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, ORDER_BY)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("order_by, values", [
+    ([models.Movie.bayesian_rating, models.Movie.id], [7.25, str(uuid.uuid4())]),
+    ([models.Movie.bayesian_rating, models.Movie.id], [7, str(uuid.uuid4())]),
+    ([request_models.Request.votes_count, request_models.Request.id], [12, str(uuid.uuid4())]),
+])
+def test_numeric_cursor(order_by, values):
+    """
+    Numeric sort key values are accepted as numbers
+    """
+
+    decoded = decode_cursor(encode_cursor(values), order_by)
+
+    assert decoded[0] == values[0]
+    assert isinstance(decoded[1], uuid.UUID)
+
+
+@pytest.mark.parametrize("order_by, value", [
+    ([models.Movie.bayesian_rating, models.Movie.id], "7.25"),
+    ([models.Movie.bayesian_rating, models.Movie.id], True),
+    ([models.Movie.bayesian_rating, models.Movie.id], None),
+    ([request_models.Request.votes_count, request_models.Request.id], 1.5),
+    ([request_models.Request.votes_count, request_models.Request.id], "12"),
+    ([request_models.Request.votes_count, request_models.Request.id], False),
+    ([request_models.Request.votes_count, request_models.Request.id], 2 ** 31),
+])
+def test_invalid_numeric_cursor(order_by, value):
+    """
+    Tampered numeric sort key values are rejected with 400, Instead of failing in the DB
+    """
+
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor([value, str(uuid.uuid4())]), order_by)
+
+    assert error.value.status_code == 400
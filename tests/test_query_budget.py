@@ -0,0 +1,103 @@
+"""
+Tests of the number of DB queries issued by the list endpoints, So that N+1 queries can't
+sneak back in. Run against the configured DB through the API, Skipped when it is not reachable.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from base.query_counter import count_queries
+from base.response_cache import MOVIES_NAMESPACE, get_movie_namespace, response_cache
+from database import SessionLocal
+from tests.utils import add_movies, get_client, run_with_db
+
+# Maximum queries per endpoint, Authenticated endpoints include the current user lookup
+QUERY_BUDGETS = {
+    "/v1/movie/": 1,
+    "/v1/movie-rating/": 1,
+    "/v1/user-rating/": 2,
+    "/v1/user-movie/": 2,
+    "/v1/request/": 2,
+    "/v1/user-request/": 2,
+}
+
+# Every list has this many items, So that a query per item would exceed the budget
+ITEMS = 3
+
+
+async def _count_list_queries() -> dict[str, tuple[int, int, int]]:
+    """
+    Add movies rated by a user and requests of the user, Then call every budgeted endpoint once
+
+    :return: Status code, number of items and number of queries of every endpoint
+    """
+
+    async with get_client() as (client, headers), add_movies(client, headers, ITEMS) as movie_ids:
+        request_ids = []
+
+        try:
+            for movie_id in movie_ids:
+                response = await client.post("/v1/rating/", headers=headers, json={
+                    "movie_id": movie_id, "rating": 8
+                })
+                assert response.status_code == 201
+
+            for _ in range(ITEMS):
+                response = await client.post("/v1/request/", headers=headers, json={
+                    "name": f"Test request {uuid.uuid4().hex}"
+                })
+                assert response.status_code == 201
+                request_ids.append(response.json()["data"]["id"])
+
+            counts = {}
+
+            for path in QUERY_BUDGETS:
+                # Responses are built from the DB, Not from the response cache
+                await response_cache.invalidate(MOVIES_NAMESPACE, get_movie_namespace(movie_ids[0]))
+
+                with count_queries() as counter:
+                    response = await client.get(path, headers=headers, params={
+                        "limit": 100, "movie_id": movie_ids[0]
+                    })
+
+                counts[path] = (
+                    response.status_code, len(response.json()["results"]), counter.count
+                )
+
+            return counts
+
+        finally:
+            for request_id in request_ids:
+                await client.delete(f"/v1/request/{request_id}/", headers=headers)
+
+            # Ratings can't be deleted through the API, And they keep the movies from deletion
+            async with SessionLocal() as db:
+                await db.execute(
+                    text("DELETE FROM ratings WHERE movie_id = ANY(:movie_ids)"),
+                    {"movie_ids": [uuid.UUID(movie_id) for movie_id in movie_ids]}
+                )
+                await db.commit()
+
+
+@pytest.fixture(name="query_counts", scope="module")
+def fixture_query_counts():
+    """
+    Query counts of the list endpoints, Measured once for all the tests of the module
+    """
+
+    return run_with_db(_count_list_queries)
+
+
+@pytest.mark.parametrize("path, budget", QUERY_BUDGETS.items())
+def test_list_query_budget(query_counts, path, budget):
+    """
+    List endpoint issues no more queries than its budget, However many items it returns
+    """
+
+    status_code, items, queries = query_counts[path]
+
+    assert status_code == 200
+    assert items > 0
+    assert queries <= budget
@@ -0,0 +1,68 @@
+"""
+Tests of the precomputed movie rating stat helpers
+"""
+
+from decimal import Decimal
+
+import pytest
+
+import settings
+from movies.models import (
+    RATING_BUCKETS, get_bayesian_rating, get_rating_bucket, get_stored_rating
+)
+
+
+@pytest.mark.parametrize("rating, bucket", [
+    (0, 0),
+    (0.4, 0),
+    (0.5, 1),
+    (4.49, 4),
+    (4.5, 5),
+    (Decimal("7.50"), 8),
+    (9.5, 10),
+    (10, 10),
+])
+def test_rating_bucket(rating, bucket):
+    """
+    Ratings are rounded half up to their whole number bucket
+    """
+
+    assert get_rating_bucket(rating) == bucket
+
+
+def test_rating_bucket_is_within_histogram():
+    """
+    Every rating from 0 to 10 falls into one of the histogram buckets
+    """
+
+    assert {get_rating_bucket(step / 10) for step in range(101)} == set(range(RATING_BUCKETS))
+
+
+def test_bayesian_rating_without_ratings():
+    """
+    Movie without ratings gets the prior mean
+    """
+
+    assert get_bayesian_rating(0.0, 0) == pytest.approx(settings.RATING_PRIOR_MEAN)
+
+
+def test_bayesian_rating_pulls_few_ratings_towards_mean():
+    """
+    Single 10 ranks below a popular movie rated 9 on average
+    """
+
+    single = get_bayesian_rating(10.0, 1)
+    popular = get_bayesian_rating(9.0 * 1000, 1000)
+
+    assert settings.RATING_PRIOR_MEAN < single < popular < 9.0
+
+
+def test_stored_rating_has_single_precision():
+    """
+    Rating is rounded like the REAL ratings column stores it, Whole and half ratings are exact
+    """
+
+    assert get_stored_rating(7.3) != 7.3
+    assert get_stored_rating(7.3) == pytest.approx(7.3, rel=1e-7)
+    assert get_stored_rating(get_stored_rating(7.3)) == get_stored_rating(7.3)
+    assert get_stored_rating(Decimal("8.5")) == 8.5
@@ -0,0 +1,138 @@
+"""
+Tests of the replica lag monitor, With a fake replica engine
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from database import ReplicaMonitor
+
+
+class FakeEngine:
+    """
+    Engine whose connections return the given lag, Or fail or hang connecting
+    """
+
+    def __init__(self, lag: float = 0.0, error: Exception = None, delay: float = 0):
+        self.lag = lag
+        self.error = error
+        self.delay = delay
+        self.connects = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        """
+        Open a fake connection
+        """
+
+        self.connects += 1
+        await asyncio.sleep(self.delay)
+
+        if self.error:
+            raise self.error
+
+        async def execute(_):
+            return SimpleNamespace(scalar=lambda: self.lag)
+
+        yield SimpleNamespace(execute=execute)
+
+
+def _get_monitor(db_engine: FakeEngine) -> ReplicaMonitor:
+    return ReplicaMonitor(db_engine, max_lag=1, check_interval=5)
+
+
+def test_not_usable_before_first_check():
+    """
+    Reads stay on the primary until the replica is checked
+    """
+
+    assert not _get_monitor(FakeEngine()).is_usable()
+
+
+def test_usable_within_max_lag():
+    """
+    Replica is used while its lag is within the max lag
+    """
+
+    monitor = _get_monitor(FakeEngine(lag=0.5))
+    asyncio.run(monitor.check())
+
+    assert monitor.is_usable()
+
+    monitor.engine.lag = 2
+    asyncio.run(monitor.check())
+
+    assert not monitor.is_usable()
+    assert monitor.status() == {"lag_seconds": 2, "max_lag_seconds": 1, "usable": False}
+
+
+def test_unreachable_replica():
+    """
+    Connect error marks the replica unreachable
+    """
+
+    monitor = _get_monitor(FakeEngine(error=OSError("Connection refused")))
+    asyncio.run(monitor.check())
+
+    assert monitor.lag is None
+    assert not monitor.is_usable()
+
+
+def test_stale_check_is_not_trusted():
+    """
+    Replica is not used once the last check is too old, e.g. while a check is hanging
+    """
+
+    monitor = _get_monitor(FakeEngine())
+    asyncio.run(monitor.check())
+    monitor.checked_at = time.monotonic() - monitor.check_interval * monitor.STALE_CHECKS
+
+    assert not monitor.is_usable()
+
+
+def test_request_does_not_wait_for_check():
+    """
+    Lag is checked in the background, So a hanging connect never blocks a request
+    """
+
+    async def run():
+        db_engine = FakeEngine(delay=60)
+        monitor = _get_monitor(db_engine)
+        monitor.start()
+        await asyncio.sleep(0)
+
+        start = time.monotonic()
+        is_usable = monitor.is_usable()
+        elapsed = time.monotonic() - start
+
+        await monitor.stop()
+        return is_usable, elapsed, db_engine.connects, monitor.task
+
+    is_usable, elapsed, connects, task = asyncio.run(run())
+
+    assert not is_usable
+    assert elapsed < 0.1
+    assert connects == 1
+    assert task is None
+
+
+def test_background_checks_repeat():
+    """
+    Background task keeps checking the replica every interval
+    """
+
+    async def run():
+        db_engine = FakeEngine(lag=0)
+        monitor = ReplicaMonitor(db_engine, max_lag=1, check_interval=0.05)
+        monitor.start()
+        await asyncio.sleep(0.2)
+        is_usable = monitor.is_usable()
+        await monitor.stop()
+        return is_usable, db_engine.connects
+
+    is_usable, connects = asyncio.run(run())
+
+    assert is_usable
+    assert connects > 1
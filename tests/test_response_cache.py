@@ -0,0 +1,79 @@
+"""
+Tests of the response cache, With the in-process backend
+"""
+
+import asyncio
+
+from fastapi import Request
+from pydantic import BaseModel
+
+from base.response_cache import MemoryCacheBackend, ResponseCache
+
+
+class Body(BaseModel):
+    """
+    Response schema of the tests
+    """
+
+    value: str
+
+
+def _get_request(bypass: bool = False, etag: str = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    request = Request({
+        "type": "http", "method": "GET", "path": "/v1/movie/", "query_string": b"limit=10",
+        "headers": headers,
+    })
+
+    if bypass:
+        request.state.bypass_response_cache = True
+
+    return request
+
+
+def _get_response(cache: ResponseCache, request: Request, value: str):
+    async def build():
+        return Body(value=value), None
+
+    return asyncio.run(cache.get_response(request, ["movies"], build))
+
+
+def test_response_is_cached():
+    """
+    Second request is served from the cache, Until the namespace is invalidated
+    """
+
+    cache = ResponseCache(MemoryCacheBackend(max_size=10, ttl=60))
+
+    assert _get_response(cache, _get_request(), "primary").body == b'{"value":"primary"}'
+    assert _get_response(cache, _get_request(), "changed").body == b'{"value":"primary"}'
+
+    asyncio.run(cache.invalidate("movies"))
+
+    assert _get_response(cache, _get_request(), "changed").body == b'{"value":"changed"}'
+    assert (cache.hits, cache.misses, cache.bypasses) == (1, 2, 0)
+
+
+def test_bypassed_response_is_not_cached():
+    """
+    Response read from the replica or for a recent writer is not stored, Nor read from the cache
+    """
+
+    cache = ResponseCache(MemoryCacheBackend(max_size=10, ttl=60))
+
+    assert _get_response(cache, _get_request(True), "replica").body == b'{"value":"replica"}'
+    assert _get_response(cache, _get_request(), "primary").body == b'{"value":"primary"}'
+    assert _get_response(cache, _get_request(True), "replica").body == b'{"value":"replica"}'
+    assert (cache.hits, cache.misses, cache.bypasses) == (0, 1, 2)
+
+
+def test_bypassed_response_answers_conditional_get():
+    """
+    Bypassed response is still tagged, So an unchanged body is answered with 304
+    """
+
+    cache = ResponseCache(MemoryCacheBackend(max_size=10, ttl=60))
+    etag = _get_response(cache, _get_request(True), "replica").headers["ETag"]
+
+    assert _get_response(cache, _get_request(True, etag), "replica").status_code == 304
+    assert _get_response(cache, _get_request(True, etag), "changed").status_code == 200
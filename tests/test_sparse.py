@@ -0,0 +1,108 @@
+"""
+Tests of the sparse fieldset helpers
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from base.sparse import get_sparse_model, get_sparse_response_model, parse_fields
+from movies import schemas
+
+
+@pytest.mark.parametrize("fields", [None, ""])
+def test_parse_no_fields(fields):
+    """
+    All the fields are wanted when the param is missing or empty
+    """
+
+    assert parse_fields(fields, schemas.MovieList) is None
+
+
+def test_parse_fields():
+    """
+    Field names are split by comma, Ignoring spaces, empty names and repeats
+    """
+
+    assert parse_fields(" id, name,,name ", schemas.MovieList) == frozenset({"id", "name"})
+
+
+@pytest.mark.parametrize("fields", ["id,password", ",", " "])
+def test_parse_invalid_fields(fields):
+    """
+    Unknown or only empty field names are rejected with 400, Listing the valid ones
+    """
+
+    with pytest.raises(HTTPException) as error:
+        parse_fields(fields, schemas.MovieList)
+
+    assert error.value.status_code == 400
+    assert "id, name, year, avg_rating" in error.value.detail
+
+
+def test_sparse_model_keeps_schema_order():
+    """
+    Sparse model has the picked fields only, In the order of the schema
+    """
+
+    model = get_sparse_model(schemas.MovieList, frozenset({"year", "id"}))
+
+    assert list(model.model_fields) == ["id", "year"]
+    assert model.__name__ == schemas.MovieList.__name__
+
+
+def test_sparse_model_is_cached():
+    """
+    Same sparse model class is reused for the same fields
+    """
+
+    fields = frozenset({"id", "name"})
+
+    assert get_sparse_model(schemas.MovieList, fields) is get_sparse_model(
+        schemas.MovieList, frozenset(["name", "id"])
+    )
+
+
+def test_sparse_model_reads_orm_objects():
+    """
+    Sparse model is read from an object having the picked attributes only
+    """
+
+    movie_id = uuid.uuid4()
+    model = get_sparse_model(schemas.MovieList, frozenset({"id", "name"}))
+    movie = model.model_validate(SimpleNamespace(id=movie_id, name="Heat"))
+
+    assert movie.model_dump(mode="json") == {"id": str(movie_id), "name": "Heat"}
+
+
+def test_sparse_list_response():
+    """
+    Items of a list response are sparse, The other response fields are kept with defaults
+    """
+
+    model = get_sparse_response_model(schemas.MovieListResponse, "results", frozenset({"name"}))
+    response = model(results=[SimpleNamespace(name="Heat")])
+
+    assert response.model_dump() == {"results": [{"name": "Heat"}], "next_cursor": None}
+
+
+def test_sparse_detail_response():
+    """
+    Single item of a detail response is sparse
+    """
+
+    model = get_sparse_response_model(schemas.MovieResponse, "data", frozenset({"year"}))
+
+    assert model(message="", data=SimpleNamespace(year=1995)).model_dump() == {
+        "message": "", "data": {"year": 1995}
+    }
+
+
+def test_full_response_without_fields():
+    """
+    Response schema itself is used when all the fields are wanted
+    """
+
+    assert get_sparse_response_model(schemas.MovieResponse, "data", None) is schemas.MovieResponse
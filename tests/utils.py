@@ -0,0 +1,96 @@
+"""
+Helpers of the tests which run against the configured DB through the API
+"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from sqlalchemy import exc
+
+from database import engine
+from main import app
+
+
+async def _is_db_reachable() -> bool:
+    try:
+        async with engine.connect():
+            return True
+    except (OSError, exc.SQLAlchemyError):
+        return False
+
+
+def run_with_db(check):
+    """
+    Run a coroutine function against the DB, Skipping the test when the DB is not reachable
+
+    :param check: Coroutine function to run
+    :return: Result of the coroutine function
+    """
+
+    async def run():
+        try:
+            if not await _is_db_reachable():
+                return False, None
+
+            return True, await check()
+        finally:
+            await engine.dispose()
+
+    is_reachable, result = asyncio.run(run())
+
+    if not is_reachable:
+        pytest.skip("DB is not reachable")
+
+    return result
+
+
+@asynccontextmanager
+async def get_client():
+    """
+    Return an API client of the app, Along with the auth headers of a new user.
+    User is deleted on exit.
+    """
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/v1/register/", json={
+            "email": f"test-{uuid.uuid4().hex}@example.com",
+            "password": "Secret@123",
+            "first_name": "First",
+            "last_name": "Last",
+        })
+        assert response.status_code == 201
+        headers = {"Authorization": f"Bearer {response.json()['tokens']['access']}"}
+
+        try:
+            yield client, headers
+        finally:
+            await client.delete("/v1/profile/", headers=headers)
+
+
+@asynccontextmanager
+async def add_movies(client: httpx.AsyncClient, headers: dict, count: int):
+    """
+    Add movies with unique names through the API, They are deleted on exit
+
+    :return: List of movie IDs
+    """
+
+    movie_ids = []
+
+    try:
+        for _ in range(count):
+            response = await client.post("/v1/movie/", headers=headers, json={
+                "name": f"Test movie {uuid.uuid4().hex}", "year": 2023, "extra": {}
+            })
+            assert response.status_code == 201
+            movie_ids.append(response.json()["data"]["id"])
+
+        yield movie_ids
+    finally:
+        for movie_id in movie_ids:
+            await client.delete(f"/v1/movie/{movie_id}/", headers=headers)